@@ -0,0 +1,89 @@
+:: this sample demonstrates how to:
+:: - run a pre process outside the revit environment which seeds a shared directory work queue with revit files
+::    - refer to SampleCodeRevitBatchProcessor/Pre_SeedWorkQueue.py for the pre process script
+:: - run a task in 3 parallel running sessions of batchprocessor which claim files from the work queue until none are left
+::    - refer to SampleCodeRevitBatchProcessor/ModifyFromWorkQueue.py for the task script
+::    - all sessions use the same settings file: the task script runs in 'single Revit task' mode (no task file list required)
+:: - wait for all sessions to finish
+@echo off
+setlocal EnableDelayedExpansion
+:: default file name for lock files
+set "_lock=%temp%\wait%random%.lock"
+:: file path of Revit batch processor
+set _targetPath=%LocalAppData%\RevitBatchProcessor\BatchRvt.exe
+:: default path for python installation
+set _pythonPath="C:\Program Files (x86)%\IronPython 2.7\ipy64.exe"
+:: file path to work queue seeding script
+set "_seedScriptPath=C:\temp\Pre_SeedWorkQueue.py"
+:: settings file used by all sessions
+set "_settingsFilePath=C:\temp\out\_settings\BatchRvt.2019.WorkQueue.Settings.json"
+:: number of parallel sessions
+set _len=3
+:: spinner stuff - back space character
+for /f %%a in ('copy /Z "%~dpf0" nul') do set "_CR=%%a"
+
+:: code execution
+echo.
+echo ********************************* Seed work queue ***********************************************************
+echo.
+
+call %_pythonPath% "%_seedScriptPath%"
+
+echo Seeding work queue : Done
+echo.
+echo ********************************* Process work queue ************************************************
+echo.
+echo [settings file used: %_settingsFilePath%]
+echo.
+
+:: set counter to start at 0
+set _counter=0
+:: set displayed counter to start at 1
+set /a "_taskCounterDisplay=_counter+1"
+:loopSessions
+if %_counter% lss %_len% (
+  if NOT %_counter%==0 timeout /t 30 /nobreak
+  start "WorkQueue%_counter%" 9>"%_lock%%_counter%" %_targetPath% --settings_file "%_settingsFilePath%"
+  echo started Revit Batch Processor... %_taskCounterDisplay% of %_len%
+  set /a "_counter=_counter+1"
+  set /a "_taskCounterDisplay=_counter+1"
+  goto loopSessions
+)
+
+echo.
+:: wait on processes to finish...
+call :waitForIt
+
+:: Finish up
+echo.
+echo Processing work queue : Done
+echo.
+echo ********************************** Finished ****************************************************************
+
+pause
+
+REM get out before executing the spinner code below
+exit /b
+
+REM spinner code
+:spinner
+set /a "spinner=(spinner + 1) %% 4"
+set "spinChars=\|/-"
+<nul set /p ".=Waiting on process(es) to finish.... !spinChars:~%spinner%,1!!_CR!"
+exit /b
+
+REM wait loop to check whether lock files still exist
+:waitForIt
+1>nul 2>nul ping /n 2 ::1
+for %%N in ("%_lock%*") do (
+  call :spinner
+  (call ) 9>"%%N" || goto :waitForIt
+) 2>nul
+
+:: process has finished message
+<nul set /p ".=Waiting on process(es) to finish.... Finished!"
+
+echo.
+echo deleting lock files
+::delete the lock files
+del "%_lock%*"
@@ -0,0 +1,201 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Helper functions to process only Revit files which changed or failed since the last batch processor session.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Files found (refer to :mod:`UtilFileCatalog`) are compared with the results of previous sessions stored in a runtime store\
+    (refer to :mod:`BatchProcessorRuntimeStore`). A file needs processing if:
+
+- it has never been processed
+- the most recent session processing it failed
+- it was modified after the end of the most recent successful processing
+- its most recent successful processing is older than a given number of days (forced full run)
+
+Any other file is unchanged and can be skipped.
+
+Note: Modified times are compared with the end of the processing, so task scripts saving or synchronising the file they\
+    process do not cause it to be processed again next time. A change made by someone else while the file was being processed\
+    is therefore not picked up either (until the file changes again or a full run is due).
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import calendar
+import datetime
+
+import Utility as util
+import BatchProcessorRuntimeStore as rs
+
+#: File is unchanged since it was last processed successfully
+REASON_UNCHANGED = 'Unchanged'
+#: File has not been processed before
+REASON_NEW = 'New'
+#: The most recent processing of the file failed
+REASON_FAILED = 'Failed'
+#: File was modified after it was last processed successfully
+REASON_MODIFIED = 'Modified'
+#: File was last processed successfully longer ago than the full run interval
+REASON_EXPIRED = 'Expired'
+
+#: Seconds a file modified time may be after the end of its processing and still be unchanged: log times are logged\
+#: in full seconds and the clock of a file server may differ slightly from the clock of the machine running the session
+MODIFIED_TIME_TOLERANCE = 60
+
+class LastResult:
+    def __init__(self, lastStartTime, lastStatus, lastSuccessStartTime, lastSuccessEndTime):
+        '''
+        Class constructor.
+
+        :param lastStartTime: The utc start time of the most recent processing of the file.
+        :type lastStartTime: datetime.datetime
+        :param lastStatus: The status of the most recent processing of the file.
+        :type lastStatus: bool
+        :param lastSuccessStartTime: The utc start time of the most recent successful processing of the file, None if never processed successfully.
+        :type lastSuccessStartTime: datetime.datetime
+        :param lastSuccessEndTime: The utc end time of the most recent successful processing of the file, None if never processed successfully.
+        :type lastSuccessEndTime: datetime.datetime
+        '''
+
+        self.lastStartTime = lastStartTime
+        self.lastStatus = lastStatus
+        self.lastSuccessStartTime = lastSuccessStartTime
+        self.lastSuccessEndTime = lastSuccessEndTime
+
+def GetEpochSeconds(utcTime):
+    '''
+    Returns a utc time as seconds since the epoch, the same format as file modified times.
+
+    :param utcTime: A utc time.
+    :type utcTime: datetime.datetime
+
+    :return: Seconds since the epoch.
+    :rtype: int
+    '''
+
+    return calendar.timegm(utcTime.timetuple())
+
+def GetEndTime(runtime):
+    '''
+    Returns the utc time processing of a file ended.
+
+    :param runtime: A runtime as read from a runtime store.
+    :type runtime: :class:`BatchProcessorRuntimeStore.FileRuntime`
+
+    :return: The start time plus the total processing time, or the start time if the total processing time is not available.
+    :rtype: datetime.datetime
+    '''
+
+    if(runtime.totalTime == rs.NO_DURATION):
+        return runtime.startTime
+    return runtime.startTime + datetime.timedelta(seconds = runtime.totalTime)
+
+def GetLastResults(runtimes):
+    '''
+    Returns the most recent processing result of each file.
+
+    :param runtimes: List of runtimes as read from a runtime store.
+    :type runtimes: [:class:`BatchProcessorRuntimeStore.FileRuntime`]
+
+    :return: Dictionary where key is the normalised file path and value is the most recent result.
+    :rtype: {str: :class:`.LastResult`}
+    '''
+
+    lastResults = {}
+    runtimesByFile = rs.GetRuntimesByFile(runtimes)
+    for key in runtimesByFile:
+        # runtimes are sorted by start time
+        fileRuntimes = runtimesByFile[key]
+        lastSuccessStartTime = None
+        lastSuccessEndTime = None
+        for runtime in fileRuntimes:
+            if(runtime.status):
+                lastSuccessStartTime = runtime.startTime
+                lastSuccessEndTime = GetEndTime(runtime)
+        lastResults[key] = LastResult(fileRuntimes[-1].startTime, fileRuntimes[-1].status, lastSuccessStartTime, lastSuccessEndTime)
+    return lastResults
+
+def GetProcessReason(filePath, modified, lastResults, fullRunDays = None, utcNow = None):
+    '''
+    Returns why a file needs processing, or REASON_UNCHANGED if it does not.
+
+    :param filePath: The fully qualified file path.
+    :type filePath: str
+    :param modified: The file modified time in seconds since the epoch.
+    :type modified: float
+    :param lastResults: The most recent results by file as returned by :func:`GetLastResults`.
+    :type lastResults: {str: :class:`.LastResult`}
+    :param fullRunDays: Files last processed successfully more than this number of days ago are processed again, defaults to None (never)
+    :type fullRunDays: int, optional
+    :param utcNow: The current utc time, defaults to None (datetime.datetime.utcnow())
+    :type utcNow: datetime.datetime, optional
+
+    :return: One of the REASON_ constants.
+    :rtype: str
+    '''
+
+    key = util.NormaliseFilePath(filePath)
+    if(key not in lastResults):
+        return REASON_NEW
+    lastResult = lastResults[key]
+    if(not lastResult.lastStatus or lastResult.lastSuccessStartTime is None):
+        return REASON_FAILED
+    # a task script saving the file changes its modified time while it is processed
+    if(modified > GetEpochSeconds(lastResult.lastSuccessEndTime) + MODIFIED_TIME_TOLERANCE):
+        return REASON_MODIFIED
+    if(fullRunDays is not None):
+        if(utcNow is None):
+            utcNow = datetime.datetime.utcnow()
+        if(utcNow - lastResult.lastSuccessStartTime >= datetime.timedelta(days = fullRunDays)):
+            return REASON_EXPIRED
+    return REASON_UNCHANGED
+
+def GetFilesToProcess(files, runtimes, fullRunDays = None, utcNow = None):
+    '''
+    Returns the files which changed or failed since they were last processed.
+
+    :param files: List of files, i.e. from a file catalog.
+    :type files: [:class:`UtilFileDiscovery.DiscoveredFile`]
+    :param runtimes: List of runtimes as read from a runtime store.
+    :type runtimes: [:class:`BatchProcessorRuntimeStore.FileRuntime`]
+    :param fullRunDays: Files last processed successfully more than this number of days ago are processed again, defaults to None (never)
+    :type fullRunDays: int, optional
+    :param utcNow: The current utc time, defaults to None (datetime.datetime.utcnow())
+    :type utcNow: datetime.datetime, optional
+
+    :return:
+        - List of files to process, in the order of the files passed in.
+        - Dictionary where key is a REASON_ constant and value the number of files with that reason.
+    :rtype: [:class:`UtilFileDiscovery.DiscoveredFile`], {str: int}
+    '''
+
+    filesToProcess = []
+    reasonCounts = {}
+    lastResults = GetLastResults(runtimes)
+    if(utcNow is None):
+        utcNow = datetime.datetime.utcnow()
+    for f in files:
+        reason = GetProcessReason(f.path, f.modified, lastResults, fullRunDays, utcNow)
+        reasonCounts[reason] = reasonCounts.get(reason, 0) + 1
+        if(reason != REASON_UNCHANGED):
+            filesToProcess.append(f)
+    return filesToProcess, reasonCounts
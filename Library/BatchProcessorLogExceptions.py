@@ -0,0 +1,217 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Helper classes to find and classify exception messages in Revit Batchprocessor log files.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Exception messages are registered with a category and a severity. The matcher checks a number of log rows in one go:
+
+- rows are joined into a single string which is checked once per registered message
+- only if that finds a match the rows are checked one by one and classified
+
+Crash heavy log files contain large stack traces, checking those row by row against every message is slow.
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+#: severity: something the script was meant to do failed, Revit kept on going
+SEVERITY_WARNING = 1
+#: severity: processing of the file was aborted
+SEVERITY_ERROR = 2
+#: severity: Revit terminated
+SEVERITY_FATAL = 3
+
+#: category: error in task script reported by batch processor
+CATEGORY_TASK_SCRIPT = 'task script'
+#: category: Revit timed out
+CATEGORY_TIMEOUT = 'timeout'
+#: category: .net exception reported by batch processor
+CATEGORY_EXCEPTION = 'exception'
+#: category: Revit crashed
+CATEGORY_CRASH = 'crash'
+#: category: custom message written by a script
+CATEGORY_SCRIPT_EXCEPTION = 'script exception'
+#: category: message registered without category
+CATEGORY_UNKNOWN = 'unknown'
+
+#: Category and severity of exception messages known to occur in batch processor log files.
+DEFAULT_EXCEPTION_MESSAGE_CLASSIFICATION = {
+    'ERROR: An error occurred while executing the task script! Operation' : [CATEGORY_TASK_SCRIPT, SEVERITY_ERROR],
+    'WARNING: Timed-out' : [CATEGORY_TIMEOUT, SEVERITY_ERROR],
+    'Exception: [Exception]' : [CATEGORY_EXCEPTION, SEVERITY_ERROR],
+    '\t- \tMessage: An unrecoverable error has occurred.  The program will now be terminated.' : [CATEGORY_CRASH, SEVERITY_FATAL],
+    'Script Exception:' : [CATEGORY_SCRIPT_EXCEPTION, SEVERITY_WARNING]
+}
+
+class ExceptionPattern:
+    def __init__(self, message, category = CATEGORY_UNKNOWN, severity = SEVERITY_ERROR):
+        '''
+        Class constructor.
+
+        :param message: Message snippet indicating processing of a file went bad.
+        :type message: str
+        :param category: The failure category, defaults to CATEGORY_UNKNOWN
+        :type category: str, optional
+        :param severity: The failure severity, defaults to SEVERITY_ERROR
+        :type severity: int, optional
+        '''
+
+        self.message = message
+        self.category = category
+        self.severity = severity
+
+class ClassifiedFailure:
+    def __init__(self, message, exceptionPattern):
+        '''
+        Class constructor.
+
+        :param message: The log message containing an exception message.
+        :type message: str
+        :param exceptionPattern: The most severe exception pattern found in the message.
+        :type exceptionPattern: :class:`.ExceptionPattern`
+        '''
+
+        self.message = message
+        self.pattern = exceptionPattern.message
+        self.category = exceptionPattern.category
+        self.severity = exceptionPattern.severity
+
+class ExceptionMatcher:
+    def __init__(self):
+        '''
+        Class constructor.
+
+        Initialises this class with an empty registry. Use :func:`.Register` to add exception messages.
+        '''
+
+        self.patterns = []
+
+    def Register(self, message, category = CATEGORY_UNKNOWN, severity = SEVERITY_ERROR):
+        '''
+        Adds an exception message to the registry.
+
+        :param message: Message snippet indicating processing of a file went bad.
+        :type message: str
+        :param category: The failure category, defaults to CATEGORY_UNKNOWN
+        :type category: str, optional
+        :param severity: The failure severity, defaults to SEVERITY_ERROR
+        :type severity: int, optional
+        '''
+
+        self.patterns.append(ExceptionPattern(message, category, severity))
+
+    def Screen(self, text):
+        '''
+        Checks whether any registered exception message occurs in a text.
+
+        :param text: Text to check, usually a number of log messages joined by a new line character.
+        :type text: str
+
+        :return: True if any registered exception message occurs in the text, otherwise False.
+        :rtype: bool
+        '''
+
+        for p in self.patterns:
+            if(p.message in text):
+                return True
+        return False
+
+    def Match(self, message):
+        '''
+        Classifies a single log message.
+
+        If the message contains more then one registered exception message the most severe one is used.\
+            If severity is the same, the one registered first is used.
+
+        :param message: A log message.
+        :type message: str
+
+        :return: A classified failure, or None if the message contains no registered exception message.
+        :rtype: :class:`.ClassifiedFailure`
+        '''
+
+        mostSevere = None
+        for p in self.patterns:
+            if(p.message in message and (mostSevere is None or p.severity > mostSevere.severity)):
+                mostSevere = p
+        if(mostSevere is None):
+            return None
+        return ClassifiedFailure(message, mostSevere)
+
+    def MatchAll(self, messages):
+        '''
+        Classifies a number of log messages.
+
+        :param messages: List of log messages.
+        :type messages: [str]
+
+        :return: A list of classified failures, in order of messages. Messages without a registered exception message are ignored.
+        :rtype: [:class:`.ClassifiedFailure`]
+        '''
+
+        failures = []
+        if(len(messages) == 0 or not self.Screen('\n'.join(messages))):
+            return failures
+        for message in messages:
+            failure = self.Match(message)
+            if(failure is not None):
+                failures.append(failure)
+        return failures
+
+def GetExceptionMatcher(exceptionMessages, classification = DEFAULT_EXCEPTION_MESSAGE_CLASSIFICATION):
+    '''
+    Returns an exception matcher with the given exception messages registered.
+
+    :param exceptionMessages: List of message snippets which indicate processing of a file went bad.
+    :type exceptionMessages: [str]
+    :param classification: Dictionary where key is the message snippet and value is a list of category and severity,\
+        defaults to DEFAULT_EXCEPTION_MESSAGE_CLASSIFICATION. Messages not in this dictionary are registered as CATEGORY_UNKNOWN.
+    :type classification: {str: [str, int]}, optional
+
+    :return: An exception matcher.
+    :rtype: :class:`.ExceptionMatcher`
+    '''
+
+    matcher = ExceptionMatcher()
+    for message in exceptionMessages:
+        if(message in classification):
+            matcher.Register(message, classification[message][0], classification[message][1])
+        else:
+            matcher.Register(message)
+    return matcher
+
+def GetMostSevereFailure(failures):
+    '''
+    Returns the most severe failure from a list of failures. If severity is the same, the first one is returned.
+
+    :param failures: List of classified failures.
+    :type failures: [:class:`.ClassifiedFailure`]
+
+    :return: The most severe failure, or None if list is empty.
+    :rtype: :class:`.ClassifiedFailure`
+    '''
+
+    mostSevere = None
+    for failure in failures:
+        if(mostSevere is None or failure.severity > mostSevere.severity):
+            mostSevere = failure
+    return mostSevere
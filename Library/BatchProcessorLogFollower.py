@@ -0,0 +1,302 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Helper functions to follow Revit Batchprocessor log files while sessions are still running.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Results of each Revit file processed are returned as soon as the file processing block in the log file closes.
+
+The read position of each log file is stored in a checkpoint file, so a follower can be stopped and resumed\
+    without processing files twice (a result may be returned twice if the follower stops before the checkpoint got saved).
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import os
+import json
+import time
+
+import BatchProcessorLogUtils as logUtils
+
+#: Default time in seconds between log file reads
+DEFAULT_POLL_INTERVAL = 5
+#: Default time in seconds after which a follower stops if none of the log files changed
+DEFAULT_IDLE_TIMEOUT = 3600
+
+class LogFileFollower:
+    def __init__(self, filePath, offset = 0, rowCounter = 0, fileListDone = False):
+        '''
+        Class constructor.
+
+        :param filePath: Fully qualified file path to json formated log file
+        :type filePath: str
+        :param offset: The byte offset from which to start reading the log file, defaults to 0
+        :type offset: int, optional
+        :param rowCounter: The number of rows before the offset, defaults to 0
+        :type rowCounter: int, optional
+        :param fileListDone: Flag indicating whether the file list block is before the offset, defaults to False
+        :type fileListDone: bool, optional
+        '''
+
+        self.filePath = filePath
+        # position the last complete row read ends at
+        self.offset = offset
+        # position and row count the parser was last in between blocks: safe to resume from there
+        self.checkpointOffset = offset
+        self.checkpointRow = rowCounter
+        self.parser = logUtils.LogFileParser(fileListDone)
+        self.parser.rowCounter = rowCounter
+
+    def GetCheckpoint(self):
+        '''
+        Returns the position from which this log file can be resumed.
+
+        :return: A dictionary with the keys 'offset', 'row' and 'fileListDone'
+        :rtype: dic
+        '''
+
+        return {
+            'offset': self.checkpointOffset,
+            'row': self.checkpointRow,
+            'fileListDone': self.parser.fileListDone
+        }
+
+    def Read(self):
+        '''
+        Reads any complete rows added to the log file since the last read.
+
+        :return: List of results of files processed in format:
+            [[processed Revit file name, status of processing (true or false), message]]
+        :rtype: [[str, bool, str]]
+        '''
+
+        results = []
+        try:
+            if(os.path.getsize(self.filePath) <= self.offset):
+                return results
+            with open(self.filePath, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read()
+        except Exception as e:
+            logUtils.Output('Failed to read log file: ' + self.filePath + ' ' + str(e))
+            return results
+        # ignore the last row if it is not complete yet
+        end = data.rfind(b'\n')
+        if(end < 0):
+            return results
+        position = self.offset
+        for line in data[:end + 1].split(b'\n')[:-1]:
+            position = position + len(line) + 1
+            if(len(line.strip()) > 0):
+                results = results + self._ProcessRow(json.loads(line.decode('utf-8')))
+            if(self.parser.IsIdle()):
+                self.checkpointOffset = position
+                self.checkpointRow = self.parser.rowCounter
+        self.offset = position
+        return results
+
+    def Finish(self):
+        '''
+        Closes any block still open. Use when the session writing to the log file has finished.
+
+        :return: List of results of files processed in format:
+            [[processed Revit file name, status of processing (true or false), message]]
+        :rtype: [[str, bool, str]]
+        '''
+
+        fileListDone = self.parser.fileListDone
+        results = self._ConvertRecords(self.parser.Finish())
+        if(not fileListDone and self.parser.fileListDone):
+            results = self._GetFilesNotFound() + results
+        self.checkpointOffset = self.offset
+        self.checkpointRow = self.parser.rowCounter
+        return results
+
+    def _ProcessRow(self, data):
+        fileListDone = self.parser.fileListDone
+        results = self._ConvertRecords(self.parser.ProcessRow(data))
+        if(not fileListDone and self.parser.fileListDone):
+            results = self._GetFilesNotFound() + results
+        return results
+
+    def _GetFilesNotFound(self):
+        results = []
+        for f in logUtils.GetFilesNotFound(self.parser.filesProcessed):
+            results.append([f[0], False, ['File not found']])
+        return results
+
+    def _ConvertRecords(self, records):
+        results = []
+        for record in records:
+            status, message = logUtils.GetProcessStatusFromRecord(record)
+            results.append([record.fileName, status, message])
+        return results
+
+def ReadCheckpoints(checkpointFilePath):
+    '''
+    Reads log file checkpoints from file.
+
+    :param checkpointFilePath: The fully qualified file path of the checkpoint file.
+    :type checkpointFilePath: str
+
+    :return: A dictionary where key is the log file path and value is a checkpoint as returned by :func:`LogFileFollower.GetCheckpoint`
+    :rtype: dic
+    '''
+
+    checkpoints = {}
+    try:
+        if(os.path.exists(checkpointFilePath)):
+            with open(checkpointFilePath, 'r') as f:
+                checkpoints = json.load(f)
+    except Exception as e:
+        logUtils.Output('Failed to read checkpoint file: ' + str(e))
+        checkpoints = {}
+    return checkpoints
+
+def WriteCheckpoints(checkpointFilePath, followers):
+    '''
+    Writes the checkpoints of log file followers to file.
+
+    :param checkpointFilePath: The fully qualified file path of the checkpoint file.
+    :type checkpointFilePath: str
+    :param followers: List of log file followers.
+    :type followers: [:class:`.LogFileFollower`]
+
+    :return: True if checkpoints were written succesfully, otherwise False.
+    :rtype: bool
+    '''
+
+    status = True
+    checkpoints = ReadCheckpoints(checkpointFilePath)
+    for follower in followers:
+        checkpoints[follower.filePath] = follower.GetCheckpoint()
+    try:
+        with open(checkpointFilePath, 'w') as f:
+            json.dump(checkpoints, f)
+    except Exception as e:
+        logUtils.Output('Failed to write checkpoint file: ' + str(e))
+        status = False
+    return status
+
+def GetFollower(filePath, checkpoints):
+    '''
+    Returns a follower for a log file, resuming from its checkpoint if there is one.
+
+    :param filePath: Fully qualified file path to json formated log file
+    :type filePath: str
+    :param checkpoints: Checkpoints as returned by :func:`ReadCheckpoints`
+    :type checkpoints: dic
+
+    :return: A log file follower.
+    :rtype: :class:`.LogFileFollower`
+    '''
+
+    if(filePath in checkpoints):
+        checkpoint = checkpoints[filePath]
+        return LogFileFollower(filePath, checkpoint['offset'], checkpoint['row'], checkpoint['fileListDone'])
+    return LogFileFollower(filePath)
+
+def FollowLogFiles(getLogFiles, checkpointFilePath, isFinished, pollInterval = DEFAULT_POLL_INTERVAL, idleTimeout = DEFAULT_IDLE_TIMEOUT):
+    '''
+    Follows log files and yields the result of each Revit file processed as soon as its processing block closes.
+
+    Stops once isFinished returns True (after a last read of all log files), or no log file changed for idleTimeout seconds.\
+        Any blocks still open at that point are returned too (same as :func:`BatchProcessorLogUtils.ProcessLogFile` does).
+
+    :param getLogFiles: Function returning the fully qualified file path of all log files to follow. Called on every poll\
+        so log files of sessions which started late get picked up.
+    :type getLogFiles: func() -> [str]
+    :param checkpointFilePath: The fully qualified file path of the checkpoint file.
+    :type checkpointFilePath: str
+    :param isFinished: Function returning True once all sessions have finished.
+    :type isFinished: func() -> bool
+    :param pollInterval: Time in seconds between log file reads, defaults to DEFAULT_POLL_INTERVAL
+    :type pollInterval: int, optional
+    :param idleTimeout: Time in seconds after which to stop if no log file changed, defaults to DEFAULT_IDLE_TIMEOUT
+    :type idleTimeout: int, optional
+
+    :return: Generator of results in format:
+        [log file path, [processed Revit file name, status of processing (true or false), message]]
+    :rtype: generator [str, [str, bool, str]]
+    '''
+
+    checkpoints = ReadCheckpoints(checkpointFilePath)
+    followers = {}
+    lastChange = time.time()
+    finished = False
+    while(not finished):
+        # check before reading, so rows written just before the sessions finished are read
+        finished = isFinished()
+        for filePath in getLogFiles():
+            if(filePath not in followers):
+                followers[filePath] = GetFollower(filePath, checkpoints)
+        changed = False
+        for filePath in followers:
+            offset = followers[filePath].offset
+            for result in followers[filePath].Read():
+                yield [filePath, result]
+            changed = changed or offset != followers[filePath].offset
+        if(changed):
+            lastChange = time.time()
+            WriteCheckpoints(checkpointFilePath, followers.values())
+        if(time.time() - lastChange > idleTimeout):
+            logUtils.Output('No log file changed in ' + str(idleTimeout) + ' seconds.')
+            finished = True
+        if(not finished):
+            time.sleep(pollInterval)
+    # close any blocks left open by sessions which terminated unexpectedly
+    for filePath in followers:
+        for result in followers[filePath].Finish():
+            yield [filePath, result]
+    WriteCheckpoints(checkpointFilePath, followers.values())
+
+def FollowSessionLogFiles(folderPath, checkpointFilePath, isFinished, pollInterval = DEFAULT_POLL_INTERVAL, idleTimeout = DEFAULT_IDLE_TIMEOUT, logFileRoot = None):
+    '''
+    Follows the log files of all sessions which wrote a marker file into the given directory.
+
+    Marker files are not deleted, so :func:`BatchProcessorLogUtils.ProcessLogFiles` can still be run once all sessions have finished.
+
+    :param folderPath: Fully qualified directory path where marker files are stored.
+    :type folderPath: str
+    :param checkpointFilePath: The fully qualified file path of the checkpoint file.
+    :type checkpointFilePath: str
+    :param isFinished: Function returning True once all sessions have finished.
+    :type isFinished: func() -> bool
+    :param pollInterval: Time in seconds between log file reads, defaults to DEFAULT_POLL_INTERVAL
+    :type pollInterval: int, optional
+    :param idleTimeout: Time in seconds after which to stop if no log file changed, defaults to DEFAULT_IDLE_TIMEOUT
+    :type idleTimeout: int, optional
+    :param logFileRoot: The directory containing the log files, defaults to None which is %LOCALAPPDATA%\\BatchRvt
+    :type logFileRoot: str, optional
+
+    :return: Generator of results in format:
+        [log file path, [processed Revit file name, status of processing (true or false), message]]
+    :rtype: generator [str, [str, bool, str]]
+    '''
+
+    def getLogFiles():
+        markerfileIds = logUtils.GetCurrentSessionIds(folderPath, False)
+        if(len(markerfileIds) == 0):
+            return []
+        return logUtils.GetLogFiles(markerfileIds, logFileRoot)
+
+    return FollowLogFiles(getLogFiles, checkpointFilePath, isFinished, pollInterval, idleTimeout)
@@ -62,6 +62,8 @@ import json
 import Result as res
 # library from commonlibraryDebugLocation_
 import Utility as util
+import BatchProcessorLogExceptions as logExceptions
+import UtilParallel as parallel
 
 #: global variable controlling debug output
 debugMode_ = False
@@ -75,10 +77,46 @@ EXCEPTION_MESSAGES = [
     'Script Exception:' # custom script message...something the script was meant to do failed
 ]
 
+#: Message indicating the start of the list of Revit files to be processed in a session
+FILE_LIST_START_MARKER = 'Revit Files for processing'
+#: Messages indicating the end of the list of Revit files to be processed in a session
+FILE_LIST_END_MARKERS = ['Starting batch operation...']
+#: Message indicating the start of the processing of a single Revit file
+FILE_PROCESSING_START_MARKER = '\t- Processing file ('
+#: Messages indicating the end of the processing of a single Revit file
+FILE_PROCESSING_END_MARKERS = ['\t- Task script operation completed.','\t- Operation aborted.']
+#: Message indicating the task script started executing within a file processing block (the file is open at that point)
+FILE_PROCESSING_SCRIPT_START_MARKERS = ['\t- Task script operation started.']
+#: Format of the date and time fields in a log file row (refer to :func:`GetUtcTimeFromJson`)
+LOG_DATE_TIME_FORMAT = '%d/%m/%Y %H:%M:%S'
+#: Number of rows of a file processing block checked for exception messages in one go
+EXCEPTION_CHECK_ROWS = 256
+
+# exception matcher build from EXCEPTION_MESSAGES, refer to GetExceptionMatcher()
+exceptionMatcher_ = None
+exceptionMatcherMessages_ = None
+
 # output...
 def Output(message = ''):
     if debugMode_:
         print (message)
+
+def GetExceptionMatcher():
+    '''
+    Returns an exception matcher for the messages in EXCEPTION_MESSAGES.
+
+    The matcher is rebuild if EXCEPTION_MESSAGES got changed since the last call.
+
+    :return: An exception matcher.
+    :rtype: :class:`BatchProcessorLogExceptions.ExceptionMatcher`
+    '''
+
+    global exceptionMatcher_
+    global exceptionMatcherMessages_
+    if(exceptionMatcher_ is None or exceptionMatcherMessages_ != EXCEPTION_MESSAGES):
+        exceptionMatcher_ = logExceptions.GetExceptionMatcher(EXCEPTION_MESSAGES)
+        exceptionMatcherMessages_ = list(EXCEPTION_MESSAGES)
+    return exceptionMatcher_
         
 def AdjustSessionIdForFileName(id):
     '''
@@ -141,14 +179,16 @@ def WriteSessionIdMarkerFile(folderPath, sessionId):
         status = False
     return status
 
-def GetCurrentSessionIds(folderPath):
+def GetCurrentSessionIds(folderPath, deleteMarkerFiles = True):
     '''
     Returs file names of all text files in a given directory representing session Ids.
 
-    Files will be deleted immediately after reading
+    Files will be deleted immediately after reading (unless deleteMarkerFiles is False)
 
     :param folderPath: Directory of where test files are located
     :type folderPath: str
+    :param deleteMarkerFiles: Flag indicating whether marker files are deleted after reading, defaults to True
+    :type deleteMarkerFiles: bool, optional
 
     :return: A list of ids in string format.
     :rtype: [str]
@@ -158,7 +198,7 @@ def GetCurrentSessionIds(folderPath):
     # delete marker files
     resultDelete = True
     for fd in file_list:
-        if(debugMode_ == False):
+        if(debugMode_ == False and deleteMarkerFiles):
             resultDelete = resultDelete & util.FileDelete(fd)
     if(not resultDelete):
         Output ('Failed to delete a marker file!')
@@ -166,12 +206,146 @@ def GetCurrentSessionIds(folderPath):
         ids.append(AdjustSessionIdFileNameBack(Path.GetFileNameWithoutExtension(f)))
     return ids
 
-def GetLogFiles(listOfSessionIds):
+#: File name of the session id index stored in the log file directory
+SESSION_ID_INDEX_FILE_NAME = 'SessionIdIndex.json'
+
+def GetLogFileRoot():
+    '''
+    Returns the default directory batch processor writes its session log files to.
+
+    :return: The directory path: %LOCALAPPDATA%\\BatchRvt
+    :rtype: str
+    '''
+
+    return os.path.join(os.getenv('LOCALAPPDATA'),'BatchRvt')
+
+def ReadSessionIdIndex(indexFilePath):
+    '''
+    Reads the session id index from file.
+
+    The index is a json formatted dictionary where:
+
+    - key is the fully qualified log file path
+    - value is a dictionary with the keys 'sessionId', 'mtime' and 'size'
+
+    :param indexFilePath: The fully qualified file path of the index file.
+    :type indexFilePath: str
+
+    :return: The index. If the file does not exist or can not be read an empty dictionary.
+    :rtype: dic
+    '''
+
+    index = {}
+    try:
+        if(os.path.exists(indexFilePath)):
+            with open(indexFilePath, 'r') as f:
+                index = json.load(f)
+    except Exception as e:
+        Output('Failed to read session id index: ' + str(e))
+        index = {}
+    return index
+
+def WriteSessionIdIndex(indexFilePath, index):
+    '''
+    Writes the session id index to file.
+
+    The index is written to a temp file first, which then replaces any existing index file (refer to :func:`Utility.ReplaceFile`):\
+        a session reading the index never sees a partly written or missing file.
+
+    :param indexFilePath: The fully qualified file path of the index file.
+    :type indexFilePath: str
+    :param index: The session id index.
+    :type index: dic
+
+    :return: True if index was written succesfully, otherwise False.
+    :rtype: bool
+    '''
+
+    status = True
+    tempFilePath = indexFilePath + '.tmp'
+    try:
+        with open(tempFilePath, 'w') as f:
+            json.dump(index, f)
+        util.ReplaceFile(tempFilePath, indexFilePath)
+    except Exception as e:
+        Output('Failed to write session id index: ' + str(e))
+        status = False
+    return status
+
+def GetSessionIdFromIndex(index, filePath, fileTime, fileSize):
+    '''
+    Returns the session id of a log file from the index. The log file is only read if it is not in the index yet, or\
+        if it changed since it was indexed. The index gets updated accordingly.
+
+    :param index: The session id index.
+    :type index: dic
+    :param filePath: Fully qualified file path to log file
+    :type filePath: str
+    :param fileTime: The last modified time of the log file.
+    :type fileTime: float
+    :param fileSize: The size of the log file.
+    :type fileSize: int
+
+    :return: The session id, or if not not a log file: an empty string.
+    :rtype: str
+    '''
+
+    entry = index.get(filePath)
+    if(entry is not None and entry['mtime'] == fileTime and entry['size'] == fileSize):
+        return entry['sessionId']
+    retrievedId = GetSessionIdFromLogFile(filePath)
+    # a log file which got just created may not contain the session id yet...
+    if(retrievedId != ''):
+        index[filePath] = {'sessionId': retrievedId, 'mtime': fileTime, 'size': fileSize}
+    return retrievedId
+
+def GetLogFilesFromIndex(listOfSessionIds, index, timeNow, timeOut):
+    '''
+    Returns log files matching the provided session Ids using the index only.
+
+    :param listOfSessionIds: List of session ids.
+    :type listOfSessionIds: [str]
+    :param index: The session id index.
+    :type index: dic
+    :param timeNow: The current time (epoch).
+    :type timeNow: float
+    :param timeOut: Log files older than this value (seconds) are ignored.
+    :type timeOut: int
+
+    :return: List of fully qualified file path. None if not all session ids are in the index.
+    :rtype: [str]
+    '''
+
+    logfilesById = {}
+    for filePath in index:
+        logfilesById[index[filePath]['sessionId']] = filePath
+    logfiles = []
+    for idtoMatch in listOfSessionIds:
+        if(idtoMatch not in logfilesById):
+            return None
+        filePath = logfilesById[idtoMatch]
+        try:
+            if(timeNow - os.path.getmtime(filePath) >= timeOut):
+                return None
+        except Exception:
+            # log file got deleted
+            return None
+        logfiles.append(filePath)
+    return sorted(logfiles)
+
+def GetLogFiles(listOfSessionIds, logFileRoot = None, useIndex = True):
     '''
     Returns a list of fully qualified filepath to logfiles matching the provided session Ids.
 
+    Session ids of log files are cached in an index file (refer to SESSION_ID_INDEX_FILE_NAME) in the log file directory.\
+        Log files are only opened if they are not in the index yet or changed since.
+
     :param listOfSessionIds: List of session ids.
     :type listOfSessionIds: [str]
+    :param logFileRoot: The directory containing the log files, defaults to None which is %LOCALAPPDATA%\\BatchRvt
+    :type logFileRoot: str, optional
+    :param useIndex: Flag indicating whether to use the session id index, defaults to True
+    :type useIndex: bool, optional
 
     :return: List of fully qualified file path.
     :rtype: [str]
@@ -179,24 +353,42 @@ def GetLogFiles(listOfSessionIds):
 
     # save the current file in epoch
     timeNow = time.time()
-    fileList = glob.glob(os.path.join(os.getenv('LOCALAPPDATA'),'BatchRvt') + '\\*' + '.log')
+    # 24 hr are 86400 seconds
+    timeOut = 86400
+    if debugMode_ == True:
+        timeOut = 8640000
+    if(logFileRoot is None):
+        logFileRoot = GetLogFileRoot()
+    index = {}
+    indexStored = {}
+    indexFilePath = os.path.join(logFileRoot, SESSION_ID_INDEX_FILE_NAME)
+    if(useIndex):
+        index = ReadSessionIdIndex(indexFilePath)
+        indexStored = dict(index)
+        # check whether all log files are known already
+        logfiles = GetLogFilesFromIndex(listOfSessionIds, index, timeNow, timeOut)
+        if(logfiles is not None):
+            return logfiles
+    fileList = glob.glob(os.path.join(logFileRoot, '*.log'))
     logfiles = []
+    updatedIndex = {}
     if len(fileList) > 0:
         for l in fileList:
             # check whether file is older than 24h
             fileTime = os.path.getmtime(l)
-            # 24 hr are 86400 seconds
-            timeOut = 86400
-            if debugMode_ == True:
-                timeOut = 8640000
             if timeNow - fileTime < timeOut:
-                # read the first two rows of the file to get the id
-                idstring = GetSessionIdFromLogFile(l)
+                # read the first two rows of the file to get the id (unless in index already)
+                idstring = GetSessionIdFromIndex(index, l, fileTime, os.path.getsize(l))
+                if(l in index):
+                    updatedIndex[l] = index[l]
                 for idtoMatch in listOfSessionIds:
                     if idtoMatch == idstring:
                         logfiles.append(l)
             else:
                 Output('File is to old: ' + str(l))
+    # store index (this drops any log files which got deleted or are to old)
+    if(useIndex and updatedIndex != indexStored):
+        WriteSessionIdIndex(indexFilePath, updatedIndex)
     return logfiles
 
 def GetSessionIdFromLogFile(filePath):
@@ -282,6 +474,26 @@ def GetMessageFromJson(data):
     outerMessage = data['message']
     return outerMessage['message']
 
+def GetUtcTimeFromJson(data):
+    '''
+    Returns the utc date and time from json formatted row in log file.
+
+    sample: 
+    {"date":{"local":"17/12/2020","utc":"17/12/2020"},"time":{"local":"16:49:27","utc":"05:49:27"},"sessionId":"235e2180-dc33-4d61-8773-1005a59344c0","message":{"msgId":"","message":"Session ID: <2020-12-17T05:49:27.559Z>"}}
+
+    :param data: json formatted row of logfile
+    :type data: str
+
+    :return: The utc date and time, or None if it could not be read.
+    :rtype: datetime.datetime
+    '''
+
+    try:
+        return datetime.datetime.strptime(data['date']['utc'] + ' ' + data['time']['utc'], LOG_DATE_TIME_FORMAT)
+    except Exception as e:
+        Output('GetUtcTimeFromJson: ' + str(e))
+        return None
+
 def ProcessLogFile(filePath):
     '''
     Process revit batch processoor session log file.
@@ -292,6 +504,8 @@ def ProcessLogFile(filePath):
     :param filePath: Fully qualified file path to json formated log file
     :type filePath: str
 
+    The log file is read once only. Refer to :func:`ParseLogFile`.
+
     :return: returns list of arrays in format:
         [[processed Revit file name, status of processing (true or false), message]]
     :rtype: [[str]]
@@ -300,7 +514,13 @@ def ProcessLogFile(filePath):
     filesProcessStatus = []
     # get all files processed
     try:
-        filesProcessed = GetFilesProcessed(filePath)
+        # read the log file once only
+        parser = ParseLogFile(filePath)
+        filesProcessed = parser.filesProcessed
+        # if a file got processed more than once the last block wins (same as GetProcessStatus)
+        recordsByFile = {}
+        for record in parser.records:
+            recordsByFile[record.fileName] = record
         # check whether any file not founds came back
         try:
             filesNotFound = GetFilesNotFound(filesProcessed)
@@ -310,7 +530,7 @@ def ProcessLogFile(filePath):
                 # check for exceptions during file processing
                 for fileToCheck in filesToCheck:
                     try:
-                        status, message = GetProcessStatus(fileToCheck, filePath)
+                        status, message = GetProcessStatusFromRecord(recordsByFile.get(fileToCheck))
                     except Exception as e:
                         Output ('GetProcessStatus: ' + str(e))
                     dummy = [fileToCheck, status, message]
@@ -366,8 +586,9 @@ def GetProcessStatus(fileToCheck, logFilePath):
     foundMatch = False
     jsonData = ReadLogFile(logFilePath)
     # get data block showing how each file was processed
-    unformattedRevitFileProcessMessages = GetLogBlocks(jsonData, '\t- Processing file (', ['\t- Task script operation completed.','\t- Operation aborted.'], True)
+    unformattedRevitFileProcessMessages = GetLogBlocks(jsonData, FILE_PROCESSING_START_MARKER, FILE_PROCESSING_END_MARKERS, True)
     processStatus = True
+    matcher = GetExceptionMatcher()
     # loop over messages in this block and check for time out, and exception messages
     for mblock in  unformattedRevitFileProcessMessages:
         # check if right file the file name
@@ -381,12 +602,10 @@ def GetProcessStatus(fileToCheck, logFilePath):
             for m in mblock:
                 Output(m)
                 # check for exceptions
-                for exceptionMessage in EXCEPTION_MESSAGES:
-                    if(exceptionMessage in m):
-                        processStatus = False
-                        foundProblem = True
-                        message = [m.strip()]
-                        break
+                if(matcher.Match(m) is not None):
+                    processStatus = False
+                    foundProblem = True
+                    message = [m.strip()]
             if (foundProblem == False):
                 message = '[ok]'
                 processStatus = True
@@ -411,11 +630,11 @@ def GetFileNameFromDataBlock(mblock):
     if('CLOUD MODEL' in mblock[0]):
         #['\t- Processing file (1 of 1): CLOUD MODEL', '\t- ', '\t- \tProject ID: GUID', '\t- \tModel ID: GUID',...]
         messageStarter = '\t- \t'
-        fileName = mblock[3].Trim()[len(messageStarter)-1:]
+        fileName = mblock[3].strip()[len(messageStarter)-1:]
     else:
         # ["\t- Processing file (x of y): file path"}},...]
         messageStarter = '\t- Processing file (x of y): '
-        fileName = mblock[0].Trim()[len(messageStarter)-1:]
+        fileName = mblock[0].strip()[len(messageStarter)-1:]
     return fileName
 
 def GetFilesProcessed(filePath):
@@ -453,25 +672,40 @@ def GetFilesProcessed(filePath):
     jsonData = ReadLogFile(filePath)
     # get data block showing which files are to be processed
     # there should just be one ...
-    logBlocks = GetLogBlocks(jsonData, 'Revit Files for processing', ['Starting batch operation...'], False)
+    logBlocks = GetLogBlocks(jsonData, FILE_LIST_START_MARKER, FILE_LIST_END_MARKERS, False)
     if(len(logBlocks) > 0):
-        unformattedRevitFileProcessMessages = logBlocks[0]
-        # parse data block and get list of files and file exists status
-        # each file block is proceeded by an empty message row
-        # last entry is also an empty message block!
-        for x in range(len(unformattedRevitFileProcessMessages)):
-            # check for start of data block 
-            # Output('unformatted messages '+str(unformattedRevitFileProcessMessages))
-            if(unformattedRevitFileProcessMessages[x] == '' and x + 3 <= len(unformattedRevitFileProcessMessages)):
-                # check whether cloud model or file server model
-                if('CLOUD MODEL' in unformattedRevitFileProcessMessages[x + 1]):
-                    # get file data from next two rows
-                    # substitute file name with file GUID, fake the status always exists
-                    dummy = [unformattedRevitFileProcessMessages[x + 3],'File exists: YES']
-                else:
-                    # get file data from next two rows
-                    dummy = [unformattedRevitFileProcessMessages[x + 1],unformattedRevitFileProcessMessages[x + 2]]
-                listOfFiles.append(GetFileData(dummy))
+        listOfFiles = GetFilesFromFileListBlock(logBlocks[0])
+    return listOfFiles
+
+def GetFilesFromFileListBlock(unformattedRevitFileProcessMessages):
+    '''
+    Parses the messages of the log block listing the files to be processed.
+
+    :param unformattedRevitFileProcessMessages: The messages of the file list block.
+    :type unformattedRevitFileProcessMessages: [str]
+
+    :return: a list lists containing The fully qualified file path for each file processed and their process status. True for no exception encountered, otherwise false.
+        [[filepath, status]]
+    :rtype: [[str, bool]]
+    '''
+
+    listOfFiles = []
+    # parse data block and get list of files and file exists status
+    # each file block is proceeded by an empty message row
+    # last entry is also an empty message block!
+    for x in range(len(unformattedRevitFileProcessMessages)):
+        # check for start of data block
+        # Output('unformatted messages '+str(unformattedRevitFileProcessMessages))
+        if(unformattedRevitFileProcessMessages[x] == '' and x + 3 <= len(unformattedRevitFileProcessMessages)):
+            # check whether cloud model or file server model
+            if('CLOUD MODEL' in unformattedRevitFileProcessMessages[x + 1]):
+                # get file data from next two rows
+                # substitute file name with file GUID, fake the status always exists
+                dummy = [unformattedRevitFileProcessMessages[x + 3],'File exists: YES']
+            else:
+                # get file data from next two rows
+                dummy = [unformattedRevitFileProcessMessages[x + 1],unformattedRevitFileProcessMessages[x + 2]]
+            listOfFiles.append(GetFileData(dummy))
     return listOfFiles
 
 # method parsing two rows of json formatted data
@@ -488,7 +722,7 @@ def GetFilesProcessed(filePath):
 # [filename, file exists status as bool]
 def GetFileData(data):
     # trim white spaces from file name
-    fileName = data[0].Trim()
+    fileName = data[0].strip()
     filestatus = False
     # check whether file status contains a YES or whether this is a cloud model 
     # (RBP does not check upfront whether a cloud model exists!)
@@ -586,17 +820,280 @@ def ReadLogFile(filePath):
             data.append(json.loads(line))
     return data
 
-def ProcessLogFiles(folderPath, debug = False):
+class LogFileRecord:
+    def __init__(self, startRow):
+        '''
+        Class constructor.
+
+        Stores the outcome of processing a single Revit file as recorded in a batch processor session log file.
+
+        :param startRow: The row number (starting at 1) in the log file at which the file processing block starts.
+        :type startRow: int
+        '''
+
+        self.fileName = ''
+        self.status = True
+        self.failures = []
+        self.startRow = startRow
+        # utc times of the first row, the task script start row (if any) and the last row of the block
+        self.startTime = None
+        self.scriptStartTime = None
+        self.endTime = None
+        self.endRow = startRow
+        self.isClosed = False
+
+    @property
+    def exceptionMessages(self):
+        '''
+        Property: returns all exception messages recorded in the file processing block.
+
+        :return: List of exception messages in order of occurence.
+        :rtype: [str]
+        '''
+
+        return [failure.message for failure in self.failures]
+
+    @property
+    def message(self):
+        '''
+        Property: returns the first exception message recorded in the file processing block.
+
+        :return: The first exception message, or an empty string if none was recorded.
+        :rtype: str
+        '''
+
+        if(len(self.failures) > 0):
+            return self.failures[0].message
+        return ''
+
+    def GetMostSevereFailure(self):
+        '''
+        Returns the most severe failure recorded in the file processing block.
+
+        :return: The most severe classified failure, or None if no failure was recorded.
+        :rtype: :class:`BatchProcessorLogExceptions.ClassifiedFailure`
+        '''
+
+        return logExceptions.GetMostSevereFailure(self.failures)
+
+class LogFileParser:
+    def __init__(self, skipFileList = False):
+        '''
+        Class constructor.
+
+        A state machine reading batch processor log rows one at a time. It collects:
+
+        - the list of files to be processed (block starting with FILE_LIST_START_MARKER)
+        - a :class:`.LogFileRecord` per file processing block (block starting with FILE_PROCESSING_START_MARKER)
+
+        Block detection mirrors :func:`GetLogBlocks` so results match the multi pass functions in this module.
+
+        :param skipFileList: Flag indicating whether the file list block was processed already (i.e. when resuming a log file part way through), defaults to False
+        :type skipFileList: bool, optional
+        '''
+
+        self.filesProcessed = []
+        self.records = []
+        self.rowCounter = 0
+        # file list block: 0 not started yet, 1 reading, 2 done
+        self._fileListState = 0
+        if(skipFileList):
+            self._fileListState = 2
+        self._fileListMessages = []
+        # file processing block currently open (None if no block is open)
+        self._record = None
+        # first rows of the open block, required to extract the file name
+        self._recordHead = []
+        # rows of the open block not yet checked for exception messages
+        self._recordRows = []
+        # last json row of the open block, its time is used if the block does not get closed
+        self._recordLastRow = None
+        self._waitForScriptStart = False
+        self._matcher = GetExceptionMatcher()
+        self._endMarkers = tuple(FILE_PROCESSING_END_MARKERS)
+        self._scriptStartMarkers = tuple(FILE_PROCESSING_SCRIPT_START_MARKERS)
+
+    def ProcessRow(self, data):
+        '''
+        Processes a single json formatted log file row.
+
+        :param data: A log file row loaded from json.
+        :type data: dict
+
+        :return: Any file processing records closed by this row.
+        :rtype: [:class:`.LogFileRecord`]
+        '''
+
+        self.rowCounter += 1
+        messageString = GetMessageFromJson(data)
+        if(self._fileListState != 2):
+            self._ProcessFileListRow(messageString)
+        return self._ProcessFileBlockRow(messageString, data)
+
+    @property
+    def fileListDone(self):
+        '''
+        Property: returns whether the file list block has been processed.
+
+        :return: True if the file list block has been processed, otherwise False.
+        :rtype: bool
+        '''
+
+        return self._fileListState == 2
+
+    def IsIdle(self):
+        '''
+        Checks whether the parser is in between blocks, i.e. no block is currently open.
+
+        :return: True if no block is open, otherwise False.
+        :rtype: bool
+        '''
+
+        return self._fileListState != 1 and self._record is None
+
+    def Finish(self):
+        '''
+        Closes any block still open at the end of the log file. 
+        
+        Open blocks are kept, same as :func:`GetLogBlocks` does...hopefully there is an exception message in there!
+
+        :return: Any file processing records closed by this call.
+        :rtype: [:class:`.LogFileRecord`]
+        '''
+
+        if(self._fileListState == 1):
+            self._CloseFileList()
+        closed = []
+        if(self._record is not None):
+            self._record.endRow = self.rowCounter
+            if(self._recordLastRow is not None):
+                self._record.endTime = GetUtcTimeFromJson(self._recordLastRow)
+            closed.append(self._CloseRecord())
+        return closed
+
+    def _ProcessFileListRow(self, messageString):
+        if(self._fileListState == 0 and messageString.startswith(FILE_LIST_START_MARKER)):
+            self._fileListState = 1
+        if(self._fileListState == 1):
+            for endMarker in FILE_LIST_END_MARKERS:
+                if(messageString.startswith(endMarker)):
+                    self._CloseFileList()
+                    return
+            self._fileListMessages.append(messageString)
+
+    def _CloseFileList(self):
+        self._fileListState = 2
+        self.filesProcessed = GetFilesFromFileListBlock(self._fileListMessages)
+        self._fileListMessages = []
+
+    def _ProcessFileBlockRow(self, messageString, data):
+        if(self._record is None):
+            if(not messageString.startswith(FILE_PROCESSING_START_MARKER)):
+                return []
+            self._record = LogFileRecord(self.rowCounter)
+            self._record.startTime = GetUtcTimeFromJson(data)
+            self._recordHead = []
+            self._waitForScriptStart = True
+        self._recordLastRow = data
+        if(messageString.startswith(self._endMarkers)):
+            self._record.endRow = self.rowCounter
+            self._record.endTime = GetUtcTimeFromJson(data)
+            return [self._CloseRecord()]
+        if(self._waitForScriptStart and messageString.startswith(self._scriptStartMarkers)):
+            self._record.scriptStartTime = GetUtcTimeFromJson(data)
+            self._waitForScriptStart = False
+        # only the first few rows are required to get the file name (cloud models use row 4)
+        if(len(self._recordHead) < 4):
+            self._recordHead.append(messageString)
+        # exception messages are checked in chunks of rows rather than row by row
+        self._recordRows.append(messageString)
+        if(len(self._recordRows) >= EXCEPTION_CHECK_ROWS):
+            self._CheckRecordRows()
+        return []
+
+    def _CheckRecordRows(self):
+        failures = self._matcher.MatchAll(self._recordRows)
+        if(len(failures) > 0):
+            self._record.status = False
+            self._record.failures = self._record.failures + failures
+        self._recordRows = []
+
+    def _CloseRecord(self):
+        self._CheckRecordRows()
+        record = self._record
+        try:
+            record.fileName = GetFileNameFromDataBlock(self._recordHead)
+        except Exception as e:
+            Output ('GetFileNameFromDataBlock: ' + str(e))
+        record.isClosed = True
+        self.records.append(record)
+        self._record = None
+        self._recordHead = []
+        self._recordRows = []
+        self._recordLastRow = None
+        return record
+
+def ParseLogFile(filePath):
+    '''
+    Reads a batch processor log file once, row by row, and returns a parser instance holding the files to be processed\
+        and a record per file processed.
+
+    :param filePath: The fully qualified file path to log file in json format
+    :type filePath: str
+
+    :return: A log file parser instance with all rows processed.
+    :rtype: :class:`.LogFileParser`
+    '''
+
+    parser = LogFileParser()
+    with open(filePath) as f:
+        for line in f:
+            parser.ProcessRow(json.loads(line))
+    parser.Finish()
+    return parser
+
+def GetProcessStatusFromRecord(record):
+    '''
+    Converts a log file record into the process status and message format returned by :func:`GetProcessStatus`.
+
+    :param record: A log file record, or None if no record for the file was found.
+    :type record: :class:`.LogFileRecord`
+
+    :return: A process status and a message.
+
+        - process staus: True if no exception occured during revit file processing, otherwise false
+        - message: the exception message recorded in the log file.
+
+    :rtype: bool, str
+    '''
+
+    if(record is None):
+        return False, '[Failed to retrieve processing data for file.]'
+    if(record.status):
+        return True, '[ok]'
+    # GetProcessStatus reports the last exception message found in a block
+    return False, [record.exceptionMessages[-1].strip()]
+
+def ProcessLogFiles(folderPath, debug = False, logFileRoot = None, maxWorkers = 1):
     '''
     Loops over log files and checks whether any exceptions occured during revit files processing.
 
+    Log files are independent of each other and can be processed in parallel. Results are always returned in order of the log files.
+
     :param folderPath: Fully qualified directory path where marker files are stored.
     :type folderPath: str
     :param debug: Flag indicating whether this is running in debug mode which will output some debug messages, defaults to False
     :type debug: bool, optional
+    :param logFileRoot: The directory containing the log files, defaults to None which is %LOCALAPPDATA%\\BatchRvt
+    :type logFileRoot: str, optional
+    :param maxWorkers: The number of log files processed in parallel, defaults to 1 (one after another).\
+        Use 0 for one log file per processor.
+    :type maxWorkers: int, optional
 
     :return: List of lists of revit files processed in format:
         [logId,[processed Revit file name, status of processing (true or false), message]]
+
+        The processed Revit files are also returned in .result in format [[processed Revit file name, status of processing (true or false), message]]
     :rtype: [str,[str, bool, str]]
     '''
 
@@ -610,24 +1107,25 @@ def ProcessLogFiles(folderPath, debug = False):
             returnvalue.AppendMessage('Found marker file(s): ' + str(len(markerfileIds)))
         if(len(markerfileIds) > 0):
             # find log files matching markers
-            logfiles = GetLogFiles(markerfileIds)
+            logfiles = GetLogFiles(markerfileIds, logFileRoot)
             if(debugMode_):
                 returnvalue.AppendMessage('Found log file(s): ' + str(len(logfiles)))
             if(len(logfiles) == len(markerfileIds)):
-                data = []
-                for lf in logfiles:
+                logfileData = parallel.MapInParallel(ProcessLogFile, logfiles, maxWorkers)
+                for lf, lfData in zip(logfiles, logfileData):
                     # debug output
                     message = 'Processing log file(s): ' + lf
                     #returnvalue.AppendMessage('Processing log files: ' + lf)
-                    try:
-                        data = ProcessLogFile(lf)
+                    data, exception = lfData
+                    if(exception is None):
                         if (len(data) > 0):
                             message = message + ' [Got processed Revit file(s) data: ' + str(len(data)) +']'
                         else:
                             # dummy run no files processed!
                             message = message + ' [No Revit file(s) processed!]'
-                    except Exception as e:
-                        message = message + ' [An exception occured: ' + str(e) + ']'
+                    else:
+                        data = []
+                        message = message + ' [An exception occured: ' + str(exception) + ']'
                     if(debugMode_):
                         returnvalue.AppendMessage(message)
                     for d in data:
@@ -638,6 +1136,7 @@ def ProcessLogFiles(folderPath, debug = False):
                 for lfResults in logfileResults:
                     listToStr = '\t'.join(map(str, lfResults)) 
                     returnvalue.AppendMessage(listToStr)
+                    returnvalue.result.append(lfResults)
                 returnvalue.status = True
             else:
                 returnvalue.UpdateSep(False,'Number of log files [' + str(len(logfiles)) + '] does not match requried number: ' + str(len(markerfileIds))) 
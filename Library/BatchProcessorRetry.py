@@ -0,0 +1,296 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Helper functions to keep track of Revit files which failed to process and to retry them in later batch processor sessions.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Processing results (refer to :func:`BatchProcessorLogUtils.ProcessLogFiles`) are added to a retry state file after each session:
+
+- a file which processed successfully is removed from the retry state
+- a file which failed gets its number of attempts increased. After the first failure a file can be retried straight away,\
+    after that only once a back off time has passed, which doubles with every failed attempt (exponential back off)
+- a file which failed permanently (i.e. file not found) is never retried
+
+Files are retried until the maximum number of retries is reached.
+
+The retry state file is a tab separated text file, one row per file:
+
+- normalised file path
+- number of failed attempts
+- utc time of the last failed attempt (ISO format)
+- utc time before which the file is not retried (ISO format)
+- permanent failure flag (True or False)
+- last failure message
+- fully qualified file path
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import os
+import datetime
+
+import Utility as util
+import BatchProcessorLogUtils as logUtils
+
+#: Header row of the retry state file
+RETRY_STATE_HEADER = ['Key', 'Attempts', 'LastAttemptUtc', 'NextAttemptUtc', 'Permanent', 'Message', 'FilePath']
+#: Format of times in the retry state file
+RETRY_STATE_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+#: Default number of times a failed file is retried
+DEFAULT_MAX_RETRIES = 3
+#: Default back off time in seconds after the second failed attempt
+DEFAULT_BACKOFF_SECONDS = 900
+#: Default maximum back off time in seconds
+DEFAULT_MAX_BACKOFF_SECONDS = 86400
+#: Failure messages indicating retrying the file will not help
+PERMANENT_FAILURE_MESSAGES = [
+    'File not found'
+]
+
+class RetryRecord:
+    def __init__(self, filePath, attempts, lastAttemptTime, nextAttemptTime, permanent = False, message = ''):
+        '''
+        Class constructor.
+
+        :param filePath: The fully qualified file path of the Revit file.
+        :type filePath: str
+        :param attempts: The number of failed attempts to process the file.
+        :type attempts: int
+        :param lastAttemptTime: The utc time of the last failed attempt.
+        :type lastAttemptTime: datetime.datetime
+        :param nextAttemptTime: The utc time before which the file is not retried.
+        :type nextAttemptTime: datetime.datetime
+        :param permanent: Flag indicating whether the file failed permanently and is never retried, defaults to False
+        :type permanent: bool, optional
+        :param message: The last failure message, defaults to ''
+        :type message: str, optional
+        '''
+
+        self.key = util.NormaliseFilePath(filePath)
+        self.filePath = filePath
+        self.attempts = attempts
+        self.lastAttemptTime = lastAttemptTime
+        self.nextAttemptTime = nextAttemptTime
+        self.permanent = permanent
+        self.message = message
+
+    def GetRow(self):
+        '''
+        Returns this record as a retry state file row.
+
+        :return: List of values in order of RETRY_STATE_HEADER
+        :rtype: [str]
+        '''
+
+        return [
+            self.key,
+            str(self.attempts),
+            self.lastAttemptTime.strftime(RETRY_STATE_TIME_FORMAT),
+            self.nextAttemptTime.strftime(RETRY_STATE_TIME_FORMAT),
+            str(self.permanent),
+            # keep one row per file
+            self.message.replace('\t', ' ').replace('\r', ' ').replace('\n', ' '),
+            self.filePath
+        ]
+
+def ReadRetryState(stateFilePath):
+    '''
+    Reads the retry state from file.
+
+    Rows which can not be read are ignored.
+
+    :param stateFilePath: The fully qualified file path of the retry state file.
+    :type stateFilePath: str
+
+    :return: Dictionary where key is the normalised file path and value the retry record. Empty if the file does not exist.
+    :rtype: {str: :class:`.RetryRecord`}
+    '''
+
+    state = {}
+    if(not os.path.exists(stateFilePath)):
+        return state
+    with open(stateFilePath, 'r') as f:
+        # skip header
+        f.readline()
+        for line in f:
+            row = line.rstrip('\r\n').split('\t')
+            if(len(row) < len(RETRY_STATE_HEADER)):
+                continue
+            try:
+                record = RetryRecord(
+                    row[6],
+                    int(row[1]),
+                    datetime.datetime.strptime(row[2], RETRY_STATE_TIME_FORMAT),
+                    datetime.datetime.strptime(row[3], RETRY_STATE_TIME_FORMAT),
+                    row[4] == 'True',
+                    row[5]
+                )
+                state[record.key] = record
+            except Exception as e:
+                logUtils.Output('Failed to read retry state row: ' + line + ' ' + str(e))
+    return state
+
+def WriteRetryState(stateFilePath, state):
+    '''
+    Writes the retry state to file, replacing any existing file.
+
+    The state is written to a temp file first, which then replaces any existing state file (refer to :func:`Utility.ReplaceFile`).
+
+    :param stateFilePath: The fully qualified file path of the retry state file.
+    :type stateFilePath: str
+    :param state: Dictionary where key is the normalised file path and value the retry record.
+    :type state: {str: :class:`.RetryRecord`}
+    '''
+
+    tempFilePath = stateFilePath + '.tmp'
+    with open(tempFilePath, 'w') as f:
+        f.write('\t'.join(RETRY_STATE_HEADER) + '\n')
+        for key in sorted(state):
+            f.write('\t'.join(state[key].GetRow()) + '\n')
+    util.ReplaceFile(tempFilePath, stateFilePath)
+
+def GetMessageText(message):
+    '''
+    Returns a processing result message as text.
+
+    :param message: A message as returned by :func:`BatchProcessorLogUtils.ProcessLogFile`: either a string or a list of strings.
+    :type message: str or [str]
+
+    :return: The message text.
+    :rtype: str
+    '''
+
+    if(isinstance(message, list)):
+        return ' '.join([str(m) for m in message])
+    return str(message)
+
+def IsPermanentFailure(message, permanentFailureMessages = PERMANENT_FAILURE_MESSAGES):
+    '''
+    Checks whether a failure message indicates that retrying the file will not help.
+
+    :param message: The failure message.
+    :type message: str
+    :param permanentFailureMessages: Messages indicating a permanent failure, defaults to PERMANENT_FAILURE_MESSAGES
+    :type permanentFailureMessages: [str], optional
+
+    :return: True if a permanent failure, otherwise False.
+    :rtype: bool
+    '''
+
+    for permanentMessage in permanentFailureMessages:
+        if(permanentMessage in message):
+            return True
+    return False
+
+def GetBackoffSeconds(attempts, backoffSeconds = DEFAULT_BACKOFF_SECONDS, maxBackoffSeconds = DEFAULT_MAX_BACKOFF_SECONDS):
+    '''
+    Returns the time to wait before retrying a file: none after the first failed attempt, then the back off time doubling\
+        with every failed attempt.
+
+    :param attempts: The number of failed attempts.
+    :type attempts: int
+    :param backoffSeconds: The back off time after the second failed attempt, defaults to DEFAULT_BACKOFF_SECONDS
+    :type backoffSeconds: int, optional
+    :param maxBackoffSeconds: The maximum back off time, defaults to DEFAULT_MAX_BACKOFF_SECONDS
+    :type maxBackoffSeconds: int, optional
+
+    :return: The back off time in seconds.
+    :rtype: int
+    '''
+
+    if(attempts < 2):
+        return 0
+    # limit the exponent: the maximum is reached long before
+    return min(maxBackoffSeconds, backoffSeconds * (2 ** min(attempts - 2, 32)))
+
+def UpdateRetryState(state, results, utcNow = None, backoffSeconds = DEFAULT_BACKOFF_SECONDS, maxBackoffSeconds = DEFAULT_MAX_BACKOFF_SECONDS, permanentFailureMessages = PERMANENT_FAILURE_MESSAGES):
+    '''
+    Adds the processing results of a session to the retry state.
+
+    :param state: Dictionary where key is the normalised file path and value the retry record. Changed in place.
+    :type state: {str: :class:`.RetryRecord`}
+    :param results: Processing results in format [[file path, status, message]] (refer to :func:`BatchProcessorLogUtils.ProcessLogFiles`).
+    :type results: [[str, bool, str]]
+    :param utcNow: The current utc time, defaults to None (datetime.datetime.utcnow())
+    :type utcNow: datetime.datetime, optional
+    :param backoffSeconds: The back off time after the second failed attempt, defaults to DEFAULT_BACKOFF_SECONDS
+    :type backoffSeconds: int, optional
+    :param maxBackoffSeconds: The maximum back off time, defaults to DEFAULT_MAX_BACKOFF_SECONDS
+    :type maxBackoffSeconds: int, optional
+    :param permanentFailureMessages: Messages indicating a permanent failure, defaults to PERMANENT_FAILURE_MESSAGES
+    :type permanentFailureMessages: [str], optional
+
+    :return: The number of files which succeeded, failed and failed permanently.
+    :rtype: int, int, int
+    '''
+
+    if(utcNow is None):
+        utcNow = datetime.datetime.utcnow()
+    succeeded = 0
+    failed = 0
+    failedPermanently = 0
+    for filePath, status, message in results:
+        key = util.NormaliseFilePath(filePath)
+        if(status):
+            succeeded += 1
+            if(key in state):
+                del state[key]
+            continue
+        messageText = GetMessageText(message)
+        attempts = 1
+        if(key in state):
+            attempts = state[key].attempts + 1
+        permanent = IsPermanentFailure(messageText, permanentFailureMessages)
+        if(permanent):
+            failedPermanently += 1
+        else:
+            failed += 1
+        nextAttemptTime = utcNow + datetime.timedelta(seconds = GetBackoffSeconds(attempts, backoffSeconds, maxBackoffSeconds))
+        state[key] = RetryRecord(filePath, attempts, utcNow, nextAttemptTime, permanent, messageText)
+    return succeeded, failed, failedPermanently
+
+def GetFilesToRetry(state, maxRetries = DEFAULT_MAX_RETRIES, utcNow = None):
+    '''
+    Returns the files which are due for a retry: not failed permanently, not retried the maximum number of times yet\
+        and back off time passed.
+
+    :param state: Dictionary where key is the normalised file path and value the retry record.
+    :type state: {str: :class:`.RetryRecord`}
+    :param maxRetries: The maximum number of retries of a file, defaults to DEFAULT_MAX_RETRIES
+    :type maxRetries: int, optional
+    :param utcNow: The current utc time, defaults to None (datetime.datetime.utcnow())
+    :type utcNow: datetime.datetime, optional
+
+    :return: List of retry records, sorted by file path.
+    :rtype: [:class:`.RetryRecord`]
+    '''
+
+    if(utcNow is None):
+        utcNow = datetime.datetime.utcnow()
+    records = []
+    for key in sorted(state):
+        record = state[key]
+        # the first attempt is not a retry
+        if(record.permanent or record.attempts > maxRetries or record.nextAttemptTime > utcNow):
+            continue
+        records.append(record)
+    return records
@@ -0,0 +1,332 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Helper functions to keep track of how long Revit files took to process over a number of batch processor sessions.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Durations are extracted from the file processing blocks in batch processor log files:
+
+- total: first row of the block to the last row of the block
+- open: first row of the block to the task script start message (if the log contains one)
+- script: task script start message to the last row of the block
+
+Durations are appended to a tab separated text file (the runtime store), one row per file processed:
+
+- normalised file path
+- utc start time (ISO format)
+- total, open and script duration in seconds (-1 if not available)
+- processing status (True or False)
+- fully qualified file path as in log file
+
+The store is only ever appended to, rows of a file processed already (same path and start time) are skipped.
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import os
+import datetime
+
+import Utility as util
+import BatchProcessorLogUtils as logUtils
+import UtilParallel as parallel
+
+#: Header row of the runtime store file
+RUNTIME_STORE_HEADER = ['Key', 'StartTimeUtc', 'Total', 'Open', 'Script', 'Status', 'FilePath']
+#: Format of start times in the runtime store file
+RUNTIME_STORE_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+#: Value written if a duration is not available
+NO_DURATION = -1
+
+class FileRuntime:
+    def __init__(self, filePath, startTime, totalTime, openTime = NO_DURATION, scriptTime = NO_DURATION, status = True):
+        '''
+        Class constructor.
+
+        :param filePath: The fully qualified file path of the Revit file processed.
+        :type filePath: str
+        :param startTime: The utc time processing of the file started.
+        :type startTime: datetime.datetime
+        :param totalTime: The total processing time in seconds.
+        :type totalTime: int
+        :param openTime: Time in seconds from start of processing until the task script started, defaults to NO_DURATION
+        :type openTime: int, optional
+        :param scriptTime: Time in seconds the task script ran for, defaults to NO_DURATION
+        :type scriptTime: int, optional
+        :param status: The processing status: True if no exception occured, otherwise False, defaults to True
+        :type status: bool, optional
+        '''
+
+        self.key = util.NormaliseFilePath(filePath)
+        self.filePath = filePath
+        self.startTime = startTime
+        self.totalTime = totalTime
+        self.openTime = openTime
+        self.scriptTime = scriptTime
+        self.status = status
+
+    def GetRow(self):
+        '''
+        Returns this runtime as a runtime store row.
+
+        :return: List of values in order of RUNTIME_STORE_HEADER
+        :rtype: [str]
+        '''
+
+        return [
+            self.key,
+            self.startTime.strftime(RUNTIME_STORE_TIME_FORMAT),
+            str(self.totalTime),
+            str(self.openTime),
+            str(self.scriptTime),
+            str(self.status),
+            self.filePath
+        ]
+
+def GetSeconds(startTime, endTime):
+    '''
+    Returns the number of seconds between two times.
+
+    :param startTime: The start time.
+    :type startTime: datetime.datetime
+    :param endTime: The end time.
+    :type endTime: datetime.datetime
+
+    :return: Number of full seconds, or NO_DURATION if either time is None or the end is before the start.
+    :rtype: int
+    '''
+
+    if(startTime is None or endTime is None or endTime < startTime):
+        return NO_DURATION
+    delta = endTime - startTime
+    return delta.days * 86400 + delta.seconds
+
+def GetRuntimeFromRecord(record):
+    '''
+    Returns the runtime of a file processing block.
+
+    :param record: A file processing record.
+    :type record: :class:`BatchProcessorLogUtils.LogFileRecord`
+
+    :return: The runtime, or None if the block has no start or end time or no file name.
+    :rtype: :class:`.FileRuntime`
+    '''
+
+    if(record.startTime is None or record.endTime is None or record.fileName == ''):
+        return None
+    return FileRuntime(
+        record.fileName,
+        record.startTime,
+        GetSeconds(record.startTime, record.endTime),
+        GetSeconds(record.startTime, record.scriptStartTime),
+        GetSeconds(record.scriptStartTime, record.endTime),
+        record.status
+    )
+
+def GetRuntimesFromLogFile(filePath):
+    '''
+    Returns the runtime of each file processed in a batch processor log file.
+
+    :param filePath: The fully qualified file path to log file in json format
+    :type filePath: str
+
+    :return: List of runtimes in order of processing.
+    :rtype: [:class:`.FileRuntime`]
+    '''
+
+    runtimes = []
+    parser = logUtils.ParseLogFile(filePath)
+    for record in parser.records:
+        runtime = GetRuntimeFromRecord(record)
+        if(runtime is not None):
+            runtimes.append(runtime)
+    return runtimes
+
+def ReadRuntimes(storeFilePath):
+    '''
+    Reads all runtimes from a runtime store file.
+
+    Rows which can not be read are ignored.
+
+    :param storeFilePath: The fully qualified file path of the runtime store.
+    :type storeFilePath: str
+
+    :return: List of runtimes in order of the store file.
+    :rtype: [:class:`.FileRuntime`]
+    '''
+
+    runtimes = []
+    if(not os.path.exists(storeFilePath)):
+        return runtimes
+    with open(storeFilePath, 'r') as f:
+        # skip header
+        f.readline()
+        for line in f:
+            row = line.rstrip('\r\n').split('\t')
+            if(len(row) < len(RUNTIME_STORE_HEADER)):
+                continue
+            try:
+                runtime = FileRuntime(
+                    row[6],
+                    datetime.datetime.strptime(row[1], RUNTIME_STORE_TIME_FORMAT),
+                    int(row[2]),
+                    int(row[3]),
+                    int(row[4]),
+                    row[5] == 'True'
+                )
+                runtimes.append(runtime)
+            except Exception as e:
+                logUtils.Output('Failed to read runtime store row: ' + line + ' ' + str(e))
+    return runtimes
+
+def WriteRuntimes(storeFilePath, runtimes):
+    '''
+    Appends runtimes to a runtime store file. Runtimes already in the store (same file and start time) are skipped.
+
+    :param storeFilePath: The fully qualified file path of the runtime store.
+    :type storeFilePath: str
+    :param runtimes: List of runtimes.
+    :type runtimes: [:class:`.FileRuntime`]
+
+    :return: The number of runtimes added to the store.
+    :rtype: int
+    '''
+
+    stored = set()
+    for runtime in ReadRuntimes(storeFilePath):
+        stored.add((runtime.key, runtime.startTime))
+    rows = []
+    for runtime in runtimes:
+        if((runtime.key, runtime.startTime) not in stored):
+            stored.add((runtime.key, runtime.startTime))
+            rows.append('\t'.join(runtime.GetRow()))
+    if(len(rows) == 0):
+        return 0
+    writeHeader = not os.path.exists(storeFilePath) or os.path.getsize(storeFilePath) == 0
+    with open(storeFilePath, 'a') as f:
+        if(writeHeader):
+            f.write('\t'.join(RUNTIME_STORE_HEADER) + '\n')
+        f.write('\n'.join(rows) + '\n')
+    return len(rows)
+
+def StoreRuntimesFromLogFiles(logFilePaths, storeFilePath, maxWorkers = 1):
+    '''
+    Extracts runtimes from batch processor log files and appends them to a runtime store file.
+
+    :param logFilePaths: List of fully qualified file paths to log files in json format.
+    :type logFilePaths: [str]
+    :param storeFilePath: The fully qualified file path of the runtime store.
+    :type storeFilePath: str
+    :param maxWorkers: The number of log files processed in parallel, defaults to 1 (one after another).
+    :type maxWorkers: int, optional
+
+    :return: The number of runtimes added to the store.
+    :rtype: int
+    '''
+
+    runtimes = []
+    for logFilePath, logData in zip(logFilePaths, parallel.MapInParallel(GetRuntimesFromLogFile, logFilePaths, maxWorkers)):
+        data, exception = logData
+        if(exception is None):
+            runtimes = runtimes + data
+        else:
+            logUtils.Output('Failed to get runtimes from log file: ' + logFilePath + ' ' + str(exception))
+    return WriteRuntimes(storeFilePath, runtimes)
+
+def GetPercentile(values, percentile):
+    '''
+    Returns the percentile of a list of values, interpolating between the two closest values.
+
+    :param values: List of numbers.
+    :type values: [int]
+    :param percentile: The percentile (0 to 100).
+    :type percentile: float
+
+    :return: The percentile, or None if the list is empty.
+    :rtype: float
+    '''
+
+    if(len(values) == 0):
+        return None
+    sortedValues = sorted(values)
+    position = (len(sortedValues) - 1) * percentile / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(sortedValues) - 1)
+    return sortedValues[lower] + (sortedValues[upper] - sortedValues[lower]) * (position - lower)
+
+def GetRuntimesByFile(runtimes):
+    '''
+    Groups runtimes by normalised file path. Runtimes of each file are sorted by start time.
+
+    :param runtimes: List of runtimes.
+    :type runtimes: [:class:`.FileRuntime`]
+
+    :return: Dictionary where key is the normalised file path and value is a list of runtimes.
+    :rtype: {str: [:class:`.FileRuntime`]}
+    '''
+
+    runtimesByFile = {}
+    for runtime in runtimes:
+        if(runtime.key in runtimesByFile):
+            runtimesByFile[runtime.key].append(runtime)
+        else:
+            runtimesByFile[runtime.key] = [runtime]
+    for key in runtimesByFile:
+        runtimesByFile[key].sort(key = lambda r: r.startTime)
+    return runtimesByFile
+
+def GetRuntimeStatistics(runtimes, successfulOnly = True):
+    '''
+    Returns runtime statistics per file.
+
+    :param runtimes: List of runtimes.
+    :type runtimes: [:class:`.FileRuntime`]
+    :param successfulOnly: Flag indicating whether runtimes of files which failed to process are ignored, defaults to True
+    :type successfulOnly: bool, optional
+
+    :return: Dictionary where key is the normalised file path and value is a list in format:\
+        [number of runtimes, p50 total seconds, p95 total seconds, most recent total seconds]
+    :rtype: {str: [int, float, float, int]}
+    '''
+
+    statistics = {}
+    runtimesByFile = GetRuntimesByFile(runtimes)
+    for key in runtimesByFile:
+        totals = [r.totalTime for r in runtimesByFile[key] if (r.status or not successfulOnly) and r.totalTime != NO_DURATION]
+        if(len(totals) > 0):
+            statistics[key] = [len(totals), GetPercentile(totals, 50), GetPercentile(totals, 95), totals[-1]]
+    return statistics
+
+def GetRuntimeHistory(runtimes, filePath):
+    '''
+    Returns the runtimes of a single file in order of processing, i.e. to show trends across sessions.
+
+    :param runtimes: List of runtimes.
+    :type runtimes: [:class:`.FileRuntime`]
+    :param filePath: The file path of the Revit file.
+    :type filePath: str
+
+    :return: List of runtimes sorted by start time.
+    :rtype: [:class:`.FileRuntime`]
+    '''
+
+    key = util.NormaliseFilePath(filePath)
+    return sorted([r for r in runtimes if r.key == key], key = lambda r: r.startTime)
@@ -0,0 +1,292 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Compact binary data file format: an alternative to the json formatted data file.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Stores the same data as the json formatted data file (one json object per data object) but keeps geometry in flat\
+    binary arrays. The file is written without numpy (in Revit) and read with numpy if available (without copying\
+    vertices), otherwise with the struct module.
+
+All numbers are little endian, all sections start at a multiple of 8 bytes (zero padded) so the file can be memory mapped:
+
+- header: BINARY_FILE_MAGIC followed by 5 unsigned 64 bit integers: metadata length (bytes), number of transforms,\
+    number of geometries, number of rings, number of vertices
+- metadata: utf-8 encoded json list of tables, one per set of property names: {'columns': property names,\
+    'rows': per data object its index followed by its property values}. The 'geometry' property is a list of the\
+    data types of the geometry objects of a data object.
+- transforms: 12 doubles per transform: the 3 rotation vectors followed by the translation. Each unique transform\
+    (one per model) is stored once.
+- geometries: 4 signed 64 bit integers per geometry object, in order of the data objects: index of the data object,\
+    index of the transform, index of the first ring (the outer loop, followed by the inner loops), number of rings
+- ring offsets: number of rings + 1 signed 64 bit integers: index of the first vertex of each ring, followed by\
+    the number of vertices
+- vertices: 3 doubles (x, y, z) per vertex
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import json
+import struct
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+#: First bytes of a binary data file (includes the format version)
+BINARY_FILE_MAGIC = b'RBPGEO01'
+#: Format of the file header
+HEADER_FORMAT = '<8s5Q'
+#: Number of doubles per transform
+TRANSFORM_SIZE = 12
+#: Number of integers per geometry object
+GEOMETRY_SIZE = 4
+#: Maximum number of values packed in one go
+PACK_CHUNK_SIZE = 65536
+
+def GetPaddedLength(length):
+    '''
+    Returns the length rounded up to the next multiple of 8 bytes.
+
+    :param length: A length in bytes.
+    :type length: int
+
+    :return: The padded length.
+    :rtype: int
+    '''
+
+    return (length + 7) // 8 * 8
+
+def WriteValues(f, typeCode, values):
+    '''
+    Writes a list of numbers as little endian binary values.
+
+    :param f: File opened in binary mode.
+    :type f: file
+    :param typeCode: The struct format character of the values, i.e 'd' (double) or 'q' (64 bit integer)
+    :type typeCode: str
+    :param values: List of numbers.
+    :type values: list
+    '''
+
+    for start in range(0, len(values), PACK_CHUNK_SIZE):
+        chunk = values[start:start + PACK_CHUNK_SIZE]
+        f.write(struct.pack('<' + str(len(chunk)) + typeCode, *chunk))
+
+def GetTransformValues(geometry):
+    '''
+    Returns the rotation and translation of a geometry object as a tuple of doubles.
+
+    :param geometry: Dictionary of a :class:`.DataGeometry` instance.
+    :type geometry: dict
+
+    :return: The 3 rotation vectors followed by the translation.
+    :rtype: tuple (float)
+    '''
+
+    values = []
+    for vector in geometry['rotationCoord']:
+        values.extend(vector)
+    values.extend(geometry['translationCoord'])
+    if(len(values) != TRANSFORM_SIZE):
+        raise ValueError('Rotation and translation need ' + str(TRANSFORM_SIZE) + ' values, got: ' + str(len(values)))
+    return tuple([float(v) for v in values])
+
+def WriteBinaryData(filePath, dataObjects):
+    '''
+    Writes data objects to a binary data file.
+
+    :param filePath: Fully qualified file path of the binary data file.
+    :type filePath: str
+    :param dataObjects: List of data objects, i.e. :class:`.DataRoom` or :class:`.DataCeiling` instances (anything with a to_json() method).
+    :type dataObjects: list [data objects]
+
+    :return: The number of data objects written.
+    :rtype: int
+    '''
+
+    tables = []
+    tableIndexes = {}
+    transforms = []
+    transformIndexes = {}
+    geometries = []
+    ringOffsets = [0]
+    vertices = []
+    for objectIndex in range(len(dataObjects)):
+        dic = json.loads(dataObjects[objectIndex].to_json())
+        geometryDataTypes = []
+        for geometry in dic.get('geometry', []):
+            geometryDataTypes.append(geometry.get('dataType', 'polygons'))
+            # one transform per model: store each unique transform once
+            transform = GetTransformValues(geometry)
+            if(transform not in transformIndexes):
+                transformIndexes[transform] = len(transforms)
+                transforms.append(transform)
+            geometries.extend([objectIndex, transformIndexes[transform], len(ringOffsets) - 1, 1 + len(geometry['innerLoops'])])
+            for ring in [geometry['outerLoop']] + geometry['innerLoops']:
+                for point in ring:
+                    vertices.extend([float(point[0]), float(point[1]), float(point[2])])
+                ringOffsets.append(len(vertices) // 3)
+        dic['geometry'] = geometryDataTypes
+        # property names are stored once per table rather than once per data object
+        columns = tuple(sorted(dic.keys()))
+        if(columns not in tableIndexes):
+            tableIndexes[columns] = len(tables)
+            tables.append({'columns' : list(columns), 'rows' : []})
+        tables[tableIndexes[columns]]['rows'].append([objectIndex] + [dic[column] for column in columns])
+    metadataBytes = json.dumps(tables, separators = (',', ':')).encode('utf-8')
+    with open(filePath, 'wb') as f:
+        f.write(struct.pack(HEADER_FORMAT, BINARY_FILE_MAGIC, len(metadataBytes), len(transforms), len(geometries) // GEOMETRY_SIZE, len(ringOffsets) - 1, len(vertices) // 3))
+        f.write(metadataBytes + b'\0' * (GetPaddedLength(len(metadataBytes)) - len(metadataBytes)))
+        transformValues = []
+        for transform in transforms:
+            transformValues.extend(transform)
+        WriteValues(f, 'd', transformValues)
+        WriteValues(f, 'q', geometries)
+        WriteValues(f, 'q', ringOffsets)
+        WriteValues(f, 'd', vertices)
+    return len(dataObjects)
+
+def IsBinaryDataFile(filePath):
+    '''
+    Checks whether a file is a binary data file.
+
+    :param filePath: Fully qualified file path.
+    :type filePath: str
+
+    :return: True if the file starts with BINARY_FILE_MAGIC, otherwise False (also if the file can not be read).
+    :rtype: bool
+    '''
+
+    try:
+        with open(filePath, 'rb') as f:
+            return f.read(len(BINARY_FILE_MAGIC)) == BINARY_FILE_MAGIC
+    except Exception:
+        return False
+
+def ReadValues(content, offset, typeCode, count):
+    '''
+    Reads a number of little endian binary values.
+
+    :param content: The file content.
+    :type content: bytes
+    :param offset: Offset of the first value in bytes.
+    :type offset: int
+    :param typeCode: The struct format character of the values, i.e 'd' (double) or 'q' (64 bit integer)
+    :type typeCode: str
+    :param count: The number of values.
+    :type count: int
+
+    :return: Array of values if numpy is available, otherwise a tuple.
+    :rtype: numpy array or tuple
+    '''
+
+    if(NUMPY_AVAILABLE):
+        return np.frombuffer(content, dtype = '<f8' if typeCode == 'd' else '<i8', count = count, offset = offset)
+    return struct.unpack_from('<' + str(count) + typeCode, content, offset)
+
+def GetDataDictionaries(tables):
+    '''
+    Returns the data objects stored in the metadata tables as dictionaries.
+
+    :param tables: The metadata tables as stored in the file.
+    :type tables: list [dict]
+
+    :return: List of dictionaries, one per data object, in order of the data objects.
+    :rtype: list [dict]
+    '''
+
+    dics = {}
+    for table in tables:
+        columns = table['columns']
+        for row in table['rows']:
+            dic = {}
+            for i in range(len(columns)):
+                dic[columns[i]] = row[i + 1]
+            dics[row[0]] = dic
+    return [dics[i] for i in range(len(dics))]
+
+def ReadBinaryData(filePath):
+    '''
+    Reads a binary data file.
+
+    :param filePath: Fully qualified file path of the binary data file.
+    :type filePath: str
+
+    :return: List of dictionaries, one per data object, in the format of the json formatted data file. Loops are\
+        arrays of shape (number of points, 3) sharing the memory of the file content if numpy is available, otherwise\
+        lists of lists of doubles.
+    :rtype: list [dict]
+    '''
+
+    with open(filePath, 'rb') as f:
+        content = f.read()
+    magic, metadataLength, transformCount, geometryCount, ringCount, vertexCount = struct.unpack_from(HEADER_FORMAT, content, 0)
+    if(magic != BINARY_FILE_MAGIC):
+        raise ValueError('Not a binary data file: ' + filePath)
+    offset = struct.calcsize(HEADER_FORMAT)
+    metadata = GetDataDictionaries(json.loads(content[offset:offset + metadataLength].decode('utf-8')))
+    offset = offset + GetPaddedLength(metadataLength)
+    transformValues = ReadValues(content, offset, 'd', transformCount * TRANSFORM_SIZE)
+    offset = offset + transformCount * TRANSFORM_SIZE * 8
+    geometries = ReadValues(content, offset, 'q', geometryCount * GEOMETRY_SIZE)
+    offset = offset + geometryCount * GEOMETRY_SIZE * 8
+    ringOffsets = ReadValues(content, offset, 'q', ringCount + 1)
+    offset = offset + (ringCount + 1) * 8
+    vertices = ReadValues(content, offset, 'd', vertexCount * 3)
+    if(NUMPY_AVAILABLE):
+        vertices = vertices.reshape((vertexCount, 3))
+        geometries = geometries.tolist()
+        ringOffsets = ringOffsets.tolist()
+    # rotation and translation, shared by all geometry objects of a model
+    transforms = []
+    for i in range(transformCount):
+        t = [float(v) for v in transformValues[i * TRANSFORM_SIZE:(i + 1) * TRANSFORM_SIZE]]
+        transforms.append(([t[0:3], t[3:6], t[6:9]], t[9:12]))
+    # replace geometry data types with geometry dictionaries
+    geometryDataTypes = []
+    for dic in metadata:
+        geometryDataTypes.append(dic['geometry'])
+        dic['geometry'] = []
+    for i in range(geometryCount):
+        objectIndex, transformIndex, firstRing, numberOfRings = geometries[i * GEOMETRY_SIZE:(i + 1) * GEOMETRY_SIZE]
+        loops = []
+        for ring in range(firstRing, firstRing + numberOfRings):
+            start = ringOffsets[ring]
+            end = ringOffsets[ring + 1]
+            if(start == end):
+                loops.append([])
+            elif(NUMPY_AVAILABLE):
+                loops.append(vertices[start:end])
+            else:
+                loops.append([list(vertices[v * 3:v * 3 + 3]) for v in range(start, end)])
+        dic = metadata[objectIndex]
+        dic['geometry'].append({
+            'dataType' : geometryDataTypes[objectIndex][len(dic['geometry'])],
+            'outerLoop' : loops[0],
+            'innerLoops' : loops[1:],
+            'rotationCoord' : transforms[transformIndex][0],
+            'translationCoord' : transforms[transformIndex][1]
+        })
+    return metadata
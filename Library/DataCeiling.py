@@ -52,7 +52,10 @@ class DataCeiling():
         self.designSetAndOption = DataDesignSetOption.DataDesignSetOption()
         self.associatedElements = []
         if(len(j) > 0 ):
-            self.__dict__ = json.loads(j)
+            if(type(j) == str):
+                self.__dict__ = json.loads(j)
+            elif(type(j) == dict):
+                self.__dict__ = j
             # custom deserialisation code...
             geoDataList = []
             for item in self.geometry:
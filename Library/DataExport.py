@@ -27,6 +27,7 @@ Utility functions writing revit geometry data to file.
 #
 
 import Utility as util
+import DataBinaryFile as dBinary
 import RevitCeilings as rCeil
 import RevitRooms as rRoom
 import Result as res
@@ -94,4 +95,43 @@ def WriteJsonDataToFile (doc, dataOutPutFileName):
         result.UpdateSep(True, 'Data written to file: ' + dataOutPutFileName)
     except  Exception as e:
         result.UpdateSep(False, 'Failed to write data to file with exception: ' + str(e))
-    return result
\ No newline at end of file
+    return result
+
+def WriteBinaryDataToFile (doc, dataOutPutFileName):
+    '''
+    Collects geometry data and writes it to a new binary data file.
+
+    The binary file contains the same data as the json formatted file written by :func:`WriteJsonDataToFile`, but with\
+        geometry stored in flat arrays (refer to :mod:`DataBinaryFile`). It is smaller and faster to load.
+
+    :param doc: Current Revit model document.
+    :type doc: Autodesk.Revit.DB.Document
+    :param dataOutPutFileName: Fully qualified file path to binary data file.
+    :type dataOutPutFileName: str
+
+    :return: 
+        Result class instance.
+        
+        - result.status. True if binary data file was written succesfully, otherwise False.
+        - result.message will confirm path of binary data file.
+        - result.result empty list
+
+        On exception:
+        
+        - result.status (bool) will be False.
+        - result.message will contain exception message.
+        - result.result will be empty
+
+    :rtype: :class:`.Result`
+    '''
+
+    result = res.Result()
+    # get data
+    allRoomData = rRoom.GetAllRoomData(doc)
+    allCeilingData = rCeil.GetAllCeilingData(doc)
+    try:
+        dBinary.WriteBinaryData(dataOutPutFileName, allRoomData + allCeilingData)
+        result.UpdateSep(True, 'Data written to file: ' + dataOutPutFileName)
+    except  Exception as e:
+        result.UpdateSep(False, 'Failed to write data to file with exception: ' + str(e))
+    return result
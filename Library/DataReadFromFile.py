@@ -31,9 +31,14 @@ import codecs
 import csv
 import json
 
-import DataCeiling as dc
-import DataRoom as dr
+import DataBinaryFile as dBinary
+import DataRecord as dRecord
 
+#: Record classes used to load data objects, by data type
+dataRecordTypes_ = {
+    dRecord.DataRoomRecord.dataType : dRecord.DataRoomRecord,
+    dRecord.DataCeilingRecord.dataType : dRecord.DataCeilingRecord
+}
 
 class ReadDataFromFile:
     def __init__(self, filePath):
@@ -47,6 +52,10 @@ class ReadDataFromFile:
         self.dataFilePath = filePath
         self.dataType = ''
         self.data = []
+        # indexes of data objects, build when data is loaded
+        self.dataByLevel = {}
+        self.dataByLevelAndDataType = {}
+        self.dataById = {}
 
     def _read_tab_separated_file(self, filePath):
         '''
@@ -73,32 +82,52 @@ class ReadDataFromFile:
 
     def load_Data(self):
         '''
-        Load json formatted rows into data objects and stores them in this class.
+        Load json formatted rows, or the content of a binary data file (refer to :mod:`DataBinaryFile`), into data objects and stores them in this class.
+
+        Each row is parsed once and loaded into the record class registered for its data type in dataRecordTypes_.\
+            Rows without a data type, or of a data type without record class, are loaded as None.
 
         In the moment the following data objects are supported:
 
-        - :class: `.DataRoom`
-        - :class: `.DataCeiling`
+        - :class: `.DataRoomRecord` (properties of :class:`.DataRoom`)
+        - :class: `.DataCeilingRecord` (properties of :class:`.DataCeiling`)
 
         '''
 
-        dataJson = self._read_tab_separated_file(self.dataFilePath)
+        if(dBinary.IsBinaryDataFile(self.dataFilePath)):
+            dataDics = dBinary.ReadBinaryData(self.dataFilePath)
+        else:
+            #load json strings into dics
+            dataDics = [json.loads(d[0]) for d in self._read_tab_separated_file(self.dataFilePath)]
         dataObjects = []
-        for d in dataJson:
+        # translation and rotation values shared between geometry records
+        sharedValues = {}
+        for dic in dataDics:
             p = None
-            #load json string into dic and check whjat the data type is
-            dummy = json.loads(d[0])
-            if('dataType' in dummy):
-                if(dummy['dataType'] == dr.DataRoom.dataType):
-                    p = dr.DataRoom(d[0])
-                    self.dataType = p.dataType
-                elif(dummy['dataType'] == dc.DataCeiling.dataType):
-                    dic = json.loads(d[0])
-                    json_data = json.dumps(dic, default=lambda o: o.__dict__, indent=None)
-                    p = dc.DataCeiling(json_data)
-                    self.dataType = p.dataType
+            # check what the data type is
+            if('dataType' in dic and dic['dataType'] in dataRecordTypes_):
+                p = dataRecordTypes_[dic['dataType']](dic, sharedValues)
+                self.dataType = p.dataType
             dataObjects.append(p)
         self.data = dataObjects
+        self._build_indexes()
+
+    def _build_indexes(self):
+        '''
+        Builds the indexes of the loaded data objects by level name, by level name and data type and by id.
+
+        Data objects are stored in each index in the order they were loaded. Rows which could not be loaded (None) are not indexed.
+        '''
+
+        self.dataByLevel = {}
+        self.dataByLevelAndDataType = {}
+        self.dataById = {}
+        for dObject in self.data:
+            if(dObject is None):
+                continue
+            self.dataByLevel.setdefault(dObject.levelName, []).append(dObject)
+            self.dataByLevelAndDataType.setdefault((dObject.levelName, dObject.dataType), []).append(dObject)
+            self.dataById.setdefault(dObject.id, []).append(dObject)
     
     def get_data_by_level(self, levelName):
         '''
@@ -111,7 +140,7 @@ class ReadDataFromFile:
         :rtype: list [data objects]
         '''
 
-        return (list(filter(lambda x: (x.levelName == levelName ) , self.data)))
+        return list(self.dataByLevel.get(levelName, []))
     
     def get_data_by_level_and_dataType(self, levelName, dataType):
         '''
@@ -127,5 +156,23 @@ class ReadDataFromFile:
         :rtype: list [data objects]
         '''
 
-        return (list(filter(lambda x: (x.levelName == levelName and x.dataType == dataType), self.data)))
+        return list(self.dataByLevelAndDataType.get((levelName, dataType), []))
+
+    def get_data_by_id(self, id, dataType = None, levelName = None):
+        '''
+        Returns all data objects where the id (and optionally data type and level name) equal passt in values.
+
+        :param id: The Revit element id.
+        :type id: int
+        :param dataType: A string describing the data type\
+            refer to property .dataType on data object class, defaults to None (any data type)
+        :type dataType: str, optional
+        :param levelName: The building level name, defaults to None (any level)
+        :type levelName: str, optional
+
+        :return: A list of data objects
+        :rtype: list [data objects]
+        '''
+
+        return [x for x in self.dataById.get(id, []) if (dataType is None or x.dataType == dataType) and (levelName is None or x.levelName == levelName)]
 
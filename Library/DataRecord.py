@@ -0,0 +1,247 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Memory efficient, read only data storage classes used when loading exported data from file.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Records have the same properties as the data storage classes used to export the data (:class:`.DataRoom`,\
+    :class:`.DataCeiling`, :class:`.DataGeometry`, :class:`.DataDesignSetOption`) but store them in slots rather than\
+    in a dictionary per instance. Properties in the data which are not known to a record are ignored.
+
+Records are build from a dictionary as returned by json.loads(), so each row of a data file is only parsed once.
+
+If numpy is available, geometry loops are stored as arrays of shape (number of points, 3) rather than lists of lists.\
+    Translation and rotation values are shared between all geometry records with the same values: they must not be\
+    changed.
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import json
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+def GetLoop(points):
+    '''
+    Returns a loop of points in the format stored in geometry records.
+
+    :param points: List of points, each a list of x, y, z coordinates.
+    :type points: list [list[float]]
+
+    :return: Array of shape (number of points, 3) if numpy is available and the loop is not empty, otherwise the list passed in.
+    :rtype: numpy array or list [list[float]]
+    '''
+
+    if(NUMPY_AVAILABLE and len(points) > 0):
+        try:
+            # arrays read from a binary data file are not copied
+            loop = np.asarray(points, dtype = float)
+            if(loop.ndim == 2 and loop.shape[1] == 3):
+                return loop
+        except ValueError:
+            pass
+    return points
+
+def GetSharedValue(value, sharedValues):
+    '''
+    Returns an equal value stored previously, so equal values are stored only once.
+
+    :param value: A (nested) list of numbers.
+    :type value: list
+    :param sharedValues: Dictionary of values stored previously. Key is the value converted to (nested) tuples. None if values are not shared.
+    :type sharedValues: dict or None
+
+    :return: The equal value stored previously, or the value passed in.
+    :rtype: list
+    '''
+
+    if(sharedValues is None):
+        return value
+    try:
+        key = tuple([tuple(v) if isinstance(v, list) else v for v in value])
+    except TypeError:
+        return value
+    if(key not in sharedValues):
+        sharedValues[key] = value
+    return sharedValues[key]
+
+def GetJsonValue(o):
+    '''
+    Converts objects json can not serialise: records into dictionaries and arrays into lists.
+
+    :param o: A record or numpy array.
+    :type o: :class:`.DataRecord` or numpy array
+
+    :return: A dictionary or list.
+    :rtype: dict or list
+    '''
+
+    if(isinstance(o, DataRecord)):
+        return o.to_dict()
+    return o.tolist()
+
+class DataRecord(object):
+    __slots__ = ()
+
+    def to_dict(self):
+        '''
+        Convert the instance of this class to a dictionary.
+
+        :return: Dictionary of property names and values.
+        :rtype: dict
+        '''
+
+        dic = {}
+        if(hasattr(self.__class__, 'dataType')):
+            dic['dataType'] = self.dataType
+        for name in self.__slots__:
+            dic[name] = getattr(self, name)
+        return dic
+
+    def to_json(self):
+        '''
+        Convert the instance of this class to json.
+
+        :return: A Json object.
+        :rtype: json
+        '''
+
+        return json.dumps(self, indent = None, default = GetJsonValue)
+
+class DataDesignSetOptionRecord(DataRecord):
+    __slots__ = ('designSetName', 'designOptionName', 'isPrimary')
+
+    def __init__(self, dic = {}):
+        '''
+        Class constructor.
+
+        :param dic: Dictionary of a :class:`.DataDesignSetOption` instance, defaults to {}
+        :type dic: dict, optional
+        '''
+
+        self.designSetName = dic.get('designSetName', 'Main Model')
+        self.designOptionName = dic.get('designOptionName', '-')
+        self.isPrimary = dic.get('isPrimary', True)
+
+class DataGeometryRecord(DataRecord):
+    __slots__ = ('dataType', 'outerLoop', 'innerLoops', 'translationCoord', 'rotationCoord')
+
+    def __init__(self, dic = {}, sharedValues = None):
+        '''
+        Class constructor.
+
+        :param dic: Dictionary of a :class:`.DataGeometry` instance, defaults to {}
+        :type dic: dict, optional
+        :param sharedValues: Dictionary of translation and rotation values shared between records, defaults to None (not shared)
+        :type sharedValues: dict, optional
+        '''
+
+        self.dataType = dic.get('dataType', 'polygons')
+        self.outerLoop = GetLoop(dic.get('outerLoop', []))
+        self.innerLoops = [GetLoop(innerLoop) for innerLoop in dic.get('innerLoops', [])]
+        self.translationCoord = GetSharedValue(dic.get('translationCoord', [0.0, 0.0, 0.0]), sharedValues)
+        self.rotationCoord = GetSharedValue(dic.get('rotationCoord', [[0.0, 0.0, 0.0],[0.0, 0.0, 0.0],[0.0, 0.0, 0.0]]), sharedValues)
+
+def GetGeometryRecords(geometry, sharedValues = None):
+    '''
+    Returns geometry records from a list of geometry dictionaries.
+
+    :param geometry: List of dictionaries of :class:`.DataGeometry` instances.
+    :type geometry: list [dict]
+    :param sharedValues: Dictionary of translation and rotation values shared between records, defaults to None (not shared)
+    :type sharedValues: dict, optional
+
+    :return: List of geometry records. Dictionaries without a data type are ignored.
+    :rtype: list [:class:`.DataGeometryRecord`]
+    '''
+
+    geoDataList = []
+    for item in geometry:
+        if('dataType' in item and item['dataType']):
+            geoDataList.append(DataGeometryRecord(item, sharedValues))
+        else:
+            print('no data type in item')
+    return geoDataList
+
+class DataRoomRecord(DataRecord):
+    __slots__ = ('id', 'name', 'number', 'levelName', 'levelId', 'geometry', 'designSetAndOption', 'functionNumber', 'associatedElements')
+    dataType = 'room'
+
+    def __init__(self, dic = {}, sharedValues = None):
+        '''
+        Class constructor.
+
+        :param dic: Dictionary of a :class:`.DataRoom` instance, defaults to {}
+        :type dic: dict, optional
+        :param sharedValues: Dictionary of translation and rotation values shared between geometry records, defaults to None (not shared)
+        :type sharedValues: dict, optional
+        '''
+
+        self.id = dic.get('id', -1)
+        self.name = dic.get('name', '-')
+        self.number = dic.get('number', '-')
+        self.levelName = dic.get('levelName', '-')
+        self.levelId = dic.get('levelId', '-')
+        self.geometry = GetGeometryRecords(dic.get('geometry', []), sharedValues)
+        self.designSetAndOption = DataDesignSetOptionRecord(dic.get('designSetAndOption', {}))
+        self.functionNumber = dic.get('functionNumber', '-')
+        self.associatedElements = dic.get('associatedElements', [])
+
+class DataCeilingRecord(DataRecord):
+    __slots__ = ('id', 'typeName', 'typeMark', 'mark', 'levelName', 'levelId', 'offsetFromLevel', 'geometry', 'designSetAndOption', 'associatedElements')
+    dataType = 'ceiling'
+
+    def __init__(self, dic = {}, sharedValues = None):
+        '''
+        Class constructor.
+
+        :param dic: Dictionary of a :class:`.DataCeiling` instance, defaults to {}
+        :type dic: dict, optional
+        :param sharedValues: Dictionary of translation and rotation values shared between geometry records, defaults to None (not shared)
+        :type sharedValues: dict, optional
+        '''
+
+        self.id = dic.get('id', -1)
+        self.typeName = dic.get('typeName', '-')
+        self.typeMark = dic.get('typeMark', '-')
+        self.mark = dic.get('mark', '-')
+        self.levelName = dic.get('levelName', '-')
+        self.levelId = dic.get('levelId', '-')
+        self.offsetFromLevel = dic.get('offsetFromLevel', 0.0)
+        self.geometry = GetGeometryRecords(dic.get('geometry', []), sharedValues)
+        self.designSetAndOption = DataDesignSetOptionRecord(dic.get('designSetAndOption', {}))
+        self.associatedElements = dic.get('associatedElements', [])
+
+    @property
+    def DataType(self):
+        '''
+        Property: returns the data type of this class.
+
+        :return: 'ceiling'
+        :rtype: str
+        '''
+
+        return self.dataType
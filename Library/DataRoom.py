@@ -43,7 +43,7 @@ class DataRoom():
         '''
         Class constructor.
 
-        :param j: A json formatted dictionary of this class, defaults to {}
+        :param j: A json formatted string or dictionary of this class, defaults to {}
         :type j: dict, optional
         '''
 
@@ -58,7 +58,10 @@ class DataRoom():
         self.functionNumber = '-'
         self.associatedElements = []
         if(len(j) > 0 ):
-            self.__dict__ = json.loads(j)
+            if(type(j) == str):
+                self.__dict__ = json.loads(j)
+            elif(type(j) == dict):
+                self.__dict__ = j
             geoDataList = []
             for item in self.geometry:
                 if('dataType' in item):
@@ -33,7 +33,6 @@ This module requires python >3.9 due to dependencies:
 #
 
 import sys
-import codecs
 
 import shapely.geometry as sg
 import shapely.ops as so
@@ -44,6 +43,8 @@ import Result as res
 import DataCeiling as dc
 import DataRoom as dr
 import DataReadFromFile as dReader
+import UtilReportWriter as rw
+import UtilSpatialIndex as si
 
 # --------------- generics shape creation ------------------
 
@@ -51,6 +52,8 @@ def GetTranslationMatrix(geoObject):
     '''
     Gets the rotation/ translation matrix from the geometry object
 
+    The geometry object is not changed.
+
     :param geoObject: A data geometry object instance.
     :type geoObject: :class:`.DataGeometry`
 
@@ -63,11 +66,9 @@ def GetTranslationMatrix(geoObject):
     # need to append one more row since matrix dot multiplication rule:
     # number of coulmns in first matrix must match number of rows in second matrix (point later on)
     for vector in geoObject.rotationCoord:
-        vector.append(0.0)
-        transM.append(vector)
-    rotationM = geoObject.translationCoord # rotation matrix
-    # adding extra row here
-    rotationM.append(1.0)
+        transM.append(list(vector) + [0.0])
+    # rotation matrix, adding extra row here
+    rotationM = list(geoObject.translationCoord) + [1.0]
     transM.append(rotationM)
     # build combined rotation and translation matrix
     combinedM = np.array(transM)
@@ -75,6 +76,72 @@ def GetTranslationMatrix(geoObject):
     combinedM = np.transpose(combinedM)
     return combinedM
 
+def GetLoopAsCoordinates(loop, translationM):
+    '''
+    Returns the points of a loop translated with passed in matrix.
+
+    All points are translated in a single matrix multiplication.
+
+    :param loop: List of points, each a list of x, y, z coordinates.
+    :type loop: list [list[float]]
+    :param translationM: A translation matrix.
+    :type translationM: numpy array
+
+    :return: Array of translated points, one row of x, y, z coordinates per point.
+    :rtype: numpy array of shape (number of points, 3)
+    '''
+
+    if(len(loop) == 0):
+        return np.empty((0, 3))
+    # need to add 1 to each point for matric multiplication
+    # number of columns in first matrix (translation) must match number of rows in second matrix (point)
+    points = np.ones((len(loop), 4))
+    points[:, :3] = loop
+    # translating points as rows: (M . p)^T = p^T . M^T
+    return np.dot(points, np.transpose(translationM))[:, :3]
+
+def GetOuterLoopAsCoordinates(geoObject, translationM):
+    '''
+    Returns the boundary loop of an object as array of coordinates.
+
+    Points are translated with passed in matrix.
+    Any loops containing less then 3 points willbe ignored. (Empty list will be returned)
+
+    :param geoObject: A data geometry object instance.
+    :type geoObject: :class:`.DataGeometry`
+    :param translationM: A translation matrix.
+    :type translationM: numpy array
+
+    :return: Array of translated points defining a polygon (refer to :func:`GetLoopAsCoordinates`). (Empty list will be returned if less then 3 points in loop.)
+    :rtype: numpy array
+    '''
+
+    # ignore any poly loops with less then 3 sides (less then 3 points)
+    if(geoObject.dataType == 'polygons' and len(geoObject.outerLoop) > 2):
+        return GetLoopAsCoordinates(geoObject.outerLoop, translationM)
+    else:
+        return []
+
+def GetInnerLoopsAsCoordinates(geoObject, translationM):
+    '''
+    Returns the inner loops (holes) of an object as list of arrays of coordinates.
+
+    Points are translated with passed in matrix.
+    Any inner loops containing less then 3 points willbe ignored.
+
+    :param geoObject: A data geometry object instance.
+    :type geoObject: :class:`.DataGeometry`
+    :param translationM: A translation matrix.
+    :type translationM: numpy array
+
+    :return: List of arrays of translated points defining a polygon (refer to :func:`GetLoopAsCoordinates`).
+    :rtype: list [numpy array]
+    '''
+
+    # there might be more then one inner loop
+    # ignore any poly loops with less then 3 sides ( less then 3 points)
+    return [GetLoopAsCoordinates(innerLoop, translationM) for innerLoop in geoObject.innerLoops if len(innerLoop) > 2]
+
 def GetOuterLoopAsShape(geoObject, translationM):
     '''
     Returns the boundary loop of an object as list of shapely points. 
@@ -82,6 +149,8 @@ def GetOuterLoopAsShape(geoObject, translationM):
     Points are translated with passed in matrix.
     Any loops containing less then 3 points willbe ignored. (Empty list will be returned)
 
+    Use :func:`GetOuterLoopAsCoordinates` to build polygons: it does not create a shapely point per vertex.
+
     :param geoObject: A data geometry object instance.
     :type geoObject: :class:`.DataGeometry`
     :param translationM: A translation matrix.
@@ -91,19 +160,7 @@ def GetOuterLoopAsShape(geoObject, translationM):
     :rtype: List[shapely.point]
     '''
 
-    singlePolygonLoop = []
-    if(geoObject.dataType == 'polygons'):
-        for pdouble in geoObject.outerLoop:
-            # need to add 1 to list for matric multiplication
-            # number of columns in first matrix (translation) must match number of rows in second matrix (point)
-            translatedPoint = np.dot(translationM,[pdouble[0], pdouble[1], pdouble[2], 1.0])
-            p = sg.Point(translatedPoint[0],translatedPoint[1],translatedPoint[2])
-            singlePolygonLoop.append(p)
-    # ignore any poly loops with less then 3 sides (less then 3 points)
-    if(len(singlePolygonLoop) > 2):
-        return singlePolygonLoop
-    else:
-        return []
+    return [sg.Point(p[0], p[1], p[2]) for p in GetOuterLoopAsCoordinates(geoObject, translationM)]
 
 def GetInnerLoopsAsShape(geoObject, translationM):
     '''
@@ -112,6 +169,8 @@ def GetInnerLoopsAsShape(geoObject, translationM):
     Points are translated with passed in matrix.
     Any inner loops containing less then 3 points willbe ignored. (Empty list will be returned)
 
+    Use :func:`GetInnerLoopsAsCoordinates` to build polygons: it does not create a shapely point per vertex.
+
     :param geoObject: A data geometry object instance.
     :type geoObject: :class:`.DataGeometry`
     :param translationM: A translation matrix.
@@ -121,22 +180,7 @@ def GetInnerLoopsAsShape(geoObject, translationM):
     :rtype: list [list[shapely.point]]
     '''
     
-    shapeS = []
-    # get inner loops
-    if(len(geoObject.innerLoops) > 0):
-        # there might be more then one inner loop
-        for innerLoop in geoObject.innerLoops:
-            singlePolygonLoop = []
-            for pdouble in innerLoop:
-                # need to add 1 to list for matric multiplication
-                # number of columns in first matrix (translation) must match number of rows in second matrix (point)
-                translatedPoint = np.dot(translationM,[pdouble[0], pdouble[1], pdouble[2], 1.0])
-                p = sg.Point(translatedPoint[0],translatedPoint[1],translatedPoint[2])
-                singlePolygonLoop.append(p)
-            # ignore any poly loops with less then 3 sides ( less then 3 points)
-            if(len(singlePolygonLoop)>2):
-                shapeS.append(singlePolygonLoop)
-    return shapeS
+    return [[sg.Point(p[0], p[1], p[2]) for p in loop] for loop in GetInnerLoopsAsCoordinates(geoObject, translationM)]
 
 def buildShapelyPolygon(shapeS):
     '''
@@ -145,8 +189,8 @@ def buildShapelyPolygon(shapeS):
     Sssumptions is first polygone describes the boundary loop and any subsequent polygons are describing\
          holes within the boundary 
 
-    :param shapeS: list of shapely polygons
-    :type shapeS: list[shapely.polygon]
+    :param shapeS: list of loops, each a list of shapely points or an array of coordinates (refer to :func:`GetOuterLoopAsCoordinates`)
+    :type shapeS: list[list[shapely.point]] or list[numpy array]
 
     :return: A shapely polygon.
     :rtype: shapely.polygon
@@ -167,9 +211,10 @@ def buildShapelyPolygon(shapeS):
         for i in range(1,len(shapeS)):
             interiors[i-1] = shapeS[i]
         i_p = {k: sg.Polygon(v) for k, v in interiors.items()}
+        exterior = sg.Polygon(shapeS[0])
         # create polygon with holes
         poly = sg.Polygon(shapeS[0], [poly.exterior.coords for poly in i_p.values() \
-            if poly.within(sg.Polygon(shapeS[0])) is True])
+            if poly.within(exterior) is True])
     return poly
 
 def GetShapelyPolygonsFromDataInstance(dataInstance):
@@ -192,10 +237,10 @@ def GetShapelyPolygonsFromDataInstance(dataInstance):
         if(geoObject.dataType == 'polygons'):
             translationM = GetTranslationMatrix(geoObject)
             shapeS = []
-            outerLoop = GetOuterLoopAsShape(geoObject, translationM)
+            outerLoop = GetOuterLoopAsCoordinates(geoObject, translationM)
             shapeS.append(outerLoop)
             if(len(outerLoop) > 0):
-                innerLoops = GetInnerLoopsAsShape(geoObject, translationM)
+                innerLoops = GetInnerLoopsAsCoordinates(geoObject, translationM)
                 if(len(innerLoops) > 0):
                     for l in innerLoops:
                         shapeS.append(l)
@@ -232,9 +277,11 @@ def ReadData(filePath):
 
 # --------------- data processing ------------------
 
-def writeReportData(fileName, header, data, writeType = 'w'):
+def writeReportData(fileName, header, data, writeType = 'w', sink = rw.SINK_TSV):
     '''
     Method writing out report information to file.
+
+    Rows are buffered and written in large chunks (refer to :mod:`UtilReportWriter`).
  
     :param fileName: Fully qualified file path to data file.
     :type fileName: str
@@ -244,21 +291,15 @@ def writeReportData(fileName, header, data, writeType = 'w'):
     :type data: list[list[str]]
     :param writeType: 'w' new file, 'a' append to existing file., defaults to 'w'
     :type writeType: str, optional
+    :param sink: The report format, one of UtilReportWriter.SINK_ constants, defaults to tab separated text file
+    :type sink: str, optional
+
+    :return: True if the report was written. (An exception is raised otherwise.)
+    :rtype: bool
     '''
 
-    with codecs.open(fileName, writeType, encoding='utf-8') as f:
-        # check if header is required
-        if(len(header) > 0):
-            print('\t'.join(header + ['\n']))
-            f.write('\t'.join(header + ['\n']))
-        # check if data is required
-        if(len(data) > 0):
-            for d in data:
-                if (len(d) > 1):
-                    f.write('\t'.join(d + ['\n']))
-                elif(len(d) == 1):
-                    f.write(d[0] + '\n')
-        f.close()
+    rw.WriteReportData(fileName, header, data, writeType, sink)
+    return True
 
 
 def BuildDictionaryByLevelAndDataType(dataReader):
@@ -278,6 +319,7 @@ def BuildDictionaryByLevelAndDataType(dataReader):
     '''
 
     dic = {}
+    # loop over data objects to keep levels in the order they are first found in the file
     for dObject in dataReader.data:
         if(dObject.levelName not in dic):
             roomsByLevel = dataReader.get_data_by_level_and_dataType(dObject.levelName, dr.DataRoom.dataType)
@@ -468,46 +510,52 @@ def GetCeilingsByRoom (dataSourcePath, outputFilePath):
                     ceilingPolygons = GetShapelyPolygonsFromGeoObject(dicObjects[levelName][1], dc.DataCeiling.dataType)
                     polygonsByType[dr.DataRoom.dataType] = roomPolygons
                     polygonsByType[dc.DataCeiling.dataType] = ceilingPolygons
+                    # spatial index of all ceiling polygons on this level, in order of ceiling ids and their polygons
+                    ceilingEntries = []
+                    for ceilingPolyId in polygonsByType[dc.DataCeiling.dataType]:
+                        for cPolygon in ceilingPolygons[ceilingPolyId]:
+                            ceilingEntries.append((ceilingPolyId, cPolygon))
+                    ceilingIndex = si.SpatialIndex([entry[1] for entry in ceilingEntries])
                     # loop over rooms ids
                     for roomPolyId in polygonsByType[dr.DataRoom.dataType]:
                         # check if valid room poly ( just in case that is a room in schedule only >> not placed in model , or unbound, or overlapping with other room)
                         if(len(roomPolygons[roomPolyId]) > 0):
                             # loop over each room polygon per room...there should only be one...
                             for rPolygon in roomPolygons[roomPolyId]:
-                                # find overlapping ceiling polygons
+                                # find overlapping ceiling polygons: only ceilings with a bounding box intersecting the room bounding box can overlap
                                 intersections = {}
-                                for ceilingPolyId in polygonsByType[dc.DataCeiling.dataType]:
-                                    for cPolygon in ceilingPolygons[ceilingPolyId]:
-                                        # add some exception handling here in case intersect check throws an error
-                                        try:
-                                            # debug
-                                            match = False
-                                            # check what exactly is happening
-                                            if(cPolygon.intersects(rPolygon)):
-                                                # calculates percentage of overlapping ceiling area vs room area
-                                                # anything less then 0.1 will be ignored...
-                                                areaIntersectionPercentageOfCeilingVsRoom = (cPolygon.intersection(rPolygon).area/rPolygon.area)*100
-                                                # check what percentage the overlap area is...if less then 0.1 percent ignore!
-                                                if(areaIntersectionPercentageOfCeilingVsRoom < 0.1):
-                                                    # ceiling overlap area is to small...not in room
-                                                    pass
-                                                else:
-                                                    # ceiling is within the room: add to room data object
-                                                    # get the room object by its Revit ID
-                                                    dataObjectRoom =  list(filter(lambda x: (x.id == roomPolyId ) , dicObjects[levelName][0]))[0]
-                                                    # get the ceiling object by its Revit id
-                                                    dataObjectCeiling =  list(filter(lambda x: (x.id == ceilingPolyId ) , dicObjects[levelName][1]))[0]
-                                                    # add ceiling object to associated elements list of room object 
-                                                    dataObjectRoom.associatedElements.append(dataObjectCeiling)
-                                        except Exception as e:
-                                            # get the offending elements:
-                                            dataObjectRoom =  list(filter(lambda x: (x.id == roomPolyId ) , dicObjects[levelName][0]))[0]
-                                            dataObjectCeiling =  list(filter(lambda x: (x.id == ceilingPolyId ) , dicObjects[levelName][1]))[0]
-                                            result.AppendMessage(
-                                                'Exception: ' + str(e) + '\n' +
-                                                'offending room: room name '+ dataObjectRoom.name+ ' room number '+ dataObjectRoom.number + ' room id ' + str(dataObjectRoom.id) + ' is valid polytgon ' + str(rPolygon.is_valid) +  '\n' +
-                                                'offending ceiling id ' + str(dataObjectCeiling.id) + ' is valid polytgon ' + str(cPolygon.is_valid)
-                                                )
+                                for candidateIndex in ceilingIndex.Query(rPolygon):
+                                    ceilingPolyId, cPolygon = ceilingEntries[candidateIndex]
+                                    # add some exception handling here in case intersect check throws an error
+                                    try:
+                                        # debug
+                                        match = False
+                                        # check what exactly is happening
+                                        if(cPolygon.intersects(rPolygon)):
+                                            # calculates percentage of overlapping ceiling area vs room area
+                                            # anything less then 0.1 will be ignored...
+                                            areaIntersectionPercentageOfCeilingVsRoom = (cPolygon.intersection(rPolygon).area/rPolygon.area)*100
+                                            # check what percentage the overlap area is...if less then 0.1 percent ignore!
+                                            if(areaIntersectionPercentageOfCeilingVsRoom < 0.1):
+                                                # ceiling overlap area is to small...not in room
+                                                pass
+                                            else:
+                                                # ceiling is within the room: add to room data object
+                                                # get the room object by its Revit ID
+                                                dataObjectRoom =  dataReader.get_data_by_id(roomPolyId, dr.DataRoom.dataType, levelName)[0]
+                                                # get the ceiling object by its Revit id
+                                                dataObjectCeiling =  dataReader.get_data_by_id(ceilingPolyId, dc.DataCeiling.dataType, levelName)[0]
+                                                # add ceiling object to associated elements list of room object 
+                                                dataObjectRoom.associatedElements.append(dataObjectCeiling)
+                                    except Exception as e:
+                                        # get the offending elements:
+                                        dataObjectRoom =  dataReader.get_data_by_id(roomPolyId, dr.DataRoom.dataType, levelName)[0]
+                                        dataObjectCeiling =  dataReader.get_data_by_id(ceilingPolyId, dc.DataCeiling.dataType, levelName)[0]
+                                        result.AppendMessage(
+                                            'Exception: ' + str(e) + '\n' +
+                                            'offending room: room name '+ dataObjectRoom.name+ ' room number '+ dataObjectRoom.number + ' room id ' + str(dataObjectRoom.id) + ' is valid polytgon ' + str(rPolygon.is_valid) +  '\n' +
+                                            'offending ceiling id ' + str(dataObjectCeiling.id) + ' is valid polytgon ' + str(cPolygon.is_valid)
+                                            )
                 else:
                     result.AppendMessage('No ceilings found for level: ' + str(dicObjects[levelName][0][0].levelName))
             else:
@@ -295,11 +295,13 @@ def CompareReportDictioanries(first,second):
     resultValue = res.Result()
     for key,value in first.items():
         if(key not in COMPARISON_IGNORE):
-            if(second.has_key(key)):
+            if(key in second):
                 # check whether all values in base line key are in matching comparison key
                 notInList = []
+                # set lookup rather than a list search per id
+                secondIds = set(second[key])
                 for d in first[key]:
-                    if d not in second[key]:
+                    if d not in secondIds:
                         notInList.append(d)
                 if(len(notInList) > 0):
                     resultValue.status = False
@@ -0,0 +1,308 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+A catalog of files in a directory tree, keeping content hashes of files which did not change between scans.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+The catalog is stored as a text file with one json formatted row per line (json lines):
+
+- first row: catalog header (root directory, file filter)
+- any other row: a directory (path, modified time, sub directories and files matching the filter with their size, modified time and\
+    optional content hash)
+
+When a catalog gets updated every directory is listed again (one call per directory, refer to :func:`UtilFileDiscovery.ListDirectory`),\
+    which returns the size and modified time of all its files. Content hashes are only computed for new or changed files.
+
+Note: A directory's modified time changes when a file in it gets added, deleted or renamed, but not when a file is changed in place.\
+    Unchanged directories are therefore not skipped: checking each of their files one by one would take one call per file,\
+    which on network shares is slower than listing the directory.
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import os
+import json
+import time
+import hashlib
+
+import Utility as util
+import UtilFileDiscovery as discovery
+
+#: Version of the catalog file format
+CATALOG_VERSION = 1
+#: Number of bytes read at a time when hashing file content
+HASH_BLOCK_SIZE = 1024 * 1024
+
+class CatalogDirectory:
+    def __init__(self, path, modified, subDirectories, files):
+        '''
+        Class constructor.
+
+        :param path: The fully qualified directory path.
+        :type path: str
+        :param modified: The directory modified time when it was listed.
+        :type modified: float
+        :param subDirectories: List of fully qualified sub directory paths.
+        :type subDirectories: [str]
+        :param files: List of files in format [file name, size, modified time, content hash (None if not hashed)]
+        :type files: [[str, int, float, str]]
+        '''
+
+        self.path = path
+        self.modified = modified
+        self.subDirectories = subDirectories
+        self.files = files
+
+class FileCatalog:
+    def __init__(self, rootDirectory, fileFilter):
+        '''
+        Class constructor.
+
+        :param rootDirectory: The fully qualified root directory path.
+        :type rootDirectory: str
+        :param fileFilter: Only files matching this filter are in the catalog.
+        :type fileFilter: :class:`UtilFileDiscovery.FileFilter`
+        '''
+
+        self.rootDirectory = rootDirectory
+        self.fileFilter = fileFilter
+        # directory path: CatalogDirectory
+        self.directories = {}
+
+    def GetFilterSettings(self):
+        '''
+        Returns the settings of the catalog file filter.
+
+        :return: A dictionary of filter settings.
+        :rtype: dic
+        '''
+
+        return {
+            'fileExtension': self.fileFilter.fileExtension,
+            'filePrefix': self.fileFilter.filePrefix,
+            'fileSuffix': self.fileFilter.fileSuffix,
+            'excludeBackups': self.fileFilter.excludeBackups,
+            'ignoreCase': self.fileFilter.ignoreCase
+        }
+
+    def GetFiles(self, includeSubDirs = True):
+        '''
+        Returns all files in the catalog, in the order os.walk would return them.
+
+        :param includeSubDirs: Flag indicating whether files in sub directories are returned, defaults to True
+        :type includeSubDirs: bool, optional
+
+        :return: List of files.
+        :rtype: [:class:`UtilFileDiscovery.DiscoveredFile`]
+        '''
+
+        files = []
+        listings = {}
+        for path in self.directories:
+            listings[path] = (self.directories[path].files, self.directories[path].subDirectories)
+        directories = [self.rootDirectory]
+        if(includeSubDirs):
+            directories = discovery.GetWalkOrder(self.rootDirectory, listings)
+        for path in directories:
+            if(path not in self.directories):
+                continue
+            for name, size, modified, contentHash in self.directories[path].files:
+                f = discovery.DiscoveredFile(path, name, size, modified)
+                f.hash = contentHash
+                files.append(f)
+        return files
+
+def GetContentHash(filePath):
+    '''
+    Returns a hash of a file's content.
+
+    :param filePath: The fully qualified file path.
+    :type filePath: str
+
+    :return: The md5 hex digest of the file content.
+    :rtype: str
+    '''
+
+    md5 = hashlib.md5()
+    with open(filePath, 'rb') as f:
+        block = f.read(HASH_BLOCK_SIZE)
+        while(len(block) > 0):
+            md5.update(block)
+            block = f.read(HASH_BLOCK_SIZE)
+    return md5.hexdigest()
+
+def ReadCatalog(catalogFilePath):
+    '''
+    Reads a file catalog from file.
+
+    :param catalogFilePath: The fully qualified file path of the catalog.
+    :type catalogFilePath: str
+
+    :return: The catalog, or None if the file does not exist or can not be read.
+    :rtype: :class:`.FileCatalog`
+    '''
+
+    if(not os.path.exists(catalogFilePath)):
+        return None
+    try:
+        with open(catalogFilePath, 'r') as f:
+            header = json.loads(f.readline())
+            if(header.get('version') != CATALOG_VERSION):
+                return None
+            settings = header['filter']
+            fileFilter = discovery.FileFilter(
+                settings['fileExtension'],
+                settings['filePrefix'],
+                settings['fileSuffix'],
+                settings['excludeBackups'],
+                settings['ignoreCase']
+            )
+            catalog = FileCatalog(header['root'], fileFilter)
+            for line in f:
+                if(len(line.strip()) == 0):
+                    continue
+                row = json.loads(line)
+                catalog.directories[row['path']] = CatalogDirectory(row['path'], row['modified'], row['subDirectories'], row['files'])
+        return catalog
+    except Exception as e:
+        print ('Failed to read file catalog: ' + catalogFilePath + ' ' + str(e))
+        return None
+
+def WriteCatalog(catalogFilePath, catalog):
+    '''
+    Writes a file catalog to file.
+
+    The catalog is written to a temp file first, which then replaces any existing catalog file (refer to :func:`Utility.ReplaceFile`).
+
+    :param catalogFilePath: The fully qualified file path of the catalog.
+    :type catalogFilePath: str
+    :param catalog: The catalog.
+    :type catalog: :class:`.FileCatalog`
+
+    :return: True if the catalog was written succesfully, otherwise False.
+    :rtype: bool
+    '''
+
+    status = True
+    tempFilePath = catalogFilePath + '.tmp'
+    try:
+        with open(tempFilePath, 'w') as f:
+            header = {'version': CATALOG_VERSION, 'root': catalog.rootDirectory, 'filter': catalog.GetFilterSettings(), 'written': time.time()}
+            f.write(json.dumps(header) + '\n')
+            for path in sorted(catalog.directories):
+                d = catalog.directories[path]
+                f.write(json.dumps({'path': d.path, 'modified': d.modified, 'subDirectories': d.subDirectories, 'files': d.files}) + '\n')
+        util.ReplaceFile(tempFilePath, catalogFilePath)
+    except Exception as e:
+        print ('Failed to write file catalog: ' + catalogFilePath + ' ' + str(e))
+        status = False
+    return status
+
+def UpdateCatalog(catalog, computeHash = False, maxWorkers = discovery.DEFAULT_DISCOVERY_WORKERS):
+    '''
+    Updates a catalog with the current state of the file system.
+
+    All directories are listed: saving a file in place does not change the directory modified time, but the listing returns\
+        the current size and modified time of each file. Content hashes of files whose size and modified time did not change are kept.
+
+    :param catalog: The catalog to update. Gets changed in place.
+    :type catalog: :class:`.FileCatalog`
+    :param computeHash: Flag indicating whether content hashes are computed for new or changed files, defaults to False
+    :type computeHash: bool, optional
+    :param maxWorkers: The number of threads listing directories, defaults to UtilFileDiscovery.DEFAULT_DISCOVERY_WORKERS
+    :type maxWorkers: int, optional
+
+    :return: The number of directories which changed (files added, deleted or renamed) or are new.
+    :rtype: int
+    '''
+
+    previous = catalog.directories
+    changed = [0]
+
+    def getCatalogFile(directory, name, size, fileModified, previousFile):
+        # keep hash of a file which did not change
+        contentHash = None
+        if(previousFile is not None and previousFile[1] == size and previousFile[2] == fileModified):
+            contentHash = previousFile[3]
+        if(computeHash and contentHash is None):
+            try:
+                contentHash = GetContentHash(os.path.join(directory, name))
+            except Exception:
+                pass
+        return [name, size, fileModified, contentHash]
+
+    def listDirectory(directory):
+        # get modified time before listing: changes made while listing are picked up next time
+        modified = os.path.getmtime(directory)
+        if(directory not in previous or previous[directory].modified != modified):
+            changed[0] += 1
+        # list unchanged directories too: one call returns size and modified time of all files, including files saved in place
+        files, subDirectories = discovery.ListDirectory(directory, catalog.fileFilter)
+        previousFiles = {}
+        if(directory in previous):
+            for f in previous[directory].files:
+                previousFiles[f[0]] = f
+        catalogFiles = []
+        for name, size, fileModified in files:
+            catalogFiles.append(getCatalogFile(directory, name, size, fileModified, previousFiles.get(name)))
+        return (CatalogDirectory(directory, modified, subDirectories, catalogFiles), subDirectories)
+
+    listings = discovery.WalkDirectoryTree(catalog.rootDirectory, listDirectory, maxWorkers)
+    # directories no longer in the tree, or which could not be listed, are dropped
+    catalog.directories = {}
+    for path in listings:
+        if(isinstance(listings[path][0], CatalogDirectory)):
+            catalog.directories[path] = listings[path][0]
+    return changed[0]
+
+def GetCatalog(catalogFilePath, rootDirectory, fileFilter, rescan = True, computeHash = False, maxWorkers = discovery.DEFAULT_DISCOVERY_WORKERS):
+    '''
+    Reads a catalog from file, updates it and writes it back to file.
+
+    If the catalog file does not exist, or was created for a different root directory or filter, a new catalog is created.
+
+    :param catalogFilePath: The fully qualified file path of the catalog.
+    :type catalogFilePath: str
+    :param rootDirectory: The fully qualified root directory path.
+    :type rootDirectory: str
+    :param fileFilter: Only files matching this filter are in the catalog.
+    :type fileFilter: :class:`UtilFileDiscovery.FileFilter`
+    :param rescan: Flag indicating whether an existing catalog is updated. If False, the catalog is returned as read from file, defaults to True
+    :type rescan: bool, optional
+    :param computeHash: Flag indicating whether content hashes are computed for new or changed files, defaults to False
+    :type computeHash: bool, optional
+    :param maxWorkers: The number of threads listing directories, defaults to UtilFileDiscovery.DEFAULT_DISCOVERY_WORKERS
+    :type maxWorkers: int, optional
+
+    :return: The updated catalog.
+    :rtype: :class:`.FileCatalog`
+    '''
+
+    catalog = ReadCatalog(catalogFilePath)
+    newCatalog = FileCatalog(rootDirectory, fileFilter)
+    if(catalog is None or catalog.rootDirectory != rootDirectory or catalog.GetFilterSettings() != newCatalog.GetFilterSettings()):
+        catalog = newCatalog
+    elif(not rescan):
+        return catalog
+    UpdateCatalog(catalog, computeHash, maxWorkers)
+    WriteCatalog(catalogFilePath, catalog)
+    return catalog
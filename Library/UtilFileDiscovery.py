@@ -0,0 +1,345 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Helper functions to find files in a directory tree quickly, i.e. on network shares with a large number of files.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+- Each directory is listed once, file size and modified time are taken from the directory listing where possible\
+    (os.scandir, or .net DirectoryInfo in IronPython) rather than a separate call per file.
+- Sub directories are listed in parallel by a number of threads.
+- Filters (file extension, file name prefix and suffix, back up files) are applied while listing.
+
+Files are returned in the same order os.walk() would return them (top down).
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import os
+import stat
+import threading
+
+import UtilParallel as parallel
+
+# directory listing method: os.scandir (python 3.5+), .net (IronPython) or os.listdir and os.stat
+SCANDIR_AVAILABLE = hasattr(os, 'scandir')
+try:
+    import clr
+    import System
+    DOTNET_AVAILABLE = True
+except Exception:
+    DOTNET_AVAILABLE = False
+
+#: Default number of threads listing directories in parallel
+DEFAULT_DISCOVERY_WORKERS = 8
+
+class DiscoveredFile:
+    def __init__(self, directory, name, size, modified):
+        '''
+        Class constructor.
+
+        :param directory: The directory containing the file.
+        :type directory: str
+        :param name: The file name including extension.
+        :type name: str
+        :param size: The file size in bytes.
+        :type size: int
+        :param modified: The file modified time in seconds since the epoch.
+        :type modified: float
+        '''
+
+        self.directory = directory
+        self.name = name
+        self.path = os.path.join(directory, name)
+        self.size = size
+        self.modified = modified
+
+class FileFilter:
+    def __init__(self, fileExtension = '', filePrefix = '', fileSuffix = '', excludeBackups = False, ignoreCase = False):
+        '''
+        Class constructor.
+
+        :param fileExtension: File needs to have this file extension (format '.extension'), defaults to '' (any)
+        :type fileExtension: str, optional
+        :param filePrefix: File name (without extension) starts with this value, defaults to '' (any)
+        :type filePrefix: str, optional
+        :param fileSuffix: File name (without extension) ends with this value, defaults to '' (any)
+        :type fileSuffix: str, optional
+        :param excludeBackups: Flag indicating whether Revit back up files are excluded (refer to :func:`IsBackupFileName`), defaults to False
+        :type excludeBackups: bool, optional
+        :param ignoreCase: Flag indicating whether extension, prefix and suffix are compared ignoring case, defaults to False
+        :type ignoreCase: bool, optional
+        '''
+
+        self.ignoreCase = ignoreCase
+        self.excludeBackups = excludeBackups
+        self.fileExtension = fileExtension
+        self.filePrefix = filePrefix
+        self.fileSuffix = fileSuffix
+        if(ignoreCase):
+            self.fileExtension = fileExtension.lower()
+            self.filePrefix = filePrefix.lower()
+            self.fileSuffix = fileSuffix.lower()
+
+    def IsMatch(self, name):
+        '''
+        Checks whether a file name matches this filter.
+
+        :param name: The file name including extension.
+        :type name: str
+
+        :return: True if the file name matches, otherwise False.
+        :rtype: bool
+        '''
+
+        compareName = name
+        if(self.ignoreCase):
+            compareName = name.lower()
+        if(not compareName.endswith(self.fileExtension)):
+            return False
+        if(self.filePrefix != '' or self.fileSuffix != ''):
+            nameWithoutExtension = GetFileNameWithoutExtension(compareName)
+            if(not (nameWithoutExtension.startswith(self.filePrefix) and nameWithoutExtension.endswith(self.fileSuffix))):
+                return False
+        if(self.excludeBackups and IsBackupFileName(name)):
+            return False
+        return True
+
+def GetFileNameWithoutExtension(name):
+    '''
+    Returns the file name without its extension (same as .net Path.GetFileNameWithoutExtension for a file name).
+
+    :param name: The file name including extension.
+    :type name: str
+
+    :return: The file name without the last extension.
+    :rtype: str
+    '''
+
+    index = name.rfind('.')
+    if(index < 0):
+        return name
+    return name[:index]
+
+def IsBackupFileName(name):
+    '''
+    Checks whether a file name is a Revit back up file name.
+
+    Backup files are usually in format 'filename.0001.ext': the second last part of the file name split at every full stop is a number.
+
+    :param name: The file name including extension.
+    :type name: str
+
+    :return: True if a back up file name, otherwise False.
+    :rtype: bool
+    '''
+
+    chunks = name.split('.')
+    if(len(chunks) > 2):
+        try:
+            int(chunks[-2])
+            return True
+        except ValueError:
+            pass
+    return False
+
+def _ListDirectoryScandir(directory, fileFilter):
+    files = []
+    subDirectories = []
+    for entry in os.scandir(directory):
+        try:
+            if(entry.is_dir()):
+                # same as os.walk: do not follow symbolic links into directories
+                if(not entry.is_symlink()):
+                    subDirectories.append(entry.path)
+            elif(fileFilter.IsMatch(entry.name)):
+                entryStat = entry.stat()
+                files.append([entry.name, entryStat.st_size, entryStat.st_mtime])
+        except OSError:
+            pass
+    return files, subDirectories
+
+def _ListDirectoryDotNet(directory, fileFilter):
+    files = []
+    subDirectories = []
+    epoch = System.DateTime(1970, 1, 1, 0, 0, 0, System.DateTimeKind.Utc)
+    for info in System.IO.DirectoryInfo(directory).EnumerateFileSystemInfos():
+        if((info.Attributes & System.IO.FileAttributes.Directory) == System.IO.FileAttributes.Directory):
+            # reparse points (i.e. DFS links) are followed, same as os.walk in IronPython
+            subDirectories.append(os.path.join(directory, info.Name))
+        elif(fileFilter.IsMatch(info.Name)):
+            files.append([info.Name, info.Length, (info.LastWriteTimeUtc - epoch).TotalSeconds])
+    return files, subDirectories
+
+def _ListDirectoryStat(directory, fileFilter):
+    files = []
+    subDirectories = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if(os.path.isdir(path)):
+                if(not os.path.islink(path)):
+                    subDirectories.append(path)
+            elif(fileFilter.IsMatch(name)):
+                entryStat = os.stat(path)
+                files.append([name, entryStat[stat.ST_SIZE], entryStat[stat.ST_MTIME]])
+        except OSError:
+            pass
+    return files, subDirectories
+
+def ListDirectory(directory, fileFilter = None):
+    '''
+    Lists the files and sub directories of a single directory.
+
+    :param directory: The fully qualified directory path.
+    :type directory: str
+    :param fileFilter: Only files matching this filter are returned, defaults to None (all files)
+    :type fileFilter: :class:`.FileFilter`, optional
+
+    :return: List of files in format [file name, size, modified time] and list of fully qualified sub directory paths.
+    :rtype: [[str, int, float]], [str]
+    '''
+
+    if(fileFilter is None):
+        fileFilter = FileFilter()
+    if(SCANDIR_AVAILABLE):
+        return _ListDirectoryScandir(directory, fileFilter)
+    if(DOTNET_AVAILABLE):
+        return _ListDirectoryDotNet(directory, fileFilter)
+    return _ListDirectoryStat(directory, fileFilter)
+
+def WalkDirectoryTree(rootDirectory, listDirectory, maxWorkers = DEFAULT_DISCOVERY_WORKERS):
+    '''
+    Lists a directory and all its sub directories, using a number of threads.
+
+    :param rootDirectory: The fully qualified directory path to list.
+    :type rootDirectory: str
+    :param listDirectory: Function listing a single directory, returning a list of files and a list of fully qualified sub directory paths\
+        (refer to :func:`ListDirectory`). Directories for which this function throws an exception are skipped.
+    :type listDirectory: func(str) -> [var], [str]
+    :param maxWorkers: The number of threads listing directories, defaults to DEFAULT_DISCOVERY_WORKERS. 0 or None uses one thread per processor.
+    :type maxWorkers: int, optional
+
+    :return: A dictionary where key is the directory path and value are its files and sub directories as returned by listDirectory.
+    :rtype: {str: ([var], [str])}
+    '''
+
+    # directory path: [files, sub directories]
+    listings = {}
+    pending = [rootDirectory]
+    # number of directories currently listed by a worker
+    active = [0]
+    condition = threading.Condition()
+
+    def worker():
+        while(True):
+            with condition:
+                while(len(pending) == 0 and active[0] > 0):
+                    condition.wait()
+                if(len(pending) == 0):
+                    # nothing left to list and no worker which could find more
+                    condition.notify_all()
+                    return
+                directory = pending.pop()
+                active[0] += 1
+            try:
+                listing = listDirectory(directory)
+            except Exception:
+                # same as os.walk: directories which can not be listed are skipped
+                listing = ([], [])
+            with condition:
+                listings[directory] = listing
+                pending.extend(listing[1])
+                active[0] -= 1
+                condition.notify_all()
+
+    workerCount = maxWorkers
+    if(workerCount is None or workerCount < 1):
+        workerCount = parallel.GetProcessorCount()
+    if(not parallel.THREADING_AVAILABLE or workerCount < 2):
+        worker()
+    else:
+        # the calling thread is one of the workers
+        threads = []
+        for i in range(workerCount - 1):
+            t = threading.Thread(target = worker)
+            t.daemon = True
+            t.start()
+            threads.append(t)
+        worker()
+        for t in threads:
+            t.join()
+    return listings
+
+def DiscoverFiles(rootDirectory, fileFilter = None, includeSubDirs = True, maxWorkers = DEFAULT_DISCOVERY_WORKERS):
+    '''
+    Returns all files in a directory (and its sub directories) matching a filter.
+
+    :param rootDirectory: The fully qualified directory path to search.
+    :type rootDirectory: str
+    :param fileFilter: The file filter, defaults to None (all files)
+    :type fileFilter: :class:`.FileFilter`, optional
+    :param includeSubDirs: Flag indicating whether sub directories are searched, defaults to True
+    :type includeSubDirs: bool, optional
+    :param maxWorkers: The number of threads listing directories, defaults to DEFAULT_DISCOVERY_WORKERS. 0 or None uses one thread per processor.
+    :type maxWorkers: int, optional
+
+    :return: List of files found, in the order os.walk would return them.
+    :rtype: [:class:`.DiscoveredFile`]
+    '''
+
+    if(fileFilter is None):
+        fileFilter = FileFilter()
+    if(includeSubDirs):
+        listings = WalkDirectoryTree(rootDirectory, lambda directory: ListDirectory(directory, fileFilter), maxWorkers)
+    else:
+        try:
+            listings = {rootDirectory: ListDirectory(rootDirectory, fileFilter)}
+        except Exception:
+            listings = {}
+    filesFound = []
+    for directory in GetWalkOrder(rootDirectory, listings):
+        for name, size, modified in listings[directory][0]:
+            filesFound.append(DiscoveredFile(directory, name, size, modified))
+    return filesFound
+
+def GetWalkOrder(rootDirectory, listings):
+    '''
+    Returns directories in the order os.walk would return them (top down): a directory first, then each of its sub directories in listing order.
+
+    :param rootDirectory: The fully qualified root directory path.
+    :type rootDirectory: str
+    :param listings: Directory listings as returned by :func:`WalkDirectoryTree`
+    :type listings: {str: ([var], [str])}
+
+    :return: List of directory paths. Directories not in listings are skipped.
+    :rtype: [str]
+    '''
+
+    directories = []
+    stack = [rootDirectory]
+    while(len(stack) > 0):
+        directory = stack.pop()
+        if(directory not in listings):
+            continue
+        directories.append(directory)
+        stack.extend(reversed(listings[directory][1]))
+    return directories
@@ -0,0 +1,223 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Helper functions to keep host models sharing Revit links together when distributing them into task lists.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+A host to link graph is read from Revit link reports (tab separated, refer to :func:`RevitLinks.GetRevitLinkReportData`).\
+    Hosts sharing links are then merged into clusters, heaviest shared links first. A cluster is not grown beyond a given\
+    workload, so a link loaded by most hosts (i.e. a site model) does not end up putting all hosts into a single task list.
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import os
+import codecs
+
+import Utility as util
+
+#: Link report column containing the host file path (same as RevitLinks.REPORT_REVIT_LINKS_HEADER)
+LINK_REPORT_HOST_COLUMN = 'HOSTFILE'
+#: Link report column containing the link file path (same as RevitLinks.REPORT_REVIT_LINKS_HEADER)
+LINK_REPORT_LINK_COLUMN = 'FILEPATH'
+#: Link file path value if the path of a link is not known
+UNKNOWN_LINK_PATH = 'unknown'
+#: Default maximum workload of a cluster, as a share of the average workload of a task list (bigger clusters keep more links together but balance worse)
+DEFAULT_MAX_CLUSTER_SHARE = 0.5
+
+class LinkGraph:
+    def __init__(self):
+        '''
+        Class constructor.
+
+        Host and link file paths are stored normalised (refer to :func:`Utility.NormaliseFilePath`).
+        '''
+
+        # normalised host path: set of normalised link paths
+        self.hostLinks = {}
+        # normalised link path: set of normalised host paths
+        self.linkHosts = {}
+
+    def AddLink(self, hostPath, linkPath):
+        '''
+        Adds a link to the graph.
+
+        :param hostPath: The file path of the host model.
+        :type hostPath: str
+        :param linkPath: The file path of the linked model.
+        :type linkPath: str
+        '''
+
+        hostKey = util.NormaliseFilePath(hostPath)
+        linkKey = util.NormaliseFilePath(linkPath)
+        if(hostKey not in self.hostLinks):
+            self.hostLinks[hostKey] = set()
+        self.hostLinks[hostKey].add(linkKey)
+        if(linkKey not in self.linkHosts):
+            self.linkHosts[linkKey] = set()
+        self.linkHosts[linkKey].add(hostKey)
+
+    def GetLinks(self, hostPath):
+        '''
+        Returns the links of a host model.
+
+        :param hostPath: The file path of the host model.
+        :type hostPath: str
+
+        :return: Set of normalised link file paths. Empty if the host is not in the graph.
+        :rtype: set(str)
+        '''
+
+        return self.hostLinks.get(util.NormaliseFilePath(hostPath), set())
+
+def ReadLinkReports(filePaths):
+    '''
+    Reads a host to link graph from Revit link report files.
+
+    Columns are found by header name. Reports combined from several files (with repeated header rows) are supported.\
+        Links without a known file path are ignored.
+
+    :param filePaths: List of fully qualified file paths of link reports.
+    :type filePaths: [str]
+
+    :return: The link graph.
+    :rtype: :class:`.LinkGraph`
+    '''
+
+    graph = LinkGraph()
+    for filePath in filePaths:
+        with codecs.open(filePath, 'r', encoding='utf-8') as f:
+            header = f.readline().rstrip('\r\n').split('\t')
+            if(LINK_REPORT_HOST_COLUMN not in header or LINK_REPORT_LINK_COLUMN not in header):
+                raise ValueError('Not a Revit link report: ' + filePath)
+            hostIndex = header.index(LINK_REPORT_HOST_COLUMN)
+            linkIndex = header.index(LINK_REPORT_LINK_COLUMN)
+            for line in f:
+                row = line.rstrip('\r\n').split('\t')
+                if(len(row) <= max(hostIndex, linkIndex) or row[hostIndex] == LINK_REPORT_HOST_COLUMN):
+                    continue
+                if(row[linkIndex] == UNKNOWN_LINK_PATH or row[linkIndex].strip() == ''):
+                    continue
+                graph.AddLink(row[hostIndex], row[linkIndex])
+    return graph
+
+def GetLinkFileSize(linkPath):
+    '''
+    Returns the file size of a link, used as its weight in :func:`GetLinkClusters`.
+
+    :param linkPath: The link file path.
+    :type linkPath: str
+
+    :return: The file size, or 1 if the file can not be found (i.e. cloud models).
+    :rtype: int
+    '''
+
+    try:
+        return max(1, os.path.getsize(linkPath))
+    except Exception:
+        return 1
+
+def GetLinkClusters(graph, hostWorkloads, maxClusterWorkload, getLinkWeight = None):
+    '''
+    Merges hosts sharing links into clusters.
+
+    Links are processed heaviest first (link weight times the number of hosts sharing it). The hosts of each link are added\
+        to the same cluster, as long as the cluster workload stays at or below the maximum cluster workload.
+
+    :param graph: The host to link graph.
+    :type graph: :class:`.LinkGraph`
+    :param hostWorkloads: Dictionary where key is the normalised host file path and value its workload. Only these hosts are clustered.
+    :type hostWorkloads: {str: int}
+    :param maxClusterWorkload: The maximum workload of a cluster, i.e. a share of the average workload of a task list (refer to DEFAULT_MAX_CLUSTER_SHARE).
+    :type maxClusterWorkload: int
+    :param getLinkWeight: Function returning the weight of a link (i.e. its file size) from its normalised file path, defaults to None (all links weigh 1)
+    :type getLinkWeight: func(str) -> int, optional
+
+    :return: Dictionary where key is the normalised host file path and value is a cluster id. Hosts without a cluster are not included.
+    :rtype: {str: str}
+    '''
+
+    # union find: host: parent host, cluster root: cluster workload
+    parents = {}
+    clusterWorkloads = {}
+
+    def find(host):
+        root = host
+        while(parents.get(root, root) != root):
+            root = parents[root]
+        # shorten the path for any later lookups
+        while(host != root):
+            parent = parents[host]
+            parents[host] = root
+            host = parent
+        return root
+
+    links = []
+    for linkKey in graph.linkHosts:
+        hosts = sorted([h for h in graph.linkHosts[linkKey] if h in hostWorkloads])
+        if(len(hosts) > 1):
+            weight = 1
+            if(getLinkWeight is not None):
+                weight = getLinkWeight(linkKey)
+            links.append((weight * (len(hosts) - 1), len(hosts), linkKey, hosts))
+    links.sort(reverse = True)
+    for score, hostCount, linkKey, hosts in links:
+        current = find(hosts[0])
+        for host in hosts[1:]:
+            other = find(host)
+            if(other == current):
+                continue
+            currentWorkload = clusterWorkloads.get(current, hostWorkloads[current])
+            otherWorkload = clusterWorkloads.get(other, hostWorkloads[other])
+            if(currentWorkload + otherWorkload <= maxClusterWorkload):
+                parents[other] = current
+                parents[current] = current
+                clusterWorkloads[current] = currentWorkload + otherWorkload
+            else:
+                # cluster is full: continue with the other hosts of this link in a new cluster
+                current = other
+    clusters = {}
+    for host in parents:
+        clusters[host] = find(host)
+    return clusters
+
+def GetSharedLinkLoads(graph, hostGroups):
+    '''
+    Returns the number of times links are loaded across a number of groups of hosts (i.e. task lists), assuming a link is\
+        loaded once per group.
+
+    :param graph: The host to link graph.
+    :type graph: :class:`.LinkGraph`
+    :param hostGroups: List of groups of host file paths.
+    :type hostGroups: [[str]]
+
+    :return: The number of link loads.
+    :rtype: int
+    '''
+
+    loads = 0
+    for hostPaths in hostGroups:
+        links = set()
+        for hostPath in hostPaths:
+            links.update(graph.GetLinks(hostPath))
+        loads += len(links)
+    return loads
@@ -0,0 +1,145 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Helper functions to run independent work items in parallel.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Work items are processed by a pool of threads. IronPython does not support the multiprocessing module but has no\
+    global interpreter lock either, so threads do run in parallel there.
+
+If threads are not available, or only one worker is requested, items are processed one after another.
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import os
+
+try:
+    import threading
+    THREADING_AVAILABLE = True
+except ImportError:
+    THREADING_AVAILABLE = False
+
+#: Number of workers used if the number of processors can not be determined
+DEFAULT_WORKER_COUNT = 4
+
+def GetProcessorCount():
+    '''
+    Returns the number of processors of this machine.
+
+    :return: The number of processors, or DEFAULT_WORKER_COUNT if it can not be determined.
+    :rtype: int
+    '''
+
+    try:
+        import System
+        return System.Environment.ProcessorCount
+    except Exception:
+        pass
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except Exception:
+        pass
+    try:
+        return int(os.environ['NUMBER_OF_PROCESSORS'])
+    except Exception:
+        return DEFAULT_WORKER_COUNT
+
+def GetWorkerCount(maxWorkers, numberOfItems):
+    '''
+    Returns the number of workers to use for a number of items.
+
+    :param maxWorkers: The maximum number of workers. 0 or None will use one worker per processor.
+    :type maxWorkers: int
+    :param numberOfItems: The number of items to process.
+    :type numberOfItems: int
+
+    :return: The number of workers, at least 1 and no more than the number of items.
+    :rtype: int
+    '''
+
+    if(maxWorkers is None or maxWorkers < 1):
+        maxWorkers = GetProcessorCount()
+    return max(1, min(maxWorkers, numberOfItems))
+
+def MapInParallel(func, items, maxWorkers = None):
+    '''
+    Calls a function for each item and returns the results in order of the items.
+
+    Exceptions raised by the function are caught and returned with the item result, so one bad item does not\
+        stop any other items being processed.
+
+    :param func: Function to call with a single item.
+    :type func: func(item) -> var
+    :param items: List of items to process.
+    :type items: [var]
+    :param maxWorkers: The maximum number of threads to use, defaults to None which uses one thread per processor.\
+        Use 1 to process items one after another.
+    :type maxWorkers: int, optional
+
+    :return: List in order of items in format: [result, exception]. Exception is None if the function returned without\
+        an exception, otherwise result is None.
+    :rtype: [[var, Exception]]
+    '''
+
+    results = [None] * len(items)
+    workerCount = GetWorkerCount(maxWorkers, len(items))
+
+    def processItem(index):
+        try:
+            results[index] = [func(items[index]), None]
+        except Exception as e:
+            results[index] = [None, e]
+
+    if(not THREADING_AVAILABLE or workerCount < 2):
+        for i in range(len(items)):
+            processItem(i)
+        return results
+
+    # each worker takes the next unprocessed item until none are left
+    nextIndex = [0]
+    lock = threading.Lock()
+    def worker():
+        while(True):
+            with lock:
+                index = nextIndex[0]
+                nextIndex[0] = index + 1
+            if(index >= len(items)):
+                return
+            processItem(index)
+
+    # the calling thread is one of the workers
+    threads = []
+    try:
+        for i in range(workerCount - 1):
+            t = threading.Thread(target = worker)
+            t.daemon = True
+            t.start()
+            threads.append(t)
+    except Exception:
+        # could not start (all) threads: items left get processed by the threads already running and this one
+        pass
+    worker()
+    for t in threads:
+        t.join()
+    return results
@@ -0,0 +1,454 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Helper functions to compare two tab separated report files, i.e. two nightly runs of the same report.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Rows are matched on key columns. Both files are sorted by key and then merged in a single pass, which reports:
+
+- DIFF_ADDED: rows only in the second file
+- DIFF_REMOVED: rows only in the first file
+- DIFF_CHANGED: rows with the same key but different values in any other column
+
+Files with more rows than fit into a sort chunk are sorted externally: sorted chunks are written to temp files, which\
+    are merged while comparing. Memory use depends on the chunk size, not on the size of the files.
+
+Columns are matched by header name. Columns only in the second file are added after the columns of the first file.
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import os
+import glob
+import codecs
+import heapq
+import tempfile
+import datetime
+
+import UtilReportWriter as rw
+
+#: Row only in the second report
+DIFF_ADDED = 'ADDED'
+#: Row only in the first report
+DIFF_REMOVED = 'REMOVED'
+#: Row in both reports with different values
+DIFF_CHANGED = 'CHANGED'
+#: Default number of rows sorted in memory at a time
+DEFAULT_SORT_CHUNK_ROWS = 200000
+#: Header of the change columns in a diff report
+DIFF_REPORT_HEADER = ['CHANGE', 'CHANGED COLUMNS']
+#: Date stamp at the start of report file names (refer to :func:`Utility.GetFileDateStamp`)
+REPORT_FILE_DATE_STAMP = '%y_%m_%d'
+#: Suffix added to drift report file names
+DRIFT_REPORT_SUFFIX = '_Drift'
+
+def ReadHeader(filePath):
+    '''
+    Reads the header row of a report file.
+
+    :param filePath: The fully qualified file path of the report.
+    :type filePath: str
+
+    :return: List of headers. Trailing empty headers (the trailing tab written by :func:`Utility.writeReportData`) are not included.
+    :rtype: [str]
+    '''
+
+    with codecs.open(filePath, 'r', encoding='utf-8') as f:
+        row = f.readline().rstrip()
+    if(row == ''):
+        return []
+    return row.split('\t')
+
+def GetColumnIndexes(header, columns):
+    '''
+    Returns the index of each column in a header.
+
+    :param header: List of headers.
+    :type header: [str]
+    :param columns: List of column names.
+    :type columns: [str]
+
+    :return: List of indexes in order of the columns, -1 where a column is not in the header.
+    :rtype: [int]
+    '''
+
+    headerIndex = {}
+    for i in range(len(header)):
+        if(header[i] not in headerIndex):
+            headerIndex[header[i]] = i
+    return [headerIndex.get(column, -1) for column in columns]
+
+def ReadRows(filePath, columns):
+    '''
+    Reads the rows of a report file (all but the header row) in order of the given columns.
+
+    :param filePath: The fully qualified file path of the report.
+    :type filePath: str
+    :param columns: List of column names. Columns not in the file get an empty value.
+    :type columns: [str]
+
+    :return: Generator of rows. Empty lines are skipped.
+    :rtype: generator([str])
+    '''
+
+    with codecs.open(filePath, 'r', encoding='utf-8') as f:
+        header = f.readline().rstrip()
+        indexes = GetColumnIndexes(header.split('\t'), columns)
+        for line in f:
+            line = line.rstrip('\r\n')
+            if(line == ''):
+                continue
+            values = line.split('\t')
+            numberOfValues = len(values)
+            yield [values[i] if (i >= 0 and i < numberOfValues) else '' for i in indexes]
+
+def ReadChunk(filePath):
+    '''
+    Reads a sorted chunk written by :func:`SortRows`.
+
+    :param filePath: The fully qualified file path of the chunk.
+    :type filePath: str
+
+    :return: Generator of (key, row) tuples.
+    :rtype: generator((tuple, [str]))
+    '''
+
+    with codecs.open(filePath, 'r', encoding='utf-8') as f:
+        for line in f:
+            values = line.rstrip('\r\n').split('\t')
+            numberOfKeys = int(values[0])
+            yield (tuple(values[1:numberOfKeys + 1]), values[numberOfKeys + 1:])
+
+def SortRows(rows, keyIndexes, chunkRows = DEFAULT_SORT_CHUNK_ROWS, tempFiles = None):
+    '''
+    Sorts rows by key, in memory if they fit into a single chunk, otherwise externally.
+
+    :param rows: Iterable of rows.
+    :type rows: iterable([str])
+    :param keyIndexes: List of key column indexes.
+    :type keyIndexes: [int]
+    :param chunkRows: The number of rows sorted in memory at a time, defaults to DEFAULT_SORT_CHUNK_ROWS
+    :type chunkRows: int, optional
+    :param tempFiles: List to which any temp file paths written get added. The caller deletes them once the rows are read, defaults to None
+    :type tempFiles: [str], optional
+
+    :return: Iterable of (key, row) tuples sorted by key, rows with the same key sorted by their values. The order is\
+        the same whether rows were sorted in memory or externally.
+    :rtype: iterable((tuple, [str]))
+    '''
+
+    chunkFiles = []
+    chunk = []
+    for row in rows:
+        chunk.append((tuple([row[i] for i in keyIndexes]), row))
+        if(len(chunk) >= chunkRows):
+            chunkFiles.append(WriteChunk(chunk, len(keyIndexes)))
+            chunk = []
+    # sort by key, then row: ties are ordered the same way as by the merge of external chunks
+    chunk.sort()
+    if(len(chunkFiles) == 0):
+        return chunk
+    chunkFiles.append(WriteChunk(chunk, len(keyIndexes)))
+    if(tempFiles is not None):
+        tempFiles.extend(chunkFiles)
+    # chunks are sorted by key and row, so the merge orders ties on the row values too
+    return heapq.merge(*[ReadChunk(chunkFile) for chunkFile in chunkFiles])
+
+def WriteChunk(chunk, numberOfKeys):
+    '''
+    Sorts a chunk of rows by key and row and writes it to a temp file: number of keys, keys, row values.
+
+    :param chunk: List of (key, row) tuples.
+    :type chunk: [(tuple, [str])]
+    :param numberOfKeys: The number of key values.
+    :type numberOfKeys: int
+
+    :return: The fully qualified file path of the temp file.
+    :rtype: str
+    '''
+
+    chunk.sort()
+    handle, filePath = tempfile.mkstemp(suffix = '.txt')
+    os.close(handle)
+    with codecs.open(filePath, 'w', encoding='utf-8') as f:
+        for key, row in chunk:
+            f.write('\t'.join([str(numberOfKeys)] + list(key) + row) + '\n')
+    return filePath
+
+def GroupByKey(sortedRows):
+    '''
+    Groups sorted rows with the same key.
+
+    :param sortedRows: Iterable of (key, row) tuples sorted by key.
+    :type sortedRows: iterable((tuple, [str]))
+
+    :return: Generator of (key, [rows]) tuples.
+    :rtype: generator((tuple, [[str]]))
+    '''
+
+    currentKey = None
+    group = []
+    for key, row in sortedRows:
+        if(len(group) > 0 and key != currentKey):
+            yield (currentKey, group)
+            group = []
+        currentKey = key
+        group.append(row)
+    if(len(group) > 0):
+        yield (currentKey, group)
+
+def DiffSortedRows(firstRows, secondRows):
+    '''
+    Compares two iterables of rows sorted by key.
+
+    Rows sharing a key within a file are paired up in sort order: extra rows in either file are reported as added or removed.
+
+    :param firstRows: Iterable of (key, row) tuples sorted by key.
+    :type firstRows: iterable((tuple, [str]))
+    :param secondRows: Iterable of (key, row) tuples sorted by key.
+    :type secondRows: iterable((tuple, [str]))
+
+    :return: Generator of differences in format (DIFF_ constant, key, first row or None, second row or None), in key order.
+    :rtype: generator((str, tuple, [str], [str]))
+    '''
+
+    firstGroups = GroupByKey(firstRows)
+    secondGroups = GroupByKey(secondRows)
+    first = next(firstGroups, None)
+    second = next(secondGroups, None)
+    while(first is not None or second is not None):
+        if(second is None or (first is not None and first[0] < second[0])):
+            for row in first[1]:
+                yield (DIFF_REMOVED, first[0], row, None)
+            first = next(firstGroups, None)
+        elif(first is None or second[0] < first[0]):
+            for row in second[1]:
+                yield (DIFF_ADDED, second[0], None, row)
+            second = next(secondGroups, None)
+        else:
+            key, firstGroup = first
+            secondGroup = second[1]
+            # ignore rows in both files, pair up the others in order
+            if(len(firstGroup) > 1 or len(secondGroup) > 1):
+                remaining = list(secondGroup)
+                unmatched = []
+                for row in firstGroup:
+                    if(row in remaining):
+                        remaining.remove(row)
+                    else:
+                        unmatched.append(row)
+                firstGroup, secondGroup = unmatched, remaining
+            for i in range(max(len(firstGroup), len(secondGroup))):
+                if(i >= len(secondGroup)):
+                    yield (DIFF_REMOVED, key, firstGroup[i], None)
+                elif(i >= len(firstGroup)):
+                    yield (DIFF_ADDED, key, None, secondGroup[i])
+                elif(firstGroup[i] != secondGroup[i]):
+                    yield (DIFF_CHANGED, key, firstGroup[i], secondGroup[i])
+            first = next(firstGroups, None)
+            second = next(secondGroups, None)
+
+def DiffRows(firstRows, secondRows, keyIndexes, chunkRows = DEFAULT_SORT_CHUNK_ROWS):
+    '''
+    Compares two lists of rows.
+
+    :param firstRows: Iterable of rows.
+    :type firstRows: iterable([str])
+    :param secondRows: Iterable of rows.
+    :type secondRows: iterable([str])
+    :param keyIndexes: List of key column indexes.
+    :type keyIndexes: [int]
+    :param chunkRows: The number of rows sorted in memory at a time, defaults to DEFAULT_SORT_CHUNK_ROWS
+    :type chunkRows: int, optional
+
+    :return: Generator of differences (refer to :func:`DiffSortedRows`).
+    :rtype: generator((str, tuple, [str], [str]))
+    '''
+
+    tempFiles = []
+    try:
+        for difference in DiffSortedRows(
+            SortRows(firstRows, keyIndexes, chunkRows, tempFiles),
+            SortRows(secondRows, keyIndexes, chunkRows, tempFiles)):
+            yield difference
+    finally:
+        for tempFile in tempFiles:
+            try:
+                os.remove(tempFile)
+            except Exception:
+                pass
+
+def GetDiffColumns(firstFilePath, secondFilePath):
+    '''
+    Returns the columns two reports are compared on: the columns of the first report, followed by any columns only in the second report.
+
+    :param firstFilePath: The fully qualified file path of the first report.
+    :type firstFilePath: str
+    :param secondFilePath: The fully qualified file path of the second report.
+    :type secondFilePath: str
+
+    :return: List of column names.
+    :rtype: [str]
+    '''
+
+    columns = ReadHeader(firstFilePath)
+    known = set(columns)
+    for column in ReadHeader(secondFilePath):
+        if(column not in known):
+            columns.append(column)
+            known.add(column)
+    return columns
+
+def DiffReportFiles(firstFilePath, secondFilePath, keyColumns = None, chunkRows = DEFAULT_SORT_CHUNK_ROWS):
+    '''
+    Compares two report files.
+
+    :param firstFilePath: The fully qualified file path of the first (older) report.
+    :type firstFilePath: str
+    :param secondFilePath: The fully qualified file path of the second (newer) report.
+    :type secondFilePath: str
+    :param keyColumns: List of key column names, defaults to None (all columns: rows are only ever added or removed)
+    :type keyColumns: [str], optional
+    :param chunkRows: The number of rows sorted in memory at a time, defaults to DEFAULT_SORT_CHUNK_ROWS
+    :type chunkRows: int, optional
+
+    :raises ValueError: A key column is not in either report.
+
+    :return: List of column names, generator of differences (refer to :func:`DiffSortedRows`) with rows in order of the columns.
+    :rtype: [str], generator((str, tuple, [str], [str]))
+    '''
+
+    columns = GetDiffColumns(firstFilePath, secondFilePath)
+    if(keyColumns is None):
+        keyColumns = columns
+    keyIndexes = GetColumnIndexes(columns, keyColumns)
+    if(-1 in keyIndexes):
+        raise ValueError('Key column(s) not in reports: ' + str([keyColumns[i] for i in range(len(keyColumns)) if keyIndexes[i] == -1]))
+    return columns, DiffRows(ReadRows(firstFilePath, columns), ReadRows(secondFilePath, columns), keyIndexes, chunkRows)
+
+def WriteReportDiff(firstFilePath, secondFilePath, outputFilePath, keyColumns = None, chunkRows = DEFAULT_SORT_CHUNK_ROWS):
+    '''
+    Compares two report files and writes the differences to a report file.
+
+    The diff report has the columns DIFF_REPORT_HEADER followed by the report columns. Added rows show the values of\
+        the second report, removed rows the values of the first report and changed rows the values of the second report\
+        and the names of the columns which changed.
+
+    :param firstFilePath: The fully qualified file path of the first (older) report.
+    :type firstFilePath: str
+    :param secondFilePath: The fully qualified file path of the second (newer) report.
+    :type secondFilePath: str
+    :param outputFilePath: The fully qualified file path of the diff report.
+    :type outputFilePath: str
+    :param keyColumns: List of key column names, defaults to None (all columns)
+    :type keyColumns: [str], optional
+    :param chunkRows: The number of rows sorted in memory at a time, defaults to DEFAULT_SORT_CHUNK_ROWS
+    :type chunkRows: int, optional
+
+    :return: Dictionary where key is a DIFF_ constant and value the number of rows with that difference.
+    :rtype: {str: int}
+    '''
+
+    counts = {DIFF_ADDED: 0, DIFF_REMOVED: 0, DIFF_CHANGED: 0}
+    columns, differences = DiffReportFiles(firstFilePath, secondFilePath, keyColumns, chunkRows)
+    with rw.TsvReportWriter(outputFilePath, DIFF_REPORT_HEADER + columns) as writer:
+        for change, key, firstRow, secondRow in differences:
+            counts[change] += 1
+            if(change == DIFF_REMOVED):
+                writer.WriteRow([change, ''] + firstRow)
+            elif(change == DIFF_ADDED):
+                writer.WriteRow([change, ''] + secondRow)
+            else:
+                changedColumns = [columns[i] for i in range(len(columns)) if firstRow[i] != secondRow[i]]
+                writer.WriteRow([change, ','.join(changedColumns)] + secondRow)
+    return counts
+
+def GetLatestReports(reportDirectory, fileSuffix, fileExtension = '.txt'):
+    '''
+    Returns the two most recent date stamped reports of each Revit file in a directory.
+
+    Report file names are expected in format: date stamp + '_' + Revit file name + suffix + extension\
+        (refer to :func:`Utility.GetOutPutFileName`).
+
+    :param reportDirectory: The fully qualified directory path containing the reports.
+    :type reportDirectory: str
+    :param fileSuffix: The report file name suffix, i.e. '_Worksets'
+    :type fileSuffix: str
+    :param fileExtension: The report file extension, defaults to '.txt'
+    :type fileExtension: str, optional
+
+    :return: Dictionary where key is the Revit file name and value is a list of the previous and the latest report file path.\
+        Revit files with a single report are not included.
+    :rtype: {str: [str, str]}
+    '''
+
+    reportsByName = {}
+    for filePath in glob.glob(os.path.join(reportDirectory, '*' + fileSuffix + fileExtension)):
+        name = os.path.basename(filePath)[:-len(fileSuffix + fileExtension)]
+        try:
+            runDate = datetime.datetime.strptime(name[:8], REPORT_FILE_DATE_STAMP)
+        except ValueError:
+            continue
+        revitFileName = name[9:]
+        if(revitFileName not in reportsByName):
+            reportsByName[revitFileName] = []
+        reportsByName[revitFileName].append((runDate, filePath))
+    latestReports = {}
+    for revitFileName in reportsByName:
+        reports = sorted(reportsByName[revitFileName])
+        if(len(reports) > 1):
+            latestReports[revitFileName] = [reports[-2][1], reports[-1][1]]
+    return latestReports
+
+def WriteDriftReports(reportDirectory, fileSuffix, keyColumns, outputDirectory, fileExtension = '.txt'):
+    '''
+    Compares the latest report of each Revit file with its previous report (i.e. last night's run) and writes the differences\
+        to a drift report: latest report file name + DRIFT_REPORT_SUFFIX.
+
+    :param reportDirectory: The fully qualified directory path containing the reports.
+    :type reportDirectory: str
+    :param fileSuffix: The report file name suffix, i.e. '_Worksets'
+    :type fileSuffix: str
+    :param keyColumns: List of key column names, i.e. ['HOSTFILE', 'ID']
+    :type keyColumns: [str]
+    :param outputDirectory: The fully qualified directory path drift reports are written to.
+    :type outputDirectory: str
+    :param fileExtension: The report file extension, defaults to '.txt'
+    :type fileExtension: str, optional
+
+    :return: Dictionary where key is the Revit file name and value the number of rows by DIFF_ constant (refer to :func:`WriteReportDiff`).\
+        Only Revit files with differences are included.
+    :rtype: {str: {str: int}}
+    '''
+
+    drift = {}
+    latestReports = GetLatestReports(reportDirectory, fileSuffix, fileExtension)
+    for revitFileName in sorted(latestReports):
+        previousReport, latestReport = latestReports[revitFileName]
+        outputFilePath = os.path.join(outputDirectory, os.path.splitext(os.path.basename(latestReport))[0] + DRIFT_REPORT_SUFFIX + fileExtension)
+        counts = WriteReportDiff(previousReport, latestReport, outputFilePath, keyColumns)
+        if(sum(counts.values()) > 0):
+            drift[revitFileName] = counts
+        else:
+            # no drift: no report needed
+            os.remove(outputFilePath)
+    return drift
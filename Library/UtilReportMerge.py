@@ -0,0 +1,199 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Helper functions to merge tab separated report files with different columns into a single report.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+The merged report contains the alphabetically sorted unique headers of all files. Values of columns which do not exist\
+    in a file, or which are missing in a row shorter than the header row, are reported as 'N/A'.
+
+Empty headers are renamed to be unique per file: file name without extension + '.Empty.' + counter (starting at 0).\
+    Trailing empty headers (i.e. the trailing tab written by :func:`Utility.writeReportData`) are ignored.
+
+Rows are streamed: memory use depends on the number of columns, not on the size of the files.
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import os
+
+import UtilParallel as parallel
+
+#: Value of a column which does not exist in a file or row
+NOT_AVAILABLE = 'N/A'
+#: Used in names of empty headers: file name + EMPTY_HEADER_INFIX + counter
+EMPTY_HEADER_INFIX = '.Empty.'
+
+def GetHeadersFromRow(row, filePath):
+    '''
+    Returns the headers in a header row, with empty headers renamed to be unique.
+
+    :param row: The header row as read from file.
+    :type row: str
+    :param filePath: The fully qualified file path of the report (used to name empty headers).
+    :type filePath: str
+
+    :return: List of headers in order of the columns. Trailing empty headers are not included.
+    :rtype: [str]
+    '''
+
+    # trailing white space only: leading empty headers still need to line up with the row values
+    row = row.rstrip()
+    if(row == ''):
+        return []
+    headers = row.split('\t')
+    fileName = os.path.splitext(os.path.basename(filePath))[0]
+    emptyHeaderCounter = 0
+    for i in range(len(headers)):
+        if(headers[i] == ''):
+            headers[i] = fileName + EMPTY_HEADER_INFIX + str(emptyHeaderCounter)
+            emptyHeaderCounter = emptyHeaderCounter + 1
+    return headers
+
+def ReadHeaders(filePath):
+    '''
+    Reads the headers of a report file (first row).
+
+    :param filePath: The fully qualified file path of the report.
+    :type filePath: str
+
+    :return: List of headers (refer to :func:`GetHeadersFromRow`).
+    :rtype: [str]
+    '''
+
+    with open(filePath, 'r') as f:
+        return GetHeadersFromRow(f.readline(), filePath)
+
+def GetUniqueHeaders(filePaths, maxWorkers = 1):
+    '''
+    Returns the alphabetically sorted unique headers of a number of report files.
+
+    Files which can not be read are ignored.
+
+    :param filePaths: List of fully qualified file paths of reports.
+    :type filePaths: [str]
+    :param maxWorkers: The number of files read in parallel, defaults to 1 (one after another). Use 0 for one file per processor.
+    :type maxWorkers: int, optional
+
+    :return: List of headers.
+    :rtype: [str]
+    '''
+
+    uniqueHeaders = set()
+    for headers, exception in parallel.MapInParallel(ReadHeaders, filePaths, maxWorkers):
+        if(exception is None):
+            uniqueHeaders.update(headers)
+    return sorted(uniqueHeaders)
+
+def GetColumnMapper(uniqueHeaders, headersInFile):
+    '''
+    Maps the unique headers to the columns of a file.
+
+    :param uniqueHeaders: List of unique headers (columns of the merged report).
+    :type uniqueHeaders: [str]
+    :param headersInFile: List of headers in the file.
+    :type headersInFile: [str]
+
+    :return: List in order of the unique headers: the column index in the file, or -1 if the header is not in the file.
+    :rtype: [int]
+    '''
+
+    # first column wins if a header is duplicated
+    headerIndex = {}
+    for i in range(len(headersInFile)):
+        if(headersInFile[i] not in headerIndex):
+            headerIndex[headersInFile[i]] = i
+    return [headerIndex.get(header, -1) for header in uniqueHeaders]
+
+def GetPaddedRow(rowData, columnMapper):
+    '''
+    Returns the values of a row in order of the merged report columns.
+
+    :param rowData: List of values in a row.
+    :type rowData: [str]
+    :param columnMapper: The column mapper of the file (refer to :func:`GetColumnMapper`).
+    :type columnMapper: [int]
+
+    :return: List of values, NOT_AVAILABLE where a column does not exist in the file or row.
+    :rtype: [str]
+    '''
+
+    numberOfValues = len(rowData)
+    return [rowData[cm] if (cm >= 0 and cm < numberOfValues) else NOT_AVAILABLE for cm in columnMapper]
+
+def GetPaddedRows(filePath, uniqueHeaders):
+    '''
+    Reads the rows of a report file (all but the header row) and pads them to the merged report columns.
+
+    :param filePath: The fully qualified file path of the report.
+    :type filePath: str
+    :param uniqueHeaders: List of unique headers (columns of the merged report).
+    :type uniqueHeaders: [str]
+
+    :return: Generator of rows, formatted as written to the merged report.
+    :rtype: generator(str)
+    '''
+
+    with open(filePath, 'r') as f:
+        columnMapper = GetColumnMapper(uniqueHeaders, GetHeadersFromRow(f.readline(), filePath))
+        for line in f:
+            yield '\t'.join(GetPaddedRow(line.rstrip('\r\n').split('\t'), columnMapper) + ['\n'])
+
+def MergeReports(filePaths, outputFilePath, maxWorkers = 1):
+    '''
+    Merges report files with different columns into a single report.
+
+    If more than one worker is used files are read in parallel, in batches of one file per worker. Rows are always\
+        written in order of the files.
+
+    :param filePaths: List of fully qualified file paths of reports.
+    :type filePaths: [str]
+    :param outputFilePath: The fully qualified file path of the merged report.
+    :type outputFilePath: str
+    :param maxWorkers: The number of files read in parallel, defaults to 1 (one after another, rows are streamed).\
+        Use 0 for one file per processor.
+    :type maxWorkers: int, optional
+
+    :return: The number of rows written (excluding the header row).
+    :rtype: int
+    '''
+
+    uniqueHeaders = GetUniqueHeaders(filePaths, maxWorkers)
+    workerCount = parallel.GetWorkerCount(maxWorkers, len(filePaths))
+    rowCounter = 0
+    with open(outputFilePath, 'w') as result:
+        if(len(filePaths) > 0):
+            result.write('\t'.join(uniqueHeaders + ['\n']))
+        if(workerCount < 2):
+            for filePath in filePaths:
+                for row in GetPaddedRows(filePath, uniqueHeaders):
+                    result.write(row)
+                    rowCounter += 1
+        else:
+            for batchStart in range(0, len(filePaths), workerCount):
+                batch = filePaths[batchStart:batchStart + workerCount]
+                for rows, exception in parallel.MapInParallel(lambda filePath: list(GetPaddedRows(filePath, uniqueHeaders)), batch, workerCount):
+                    if(exception is not None):
+                        raise exception
+                    result.writelines(rows)
+                    rowCounter += len(rows)
+    return rowCounter
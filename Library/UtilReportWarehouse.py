@@ -0,0 +1,509 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+A local SQLite database collecting the report files written by the Report*.py sample scripts and the model health report.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+This module requires the sqlite3 module, which means it runs in python but not in IronPython.
+
+Report files are recognised by their file name suffix (refer to REPORT_TYPES). Each report type gets its own table with\
+    a column per report header, plus:
+
+- SOURCE_ID: id of the report file the row was read from
+- HOST_FILE: the name (without extension) of the Revit file reported on, taken from the HOSTFILE column value (kept as\
+    is in the HOSTFILE column) or from the report file name
+- RUN_DATE: the date the report was written (ISO format, taken from the report file name date stamp)
+
+Model health report files (one value per file) go into a single MODEL_HEALTH table, one row per metric.
+
+Ingesting is incremental: a report file is only read again if its size or modified time changed since it was last\
+    ingested, in which case its previous rows are replaced.
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import os
+import codecs
+import datetime
+import sqlite3
+
+import Result as res
+import UtilReportWriter as rw
+import UtilFileDiscovery as discovery
+import RevitModelHealthReportFileNames as rFns
+
+#: Table keeping track of ingested report files
+INGESTED_FILES_TABLE = 'INGESTED_FILES'
+#: Table containing model health report values
+MODEL_HEALTH_TABLE = 'MODEL_HEALTH'
+#: Column containing the id of the report file a row was read from
+SOURCE_ID_COLUMN = 'SOURCE_ID'
+#: Column containing the Revit file a row reports on
+HOST_FILE_COLUMN = 'HOST_FILE'
+#: Column containing the date a report was written
+RUN_DATE_COLUMN = 'RUN_DATE'
+#: Report column containing the Revit file path
+REPORT_HOST_COLUMN = 'HOSTFILE'
+#: Date stamp at the start of report file names (refer to :func:`Utility.GetFileDateStamp`)
+REPORT_FILE_DATE_STAMP = '%y_%m_%d'
+#: Date format of model health report rows
+MODEL_HEALTH_DATE_STAMP = '%Y %m %d'
+#: File extension of report files
+REPORT_FILE_EXTENSION = '.txt'
+#: File extension of model health report files
+MODEL_HEALTH_FILE_EXTENSION = '.temp'
+#: File extensions removed from HOSTFILE column values
+REVIT_FILE_EXTENSIONS = ['.rvt', '.rfa', '.rte', '.rft']
+
+class ReportType:
+    def __init__(self, name, fileSuffix):
+        '''
+        Class constructor.
+
+        :param name: The report type name, used as table name.
+        :type name: str
+        :param fileSuffix: Report file names end with this suffix (before the file extension).
+        :type fileSuffix: str
+        '''
+
+        self.name = name
+        self.fileSuffix = fileSuffix
+
+#: Report types written by the Report*.py sample scripts
+REPORT_TYPES = [
+    ReportType('REVIT_LINKS', '_RVT'),
+    ReportType('CAD_LINKS', '_CAD'),
+    ReportType('WORKSETS', '_Worksets'),
+    ReportType('SHARED_PARAMETERS', '_SharedParas'),
+    ReportType('GRIDS', '_grids'),
+    ReportType('LEVELS', '_levels'),
+    ReportType('WALL_TYPES', '_WallTypes'),
+    ReportType('MATERIALS', '_Materials')
+]
+
+def OpenWarehouse(databaseFilePath):
+    '''
+    Opens a report warehouse, creating the database if it does not exist.
+
+    :param databaseFilePath: The fully qualified file path of the SQLite database.
+    :type databaseFilePath: str
+
+    :return: The database connection.
+    :rtype: sqlite3.Connection
+    '''
+
+    connection = sqlite3.connect(databaseFilePath)
+    # files are committed one at a time: write ahead log keeps commits cheap
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.execute(
+        'CREATE TABLE IF NOT EXISTS ' + INGESTED_FILES_TABLE + ' (ID INTEGER PRIMARY KEY, PATH TEXT UNIQUE, SIZE INTEGER, MODIFIED REAL,'
+        ' REPORT_TYPE TEXT, ' + RUN_DATE_COLUMN + ' TEXT, ROWS INTEGER, INGESTED_UTC TEXT)')
+    connection.execute(
+        'CREATE TABLE IF NOT EXISTS ' + MODEL_HEALTH_TABLE + ' (' + SOURCE_ID_COLUMN + ' INTEGER, ' + HOST_FILE_COLUMN + ' TEXT, '
+        + RUN_DATE_COLUMN + ' TEXT, RUN_TIME TEXT, METRIC TEXT, VALUE TEXT)')
+    connection.execute(
+        'CREATE INDEX IF NOT EXISTS IDX_' + MODEL_HEALTH_TABLE + '_METRIC ON ' + MODEL_HEALTH_TABLE
+        + ' (METRIC, ' + HOST_FILE_COLUMN + ', ' + RUN_DATE_COLUMN + ')')
+    connection.execute('CREATE INDEX IF NOT EXISTS IDX_' + MODEL_HEALTH_TABLE + '_SOURCE ON ' + MODEL_HEALTH_TABLE + ' (' + SOURCE_ID_COLUMN + ')')
+    connection.commit()
+    return connection
+
+def GetReportType(filePath, reportTypes = REPORT_TYPES):
+    '''
+    Returns the report type of a file from its file name.
+
+    :param filePath: The fully qualified file path.
+    :type filePath: str
+    :param reportTypes: The report types to check, defaults to REPORT_TYPES
+    :type reportTypes: [:class:`.ReportType`], optional
+
+    :return: The report type name, MODEL_HEALTH_TABLE for model health reports or None if not a report file.
+    :rtype: str
+    '''
+
+    name, extension = os.path.splitext(os.path.basename(filePath))
+    if(extension.lower() == REPORT_FILE_EXTENSION):
+        for reportType in reportTypes:
+            if(name.endswith(reportType.fileSuffix)):
+                return reportType.name
+    elif(extension.lower() == MODEL_HEALTH_FILE_EXTENSION):
+        for suffix in rFns.PARAM_ACTIONS_FILENAMES:
+            if(name.endswith(suffix)):
+                return MODEL_HEALTH_TABLE
+    return None
+
+def GetRunDate(filePath, modified):
+    '''
+    Returns the date a report was written.
+
+    :param filePath: The fully qualified file path of the report.
+    :type filePath: str
+    :param modified: The file modified time in seconds since the epoch, used if the file name does not start with a date stamp.
+    :type modified: float
+
+    :return: The date in ISO format (yyyy-mm-dd).
+    :rtype: str
+    '''
+
+    try:
+        # date stamp is always 8 characters: 21_03_01
+        return datetime.datetime.strptime(os.path.basename(filePath)[:8], REPORT_FILE_DATE_STAMP).strftime('%Y-%m-%d')
+    except ValueError:
+        return datetime.datetime.fromtimestamp(modified).strftime('%Y-%m-%d')
+
+def GetHostFileFromFileName(filePath, fileSuffix):
+    '''
+    Returns the Revit file name from a report file name: the file name without date stamp, suffix and extension.
+
+    :param filePath: The fully qualified file path of the report.
+    :type filePath: str
+    :param fileSuffix: The report file name suffix.
+    :type fileSuffix: str
+
+    :return: The Revit file name without extension.
+    :rtype: str
+    '''
+
+    name = os.path.splitext(os.path.basename(filePath))[0]
+    if(name.endswith(fileSuffix)):
+        name = name[:len(name) - len(fileSuffix)]
+    try:
+        datetime.datetime.strptime(name[:8], REPORT_FILE_DATE_STAMP)
+        name = name[8:]
+    except ValueError:
+        pass
+    # report file names have an underscore between date stamp and name
+    if(name.startswith('_')):
+        name = name[1:]
+    return name
+
+def GetHostFileName(hostFile):
+    '''
+    Returns the Revit file name without directory and extension, so rows of reports storing a file path and rows of\
+        reports storing a file name have the same HOST_FILE value.
+
+    :param hostFile: A Revit file path or name.
+    :type hostFile: str
+
+    :return: The Revit file name without extension.
+    :rtype: str
+    '''
+
+    # report file paths are windows paths, whichever system the warehouse runs on
+    name = hostFile.replace('\\', '/').split('/')[-1]
+    # Revit file names may contain dots: only remove a Revit file extension
+    root, extension = os.path.splitext(name)
+    if(extension.lower() in REVIT_FILE_EXTENSIONS):
+        return root
+    return name
+
+def GetTableColumns(connection, tableName):
+    '''
+    Returns the columns of a table.
+
+    :param connection: The warehouse database connection.
+    :type connection: sqlite3.Connection
+    :param tableName: The table name.
+    :type tableName: str
+
+    :return: List of column names. Empty if the table does not exist.
+    :rtype: [str]
+    '''
+
+    return [row[1] for row in connection.execute('PRAGMA table_info(' + rw.QuoteIdentifier(tableName) + ')')]
+
+def EnsureReportTable(connection, tableName, columns):
+    '''
+    Creates a report table, or adds any columns missing to an existing table.
+
+    :param connection: The warehouse database connection.
+    :type connection: sqlite3.Connection
+    :param tableName: The table name.
+    :type tableName: str
+    :param columns: The report columns.
+    :type columns: [str]
+    '''
+
+    table = rw.QuoteIdentifier(tableName)
+    existingColumns = GetTableColumns(connection, tableName)
+    if(len(existingColumns) == 0):
+        connection.execute(
+            'CREATE TABLE ' + table + ' (' + SOURCE_ID_COLUMN + ' INTEGER, ' + HOST_FILE_COLUMN + ' TEXT, ' + RUN_DATE_COLUMN + ' TEXT'
+            + ''.join([', ' + rw.QuoteIdentifier(c) + ' TEXT' for c in columns]) + ')')
+        connection.execute(
+            'CREATE INDEX ' + rw.QuoteIdentifier('IDX_' + tableName + '_HOST') + ' ON ' + table + ' (' + HOST_FILE_COLUMN + ', ' + RUN_DATE_COLUMN + ')')
+        connection.execute('CREATE INDEX ' + rw.QuoteIdentifier('IDX_' + tableName + '_RUN') + ' ON ' + table + ' (' + RUN_DATE_COLUMN + ')')
+        connection.execute('CREATE INDEX ' + rw.QuoteIdentifier('IDX_' + tableName + '_SOURCE') + ' ON ' + table + ' (' + SOURCE_ID_COLUMN + ')')
+    else:
+        # report headers change over time: add new columns
+        existing = set([c.lower() for c in existingColumns])
+        for c in columns:
+            if(c.lower() not in existing):
+                connection.execute('ALTER TABLE ' + table + ' ADD COLUMN ' + rw.QuoteIdentifier(c) + ' TEXT')
+                existing.add(c.lower())
+
+def ReadReportRows(filePath, hostFileName, runDate, sourceId):
+    '''
+    Reads a report file into table rows.
+
+    :param filePath: The fully qualified file path of the report.
+    :type filePath: str
+    :param hostFileName: The Revit file name used if the report has no HOSTFILE column.
+    :type hostFileName: str
+    :param runDate: The run date.
+    :type runDate: str
+    :param sourceId: The report file id.
+    :type sourceId: int
+
+    :return: List of report columns, list of rows (in order SOURCE_ID, HOST_FILE, RUN_DATE, report columns). HOST_FILE is the\
+        Revit file name without extension (refer to :func:`GetHostFileName`).
+    :rtype: [str], [[var]]
+    '''
+
+    rows = []
+    with codecs.open(filePath, 'r', encoding='utf-8') as f:
+        # trailing tab written after the last header is not a column
+        header = f.readline().rstrip()
+        if(header == ''):
+            return [], rows
+        columns = rw.GetColumnNames(header.split('\t'))
+        numberOfColumns = len(columns)
+        hostIndex = -1
+        if(REPORT_HOST_COLUMN in columns):
+            hostIndex = columns.index(REPORT_HOST_COLUMN)
+        for line in f:
+            values = line.rstrip('\r\n').split('\t')
+            if(len(values) == 1 and values[0] == ''):
+                continue
+            values = (values + [None] * numberOfColumns)[:numberOfColumns]
+            hostFile = hostFileName
+            if(hostIndex >= 0 and values[hostIndex]):
+                hostFile = GetHostFileName(values[hostIndex])
+            rows.append([sourceId, hostFile, runDate] + values)
+    return columns, rows
+
+def ReadModelHealthRows(filePath, hostFileName, runDate, sourceId):
+    '''
+    Reads a model health report file (refer to :func:`RevitModelHealth.WriteModelHealthReport`) into table rows.
+
+    Rows are in format: Revit file name, metric, date (yyyy mm dd), time, value
+
+    :param filePath: The fully qualified file path of the report.
+    :type filePath: str
+    :param hostFileName: The Revit file name used if a row has none.
+    :type hostFileName: str
+    :param runDate: The run date used if a row has no valid date.
+    :type runDate: str
+    :param sourceId: The report file id.
+    :type sourceId: int
+
+    :return: List of rows (in order SOURCE_ID, HOST_FILE, RUN_DATE, RUN_TIME, METRIC, VALUE)
+    :rtype: [[var]]
+    '''
+
+    rows = []
+    with codecs.open(filePath, 'r', encoding='utf-8') as f:
+        for line in f:
+            values = line.rstrip('\r\n').split('\t')
+            if(len(values) < 5):
+                continue
+            rowDate = runDate
+            try:
+                rowDate = datetime.datetime.strptime(values[2], MODEL_HEALTH_DATE_STAMP).strftime('%Y-%m-%d')
+            except ValueError:
+                pass
+            rows.append([sourceId, values[0] or hostFileName, rowDate, values[3], values[1], values[4]])
+    return rows
+
+def IngestFile(connection, filePath, reportType, reportTypes = REPORT_TYPES):
+    '''
+    Ingests a single report file, replacing any rows previously ingested from it.
+
+    :param connection: The warehouse database connection.
+    :type connection: sqlite3.Connection
+    :param filePath: The fully qualified file path of the report.
+    :type filePath: str
+    :param reportType: The report type name (refer to :func:`GetReportType`).
+    :type reportType: str
+    :param reportTypes: The report types, defaults to REPORT_TYPES
+    :type reportTypes: [:class:`.ReportType`], optional
+
+    :return: The number of rows ingested.
+    :rtype: int
+    '''
+
+    size = os.path.getsize(filePath)
+    modified = os.path.getmtime(filePath)
+    runDate = GetRunDate(filePath, modified)
+    existing = connection.execute('SELECT ID, REPORT_TYPE FROM ' + INGESTED_FILES_TABLE + ' WHERE PATH = ?', (filePath,)).fetchone()
+    if(existing is not None):
+        sourceId = existing[0]
+        if(len(GetTableColumns(connection, existing[1])) > 0):
+            connection.execute('DELETE FROM ' + rw.QuoteIdentifier(existing[1]) + ' WHERE ' + SOURCE_ID_COLUMN + ' = ?', (sourceId,))
+    else:
+        sourceId = connection.execute('INSERT INTO ' + INGESTED_FILES_TABLE + ' (PATH) VALUES (?)', (filePath,)).lastrowid
+    if(reportType == MODEL_HEALTH_TABLE):
+        name = os.path.splitext(os.path.basename(filePath))[0]
+        # longest matching suffix
+        suffix = max([s for s in rFns.PARAM_ACTIONS_FILENAMES if name.endswith(s)] + [''], key = len)
+        rows = ReadModelHealthRows(filePath, GetHostFileFromFileName(filePath, suffix), runDate, sourceId)
+        connection.executemany('INSERT INTO ' + MODEL_HEALTH_TABLE + ' VALUES (?, ?, ?, ?, ?, ?)', rows)
+    else:
+        suffix = [t.fileSuffix for t in reportTypes if t.name == reportType][0]
+        columns, rows = ReadReportRows(filePath, GetHostFileFromFileName(filePath, suffix), runDate, sourceId)
+        if(len(columns) > 0):
+            EnsureReportTable(connection, reportType, columns)
+            statement = 'INSERT INTO ' + rw.QuoteIdentifier(reportType) + ' (' + ', '.join(
+                [SOURCE_ID_COLUMN, HOST_FILE_COLUMN, RUN_DATE_COLUMN] + [rw.QuoteIdentifier(c) for c in columns]) + ') VALUES (' + ', '.join(['?'] * (len(columns) + 3)) + ')'
+            connection.executemany(statement, rows)
+    connection.execute(
+        'UPDATE ' + INGESTED_FILES_TABLE + ' SET SIZE = ?, MODIFIED = ?, REPORT_TYPE = ?, ' + RUN_DATE_COLUMN + ' = ?, ROWS = ?, INGESTED_UTC = ? WHERE ID = ?',
+        (size, modified, reportType, runDate, len(rows), datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S'), sourceId))
+    return len(rows)
+
+def IngestReports(connection, directory, includeSubDirs = False, reportTypes = REPORT_TYPES):
+    '''
+    Ingests all new or changed report files in a directory.
+
+    :param connection: The warehouse database connection.
+    :type connection: sqlite3.Connection
+    :param directory: The fully qualified directory path containing the report files.
+    :type directory: str
+    :param includeSubDirs: Flag indicating whether report files in sub directories are ingested too, defaults to False
+    :type includeSubDirs: bool, optional
+    :param reportTypes: The report types to ingest, defaults to REPORT_TYPES
+    :type reportTypes: [:class:`.ReportType`], optional
+
+    :return:
+        Result class instance.
+
+        - .status True if all report files were ingested successfully, otherwise False.
+        - .message will contain the number of files ingested, unchanged and failed, and any exception messages.
+        - .result will contain the fully qualified file paths of the report files ingested.
+    :rtype: :class:`.Result`
+    '''
+
+    returnvalue = res.Result()
+    ingested = {}
+    for path, modified, size in connection.execute('SELECT PATH, MODIFIED, SIZE FROM ' + INGESTED_FILES_TABLE):
+        ingested[path] = (modified, size)
+    unchanged = 0
+    failed = 0
+    rowCount = 0
+    for f in discovery.DiscoverFiles(directory, discovery.FileFilter(''), includeSubDirs):
+        filePath = f.path
+        reportType = GetReportType(filePath, reportTypes)
+        if(reportType is None):
+            continue
+        if(ingested.get(filePath) == (f.modified, f.size)):
+            unchanged += 1
+            continue
+        try:
+            rowCount += IngestFile(connection, filePath, reportType, reportTypes)
+            # one transaction per file: a failed file leaves no partial rows
+            connection.commit()
+            returnvalue.result.append(filePath)
+        except Exception as e:
+            connection.rollback()
+            failed += 1
+            returnvalue.UpdateSep(False, 'Failed to ingest report file: ' + filePath + ' with exception: ' + str(e))
+    returnvalue.AppendMessage(
+        'Ingested report files: ' + str(len(returnvalue.result)) + ' [rows: ' + str(rowCount) + '] unchanged: ' + str(unchanged) + ' failed: ' + str(failed))
+    return returnvalue
+
+def QueryReport(connection, reportType, hostFile = None, runDate = None):
+    '''
+    Returns report rows, optionally for a single Revit file and / or run date.
+
+    :param connection: The warehouse database connection.
+    :type connection: sqlite3.Connection
+    :param reportType: The report type name.
+    :type reportType: str
+    :param hostFile: The Revit file (as in the HOST_FILE column), defaults to None (all)
+    :type hostFile: str, optional
+    :param runDate: The run date (yyyy-mm-dd), defaults to None (all)
+    :type runDate: str, optional
+
+    :return: List of column names, list of rows sorted by Revit file and run date.
+    :rtype: [str], [[str]]
+    '''
+
+    conditions = []
+    parameters = []
+    if(hostFile is not None):
+        conditions.append(HOST_FILE_COLUMN + ' = ?')
+        parameters.append(hostFile)
+    if(runDate is not None):
+        conditions.append(RUN_DATE_COLUMN + ' = ?')
+        parameters.append(runDate)
+    statement = 'SELECT * FROM ' + rw.QuoteIdentifier(reportType)
+    if(len(conditions) > 0):
+        statement = statement + ' WHERE ' + ' AND '.join(conditions)
+    cursor = connection.execute(statement + ' ORDER BY ' + HOST_FILE_COLUMN + ', ' + RUN_DATE_COLUMN, parameters)
+    return [d[0] for d in cursor.description], [list(row) for row in cursor]
+
+def GetRowCountTrend(connection, reportType, hostFile = None):
+    '''
+    Returns the number of report rows per Revit file and run date, i.e. the number of worksets of each model over time.
+
+    :param connection: The warehouse database connection.
+    :type connection: sqlite3.Connection
+    :param reportType: The report type name.
+    :type reportType: str
+    :param hostFile: The Revit file (as in the HOST_FILE column), defaults to None (all)
+    :type hostFile: str, optional
+
+    :return: List of rows in format [Revit file, run date, number of rows], sorted by Revit file and run date.
+    :rtype: [[str, str, int]]
+    '''
+
+    statement = 'SELECT ' + HOST_FILE_COLUMN + ', ' + RUN_DATE_COLUMN + ', COUNT(*) FROM ' + rw.QuoteIdentifier(reportType)
+    parameters = []
+    if(hostFile is not None):
+        statement = statement + ' WHERE ' + HOST_FILE_COLUMN + ' = ?'
+        parameters.append(hostFile)
+    statement = statement + ' GROUP BY ' + HOST_FILE_COLUMN + ', ' + RUN_DATE_COLUMN + ' ORDER BY ' + HOST_FILE_COLUMN + ', ' + RUN_DATE_COLUMN
+    return [list(row) for row in connection.execute(statement, parameters)]
+
+def GetModelHealthTrend(connection, metric, hostFile = None):
+    '''
+    Returns the values of a model health metric over time.
+
+    :param connection: The warehouse database connection.
+    :type connection: sqlite3.Connection
+    :param metric: The metric name, as written by the model health report (a key of RevitModelHealth.PARAM_ACTIONS, i.e. 'ValueWorksets').
+    :type metric: str
+    :param hostFile: The Revit file name, defaults to None (all)
+    :type hostFile: str, optional
+
+    :return: List of rows in format [Revit file name, run date, run time, value], sorted by Revit file, run date and time.
+    :rtype: [[str, str, str, str]]
+    '''
+
+    statement = 'SELECT ' + HOST_FILE_COLUMN + ', ' + RUN_DATE_COLUMN + ', RUN_TIME, VALUE FROM ' + MODEL_HEALTH_TABLE + ' WHERE METRIC = ?'
+    parameters = [metric]
+    if(hostFile is not None):
+        statement = statement + ' AND ' + HOST_FILE_COLUMN + ' = ?'
+        parameters.append(hostFile)
+    statement = statement + ' ORDER BY ' + HOST_FILE_COLUMN + ', ' + RUN_DATE_COLUMN + ', RUN_TIME'
+    return [list(row) for row in connection.execute(statement, parameters)]
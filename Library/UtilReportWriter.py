@@ -0,0 +1,467 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Report writers buffering rows in memory and writing them to file in large chunks.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Supported sinks:
+
+- SINK_TSV: tab separated, utf-8 encoded text file. Same format as written by :func:`Utility.writeReportData` to date:\
+    each header and row value followed by a tab, rows end with a new line character. Rows with a single value are written\
+    without a tab.
+- SINK_GZIP: as SINK_TSV but gzip compressed.
+- SINK_SQLITE: a table in a SQLite database (one text column per header). Only available where the sqlite3 module is\
+    (not in IronPython).
+
+Batch processor sessions running in parallel and appending to the same report file compete for the file. Each session\
+    can write to its own shard file instead (refer to :func:`GetShardFileName`), which are merged into a single\
+    report once all sessions finished (refer to :func:`MergeShardFiles`).
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import os
+import glob
+import codecs
+import gzip
+import shutil
+
+try:
+    import sqlite3
+    SQLITE_AVAILABLE = True
+except ImportError:
+    SQLITE_AVAILABLE = False
+
+#: Tab separated text file sink
+SINK_TSV = 'tsv'
+#: Gzip compressed tab separated text file sink
+SINK_GZIP = 'gzip'
+#: SQLite database table sink
+SINK_SQLITE = 'sqlite'
+
+#: Number of characters buffered before they are written to file
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+#: Default SQLite table name
+DEFAULT_TABLE_NAME = 'report'
+#: Separates the report file name from the session id in shard file names
+SHARD_INFIX = '.shard_'
+
+def FormatRow(row):
+    '''
+    Formats a header or data row as written to a tab separated report file.
+
+    :param row: List of values.
+    :type row: [str]
+
+    :return: The row followed by a new line character. An empty string if the row has no values.
+    :rtype: str
+    '''
+
+    if(len(row) > 1):
+        return '\t'.join(row + ['\n'])
+    elif(len(row) == 1):
+        return row[0] + '\n'
+    return ''
+
+class ReportWriter:
+    def __init__(self, fileName, header, writeType = 'w', bufferSize = DEFAULT_BUFFER_SIZE):
+        '''
+        Class constructor.
+
+        Base class of all report writers. Rows are buffered until the buffer size is exceeded or the writer is flushed or closed.\
+            The report file is opened when first written to.
+
+        Use one of the writers derived from this class (refer to :func:`GetReportWriter`). Those provide the methods\
+            writing to their sink:
+
+        - _Open(): opens the report file (using fileName and writeType). Called once, before the first write.
+        - _Write(buffer): writes the buffered rows, a list of rows as returned by FormatRow() (or as stored by _Buffer()).
+        - _Close(): closes the report file. Only called if it was opened.
+
+        :param fileName: Fully qualified file path of the report.
+        :type fileName: str
+        :param header: List of column headers, provide empty list if not required!
+        :type header: [str]
+        :param writeType: 'w' new file, 'a' append to existing file, defaults to 'w'
+        :type writeType: str, optional
+        :param bufferSize: Number of characters buffered before they are written, defaults to DEFAULT_BUFFER_SIZE
+        :type bufferSize: int, optional
+        '''
+
+        self.fileName = fileName
+        self.header = header
+        self.writeType = writeType
+        self.bufferSize = bufferSize
+        self.rowCount = 0
+        self.buffer = []
+        self.bufferedSize = 0
+        self.isOpen = False
+        self.headerWritten = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.Close()
+        return False
+
+    def WriteRow(self, row):
+        '''
+        Adds a row to the report.
+
+        :param row: List of values.
+        :type row: [str]
+        '''
+
+        if(not self.headerWritten):
+            self.headerWritten = True
+            if(len(self.header) > 0):
+                self._Buffer(self.header, True)
+        self._Buffer(row, False)
+        self.rowCount += 1
+
+    def WriteRows(self, rows):
+        '''
+        Adds a number of rows to the report.
+
+        :param rows: List of list of strings representing row data
+        :type rows: [[str]]
+        '''
+
+        for row in rows:
+            self.WriteRow(row)
+
+    def Flush(self):
+        '''
+        Writes all buffered rows to file.
+        '''
+
+        if(not self.isOpen):
+            self._Open()
+            self.isOpen = True
+        if(len(self.buffer) > 0):
+            self._Write(self.buffer)
+            self.buffer = []
+            self.bufferedSize = 0
+
+    def Close(self):
+        '''
+        Writes all buffered rows and closes the report file. A report without any rows still gets its header written.
+        '''
+
+        if(not self.headerWritten):
+            self.headerWritten = True
+            if(len(self.header) > 0):
+                self._Buffer(self.header, True)
+        self.Flush()
+        if(self.isOpen):
+            self._Close()
+            self.isOpen = False
+
+    def _Buffer(self, row, isHeader):
+        text = FormatRow(row)
+        self.buffer.append(text)
+        self.bufferedSize += len(text)
+        if(self.bufferedSize >= self.bufferSize):
+            self.Flush()
+
+class TsvReportWriter(ReportWriter):
+    def __init__(self, fileName, header, writeType = 'w', bufferSize = DEFAULT_BUFFER_SIZE):
+        '''
+        Class constructor.
+
+        Writes a utf-8 encoded, tab separated text file.
+
+        Refer to :class:`.ReportWriter` for parameters.
+        '''
+
+        ReportWriter.__init__(self, fileName, header, writeType, bufferSize)
+        self.file = None
+
+    def _Open(self):
+        self.file = codecs.open(self.fileName, self.writeType, encoding='utf-8')
+
+    def _Write(self, buffer):
+        self.file.write(''.join(buffer))
+
+    def _Close(self):
+        self.file.close()
+
+class GzipReportWriter(ReportWriter):
+    def __init__(self, fileName, header, writeType = 'w', bufferSize = DEFAULT_BUFFER_SIZE):
+        '''
+        Class constructor.
+
+        Writes a gzip compressed, utf-8 encoded, tab separated text file. Appending adds a new gzip member to the file,\
+            which gzip readers return as one continuous file.
+
+        Refer to :class:`.ReportWriter` for parameters.
+        '''
+
+        ReportWriter.__init__(self, fileName, header, writeType, bufferSize)
+        self.file = None
+
+    def _Open(self):
+        self.file = gzip.open(self.fileName, self.writeType + 'b')
+
+    def _Write(self, buffer):
+        self.file.write(''.join(buffer).encode('utf-8'))
+
+    def _Close(self):
+        self.file.close()
+
+class SqliteReportWriter(ReportWriter):
+    def __init__(self, fileName, header, writeType = 'w', bufferSize = DEFAULT_BUFFER_SIZE, tableName = DEFAULT_TABLE_NAME):
+        '''
+        Class constructor.
+
+        Writes rows into a SQLite database table with one text column per header. Rows are padded with NULL or cut to the\
+            number of columns. Writing to a new table ('w') replaces any existing table of the same name.\
+            Appending to a table without providing a header uses the columns of the existing table.
+
+        Refer to :class:`.ReportWriter` for parameters.
+
+        :param tableName: The table name, defaults to DEFAULT_TABLE_NAME
+        :type tableName: str, optional
+        '''
+
+        if(not SQLITE_AVAILABLE):
+            raise ImportError('sqlite3 module is not available.')
+        ReportWriter.__init__(self, fileName, header, writeType, bufferSize)
+        self.tableName = tableName
+        self.connection = None
+        self.columns = []
+
+    def _Buffer(self, row, isHeader):
+        # the header defines the table columns
+        if(isHeader):
+            return
+        self.buffer.append(row)
+        self.bufferedSize += sum([len(value) for value in row])
+        if(self.bufferedSize >= self.bufferSize):
+            self.Flush()
+
+    def _Open(self):
+        self.connection = sqlite3.connect(self.fileName)
+        table = QuoteIdentifier(self.tableName)
+        if(self.writeType == 'w'):
+            self.connection.execute('DROP TABLE IF EXISTS ' + table)
+        existingColumns = [r[1] for r in self.connection.execute('PRAGMA table_info(' + table + ')')]
+        if(len(existingColumns) > 0 and len(self.header) == 0):
+            self.columns = existingColumns
+        else:
+            self.columns = GetColumnNames(self.header)
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS ' + table + ' (' + ', '.join([QuoteIdentifier(c) + ' TEXT' for c in self.columns]) + ')')
+        self.connection.commit()
+
+    def _Write(self, buffer):
+        numberOfColumns = len(self.columns)
+        statement = 'INSERT INTO ' + QuoteIdentifier(self.tableName) + ' VALUES (' + ', '.join(['?'] * numberOfColumns) + ')'
+        self.connection.executemany(statement, [(list(row) + [None] * numberOfColumns)[:numberOfColumns] for row in buffer])
+        self.connection.commit()
+
+    def _Close(self):
+        self.connection.close()
+
+def QuoteIdentifier(name):
+    '''
+    Quotes a SQLite table or column name.
+
+    :param name: The name.
+    :type name: str
+
+    :return: The quoted name.
+    :rtype: str
+    '''
+
+    return '"' + name.replace('"', '""') + '"'
+
+def GetColumnNames(header):
+    '''
+    Returns unique, non empty column names for a report header.
+
+    Empty headers are named 'Column.' + column index, duplicated headers get '.' + counter appended.
+
+    :param header: List of column headers.
+    :type header: [str]
+
+    :return: List of column names. A single column 'Value' if the header is empty.
+    :rtype: [str]
+    '''
+
+    if(len(header) == 0):
+        return ['Value']
+    columns = []
+    used = set()
+    for i in range(len(header)):
+        name = header[i]
+        if(name == ''):
+            name = 'Column.' + str(i)
+        uniqueName = name
+        counter = 1
+        while(uniqueName.lower() in used):
+            uniqueName = name + '.' + str(counter)
+            counter += 1
+        used.add(uniqueName.lower())
+        columns.append(uniqueName)
+    return columns
+
+def GetReportWriter(fileName, header, writeType = 'w', sink = SINK_TSV, bufferSize = DEFAULT_BUFFER_SIZE):
+    '''
+    Returns a report writer for the given sink.
+
+    :param fileName: Fully qualified file path of the report (the database file path for SINK_SQLITE).
+    :type fileName: str
+    :param header: List of column headers, provide empty list if not required!
+    :type header: [str]
+    :param writeType: 'w' new file, 'a' append to existing file, defaults to 'w'
+    :type writeType: str, optional
+    :param sink: One of the SINK_ constants, defaults to SINK_TSV
+    :type sink: str, optional
+    :param bufferSize: Number of characters buffered before they are written, defaults to DEFAULT_BUFFER_SIZE
+    :type bufferSize: int, optional
+
+    :raises ValueError: Unknown sink.
+
+    :return: The report writer.
+    :rtype: :class:`.ReportWriter`
+    '''
+
+    if(sink == SINK_TSV):
+        return TsvReportWriter(fileName, header, writeType, bufferSize)
+    elif(sink == SINK_GZIP):
+        return GzipReportWriter(fileName, header, writeType, bufferSize)
+    elif(sink == SINK_SQLITE):
+        return SqliteReportWriter(fileName, header, writeType, bufferSize)
+    raise ValueError('Unknown report sink: ' + str(sink))
+
+def WriteReportData(fileName, header, data, writeType = 'w', sink = SINK_TSV):
+    '''
+    Writes report data to file.
+
+    :param fileName: Fully qualified file path of the report (the database file path for SINK_SQLITE).
+    :type fileName: str
+    :param header: List of column headers, provide empty list if not required!
+    :type header: [str]
+    :param data: List of list of strings representing row data
+    :type data: [[str]]
+    :param writeType: 'w' new file, 'a' append to existing file, defaults to 'w'
+    :type writeType: str, optional
+    :param sink: One of the SINK_ constants, defaults to SINK_TSV
+    :type sink: str, optional
+
+    :return: The number of rows written (excluding the header).
+    :rtype: int
+    '''
+
+    writer = GetReportWriter(fileName, header, writeType, sink)
+    try:
+        writer.WriteRows(data)
+    finally:
+        writer.Close()
+    return writer.rowCount
+
+def GetSessionId():
+    '''
+    Returns an id unique to this process: the machine name and process id.
+
+    :return: The session id.
+    :rtype: str
+    '''
+
+    machineName = os.environ.get('COMPUTERNAME', 'local')
+    return machineName + '_' + str(os.getpid())
+
+def GetShardFileName(fileName, sessionId = None):
+    '''
+    Returns the shard file name of a report for a session: report file name + SHARD_INFIX + session id + file extension.
+
+    :param fileName: Fully qualified file path of the report.
+    :type fileName: str
+    :param sessionId: The session id, defaults to None (refer to :func:`GetSessionId`)
+    :type sessionId: str, optional
+
+    :return: Fully qualified file path of the shard.
+    :rtype: str
+    '''
+
+    if(sessionId is None):
+        sessionId = GetSessionId()
+    root, extension = os.path.splitext(fileName)
+    # keep .txt.gz together
+    if(extension == '.gz'):
+        root, innerExtension = os.path.splitext(root)
+        extension = innerExtension + extension
+    return root + SHARD_INFIX + sessionId + extension
+
+def GetShardFiles(fileName):
+    '''
+    Returns the shard files of a report.
+
+    :param fileName: Fully qualified file path of the report.
+    :type fileName: str
+
+    :return: Sorted list of fully qualified shard file paths.
+    :rtype: [str]
+    '''
+
+    return sorted(glob.glob(GetShardFileName(fileName, '*')))
+
+def MergeShardFiles(fileName, hasHeader = True, sink = SINK_TSV, removeShards = True):
+    '''
+    Merges the shard files of a report into the report file, replacing any existing report file.
+
+    :param fileName: Fully qualified file path of the report.
+    :type fileName: str
+    :param hasHeader: Flag indicating whether shards start with a header row: only the header of the first shard is kept, defaults to True
+    :type hasHeader: bool, optional
+    :param sink: SINK_TSV or SINK_GZIP, defaults to SINK_TSV
+    :type sink: str, optional
+    :param removeShards: Flag indicating whether shard files are deleted once merged, defaults to True
+    :type removeShards: bool, optional
+
+    :raises ValueError: Sink does not support shards.
+
+    :return: The number of shard files merged.
+    :rtype: int
+    '''
+
+    if(sink == SINK_TSV):
+        opener = open
+    elif(sink == SINK_GZIP):
+        opener = gzip.open
+    else:
+        raise ValueError('Report sink does not support shards: ' + str(sink))
+    shardFiles = GetShardFiles(fileName)
+    with opener(fileName, 'wb') as result:
+        for i in range(len(shardFiles)):
+            with opener(shardFiles[i], 'rb') as shard:
+                if(hasHeader):
+                    header = shard.readline()
+                    if(i == 0):
+                        result.write(header)
+                shutil.copyfileobj(shard, result, DEFAULT_BUFFER_SIZE)
+    if(removeShards):
+        for shardFile in shardFiles:
+            os.remove(shardFile)
+    return len(shardFiles)
@@ -0,0 +1,361 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Helper functions to read Revit file information (saved in version, worksharing state, central file path) without Revit.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Revit files (.rvt, .rfa, .rte, .rft) are OLE compound files. File information is stored as UTF-16 text in the\
+    'BasicFileInfo' stream, in rows like:
+
+- Worksharing: Not enabled | Local | Central
+- Central Model Path: ...
+- Format: 2021 (Revit 2019 and later) or Revit Build: Autodesk Revit 2018 (Build: ...) (earlier versions)
+- Last Save Path: ...
+
+Only the sectors needed to read that stream are read from file, not the entire file.
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import re
+import struct
+
+#: Signature at the start of every OLE compound file
+COMPOUND_FILE_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+#: Name of the stream containing Revit file information
+BASIC_FILE_INFO_STREAM = 'BasicFileInfo'
+
+#: Worksharing is not enabled in file
+WORKSHARING_NOT_ENABLED = 'Not enabled'
+#: File is a local copy of a central file
+WORKSHARING_LOCAL = 'Local'
+#: File is a central file
+WORKSHARING_CENTRAL = 'Central'
+
+# compound file sector chain markers
+_END_OF_CHAIN = 0xFFFFFFFE
+_FREE_SECTOR = 0xFFFFFFFF
+_NO_STREAM = 0xFFFFFFFF
+# compound file directory entry types
+_ENTRY_STREAM = 2
+_ENTRY_ROOT = 5
+_DIRECTORY_ENTRY_SIZE = 128
+
+_VERSION_PATTERNS = [
+    re.compile(r'Format:\s*(\d{4})'),
+    re.compile(r'Autodesk Revit\s*(\d{4})'),
+    re.compile(r'Revit Build:[^\r\n]*?(\d{4})')
+]
+
+class CompoundFileEntry:
+    def __init__(self, name, entryType, left, right, child, startSector, size):
+        '''
+        Class constructor.
+
+        :param name: The entry name.
+        :type name: str
+        :param entryType: The entry type (1: storage, 2: stream, 5: root).
+        :type entryType: int
+        :param left: Directory index of the left sibling.
+        :type left: int
+        :param right: Directory index of the right sibling.
+        :type right: int
+        :param child: Directory index of the first child (storages only).
+        :type child: int
+        :param startSector: The first sector of the entry data.
+        :type startSector: int
+        :param size: The size of the entry data in bytes.
+        :type size: int
+        '''
+
+        self.name = name
+        self.entryType = entryType
+        self.left = left
+        self.right = right
+        self.child = child
+        self.startSector = startSector
+        self.size = size
+
+class CompoundFileReader:
+    def __init__(self, fileObject):
+        '''
+        Class constructor.
+
+        Reads the compound file header and directory.
+
+        :param fileObject: A file (or any other object supporting seek() and read()) opened in binary mode.
+        :type fileObject: file
+
+        :raises ValueError: If the file is not a compound file.
+        '''
+
+        self._file = fileObject
+        self._file.seek(0)
+        header = self._file.read(512)
+        if(len(header) < 512 or header[:8] != COMPOUND_FILE_SIGNATURE):
+            raise ValueError('Not a compound file.')
+        majorVersion, byteOrder, sectorShift, miniSectorShift = struct.unpack('<HHHH', header[26:34])
+        numberOfFatSectors, firstDirectorySector = struct.unpack('<II', header[44:52])
+        self.miniStreamCutoff, firstMiniFatSector, numberOfMiniFatSectors, firstDifatSector, numberOfDifatSectors = struct.unpack('<IIIII', header[56:76])
+        if(sectorShift not in (9, 12)):
+            raise ValueError('Unsupported compound file sector size: ' + str(sectorShift))
+        self._majorVersion = majorVersion
+        self.sectorSize = 1 << sectorShift
+        self.miniSectorSize = 1 << miniSectorShift
+        self._entriesPerSector = self.sectorSize // 4
+        # guards against sector chains looping on corrupt files
+        self._file.seek(0, 2)
+        self._maxSectors = self._file.tell() // self.sectorSize + 1
+        # the sectors holding the file allocation table (FAT), read from the header and the DIFAT sector chain
+        self._fatSectors = list(struct.unpack('<109I', header[76:512]))
+        sector = firstDifatSector
+        for i in range(numberOfDifatSectors):
+            if(sector >= _END_OF_CHAIN):
+                break
+            values = struct.unpack('<' + str(self._entriesPerSector) + 'I', self._ReadSector(sector))
+            self._fatSectors.extend(values[:-1])
+            sector = values[-1]
+        self._fatSectors = self._fatSectors[:numberOfFatSectors]
+        # FAT sectors are read when needed: fat sector index: [next sector]
+        self._fatCache = {}
+        self.entries = self._ReadDirectory(firstDirectorySector)
+        if(len(self.entries) == 0 or self.entries[0].entryType != _ENTRY_ROOT):
+            raise ValueError('Compound file has no root entry.')
+        self._firstMiniFatSector = firstMiniFatSector
+        self._miniFat = None
+        self._miniStreamSectors = None
+
+    def _ReadSector(self, sector):
+        self._file.seek((sector + 1) * self.sectorSize)
+        data = self._file.read(self.sectorSize)
+        if(len(data) < self.sectorSize):
+            raise ValueError('Compound file sector out of range: ' + str(sector))
+        return data
+
+    def _GetNextSector(self, sector):
+        fatIndex = sector // self._entriesPerSector
+        if(fatIndex not in self._fatCache):
+            if(fatIndex >= len(self._fatSectors)):
+                raise ValueError('Compound file sector not in allocation table: ' + str(sector))
+            self._fatCache[fatIndex] = struct.unpack('<' + str(self._entriesPerSector) + 'I', self._ReadSector(self._fatSectors[fatIndex]))
+        return self._fatCache[fatIndex][sector % self._entriesPerSector]
+
+    def _GetSectorChain(self, startSector, getNextSector, maxLength):
+        chain = []
+        sector = startSector
+        while(sector != _END_OF_CHAIN and sector != _FREE_SECTOR):
+            if(len(chain) >= maxLength):
+                raise ValueError('Compound file sector chain is too long.')
+            chain.append(sector)
+            sector = getNextSector(sector)
+        return chain
+
+    def _ReadDirectory(self, firstDirectorySector):
+        entries = []
+        for sector in self._GetSectorChain(firstDirectorySector, self._GetNextSector, self._maxSectors):
+            data = self._ReadSector(sector)
+            for offset in range(0, self.sectorSize, _DIRECTORY_ENTRY_SIZE):
+                entry = data[offset:offset + _DIRECTORY_ENTRY_SIZE]
+                nameLength, entryType = struct.unpack('<HB', entry[64:67])
+                left, right, child = struct.unpack('<III', entry[68:80])
+                startSector, sizeLow, sizeHigh = struct.unpack('<III', entry[116:128])
+                size = sizeLow
+                if(self._majorVersion != 3):
+                    size = sizeLow + (sizeHigh << 32)
+                # name length includes the terminating null character
+                name = entry[:max(0, min(nameLength, 64) - 2)].decode('utf-16-le', 'ignore')
+                entries.append(CompoundFileEntry(name, entryType, left, right, child, startSector, size))
+        return entries
+
+    def _GetMiniSector(self, miniSector):
+        if(self._miniFat is None):
+            data = b''.join([self._ReadSector(s) for s in self._GetSectorChain(self._firstMiniFatSector, self._GetNextSector, self._maxSectors)])
+            self._miniFat = struct.unpack('<' + str(len(data) // 4) + 'I', data)
+            self._miniStreamSectors = self._GetSectorChain(self.entries[0].startSector, self._GetNextSector, self._maxSectors)
+        return self._miniFat[miniSector]
+
+    def _ReadMiniStream(self, entry):
+        chunks = []
+        for miniSector in self._GetSectorChain(entry.startSector, self._GetMiniSector, self._maxSectors * (self.sectorSize // self.miniSectorSize)):
+            offset = miniSector * self.miniSectorSize
+            self._file.seek((self._miniStreamSectors[offset // self.sectorSize] + 1) * self.sectorSize + offset % self.sectorSize)
+            chunks.append(self._file.read(self.miniSectorSize))
+        return b''.join(chunks)[:entry.size]
+
+    def GetStreamNames(self):
+        '''
+        Returns the names of all streams in the root storage.
+
+        :return: List of stream names.
+        :rtype: [str]
+        '''
+
+        names = []
+        stack = [self.entries[0].child]
+        visited = set()
+        while(len(stack) > 0):
+            index = stack.pop()
+            if(index == _NO_STREAM or index >= len(self.entries) or index in visited):
+                continue
+            visited.add(index)
+            entry = self.entries[index]
+            if(entry.entryType == _ENTRY_STREAM):
+                names.append(entry.name)
+            stack.append(entry.left)
+            stack.append(entry.right)
+        return names
+
+    def ReadStream(self, streamName):
+        '''
+        Reads a stream in the root storage.
+
+        :param streamName: The stream name (compared ignoring case).
+        :type streamName: str
+
+        :raises KeyError: If there is no stream of that name.
+
+        :return: The stream data.
+        :rtype: bytes
+        '''
+
+        stack = [self.entries[0].child]
+        visited = set()
+        while(len(stack) > 0):
+            index = stack.pop()
+            if(index == _NO_STREAM or index >= len(self.entries) or index in visited):
+                continue
+            visited.add(index)
+            entry = self.entries[index]
+            if(entry.entryType == _ENTRY_STREAM and entry.name.upper() == streamName.upper()):
+                if(entry.size < self.miniStreamCutoff):
+                    return self._ReadMiniStream(entry)
+                sectors = self._GetSectorChain(entry.startSector, self._GetNextSector, self._maxSectors)
+                return b''.join([self._ReadSector(s) for s in sectors])[:entry.size]
+            stack.append(entry.left)
+            stack.append(entry.right)
+        raise KeyError('Stream not found: ' + streamName)
+
+class RevitFileInfo:
+    def __init__(self, version = '', build = '', worksharing = '', centralPath = '', lastSavePath = ''):
+        '''
+        Class constructor.
+
+        :param version: The Revit version the file was saved in (year only), defaults to '' (unknown)
+        :type version: str, optional
+        :param build: The Revit build the file was saved in, defaults to ''
+        :type build: str, optional
+        :param worksharing: The worksharing state: WORKSHARING_NOT_ENABLED, WORKSHARING_LOCAL or WORKSHARING_CENTRAL, defaults to '' (unknown)
+        :type worksharing: str, optional
+        :param centralPath: The central file path, defaults to ''
+        :type centralPath: str, optional
+        :param lastSavePath: The file path the file was last saved to, defaults to ''
+        :type lastSavePath: str, optional
+        '''
+
+        self.version = version
+        self.build = build
+        self.worksharing = worksharing
+        self.centralPath = centralPath
+        self.lastSavePath = lastSavePath
+
+    def IsWorkshared(self):
+        '''
+        Checks whether worksharing is enabled in the file.
+
+        :return: True if the file is a central file or a local copy, otherwise False.
+        :rtype: bool
+        '''
+
+        return self.worksharing in (WORKSHARING_LOCAL, WORKSHARING_CENTRAL)
+
+    def IsLocal(self):
+        '''
+        Checks whether the file is a local copy of a central file.
+
+        :return: True if a local copy, otherwise False.
+        :rtype: bool
+        '''
+
+        return self.worksharing == WORKSHARING_LOCAL
+
+def _GetValue(text, key):
+    # the key has to be at the start of a row (not preceded by printable text): 'Build' must not match 'Revit Build: ... (Build: ...)'
+    match = re.search(r'(?<![\x20-\x7e])' + re.escape(key) + r':[ \t]*([^\r\n\x00]*)', text)
+    if(match is None):
+        return ''
+    return match.group(1).strip()
+
+def ParseBasicFileInfo(data):
+    '''
+    Extracts Revit file information from the content of a BasicFileInfo stream.
+
+    :param data: The stream content.
+    :type data: bytes
+
+    :return: The file information. Values not found are ''.
+    :rtype: :class:`.RevitFileInfo`
+    '''
+
+    # text is UTF-16, but may follow a binary header of an odd number of bytes
+    text = data.decode('utf-16-le', 'ignore')
+    if('Worksharing' not in text):
+        shiftedText = data[1:].decode('utf-16-le', 'ignore')
+        if('Worksharing' in shiftedText):
+            text = shiftedText
+    version = ''
+    for pattern in _VERSION_PATTERNS:
+        match = pattern.search(text)
+        if(match is not None):
+            version = match.group(1)
+            break
+    build = _GetValue(text, 'Build')
+    if(build == ''):
+        # files saved before Revit 2015: Revit Build: Autodesk Revit 2014 (Build: 20130308_1515(x64))
+        build = _GetValue(text, 'Revit Build')
+        match = re.search(r'\(Build:\s*(.*)\)', build)
+        if(match is not None):
+            build = match.group(1)
+    return RevitFileInfo(
+        version,
+        build,
+        _GetValue(text, 'Worksharing'),
+        _GetValue(text, 'Central Model Path'),
+        _GetValue(text, 'Last Save Path')
+    )
+
+def GetRevitFileInfo(filePath):
+    '''
+    Reads Revit file information from a Revit file.
+
+    :param filePath: The fully qualified file path of the Revit file.
+    :type filePath: str
+
+    :raises ValueError: If the file is not a compound file.
+    :raises KeyError: If the file does not contain a BasicFileInfo stream.
+
+    :return: The file information.
+    :rtype: :class:`.RevitFileInfo`
+    '''
+
+    with open(filePath, 'rb') as f:
+        reader = CompoundFileReader(f)
+        return ParseBasicFileInfo(reader.ReadStream(BASIC_FILE_INFO_STREAM))
@@ -0,0 +1,196 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+A bounding box index to find geometries which may intersect a given geometry.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Two geometries can only intersect if their bounding boxes do. Querying the index returns the geometries whose bounding\
+    box intersects (or touches) the bounding box of the query geometry, so exact (expensive) intersection checks are only\
+    needed for those.
+
+Uses the shapely STRtree (shapely 1.8 or 2.x) if available, otherwise a pure python R-tree packed with the same\
+    sort tile recursive (STR) algorithm.
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import math
+
+try:
+    from shapely.strtree import STRtree
+    STRTREE_AVAILABLE = True
+except ImportError:
+    STRTREE_AVAILABLE = False
+
+#: Maximum number of entries per R-tree node
+NODE_CAPACITY = 10
+
+def BoundsIntersect(first, second):
+    '''
+    Checks whether two bounding boxes intersect or touch.
+
+    :param first: Bounding box in format (min x, min y, max x, max y)
+    :type first: (float, float, float, float)
+    :param second: Bounding box in format (min x, min y, max x, max y)
+    :type second: (float, float, float, float)
+
+    :return: True if the boxes intersect or touch, otherwise False (also if either box has no valid coordinates).
+    :rtype: bool
+    '''
+
+    return first[0] <= second[2] and second[0] <= first[2] and first[1] <= second[3] and second[1] <= first[3]
+
+def GetCombinedBounds(boundsList):
+    '''
+    Returns the bounding box containing all given bounding boxes.
+
+    :param boundsList: List of bounding boxes in format (min x, min y, max x, max y)
+    :type boundsList: [(float, float, float, float)]
+
+    :return: The combined bounding box.
+    :rtype: (float, float, float, float)
+    '''
+
+    return (
+        min([b[0] for b in boundsList]),
+        min([b[1] for b in boundsList]),
+        max([b[2] for b in boundsList]),
+        max([b[3] for b in boundsList])
+    )
+
+class BoundingBoxTree:
+    def __init__(self, boundsList, nodeCapacity = NODE_CAPACITY):
+        '''
+        Class constructor.
+
+        A static R-tree of bounding boxes, packed with the sort tile recursive algorithm. Boxes with invalid coordinates\
+            (i.e. of empty geometries) are not added.
+
+        :param boundsList: List of bounding boxes in format (min x, min y, max x, max y)
+        :type boundsList: [(float, float, float, float)]
+        :param nodeCapacity: Maximum number of entries per node, defaults to NODE_CAPACITY
+        :type nodeCapacity: int, optional
+        '''
+
+        self.nodeCapacity = nodeCapacity
+        # a node is a tuple: (bounds, list of child nodes or None for a leaf, item index)
+        nodes = []
+        for i in range(len(boundsList)):
+            b = boundsList[i]
+            # nan compares False: drop boxes which can not intersect anything
+            if(BoundsIntersect(b, b)):
+                nodes.append((tuple(b), None, i))
+        while(len(nodes) > nodeCapacity):
+            nodes = self._PackLevel(nodes)
+        self.root = None
+        if(len(nodes) > 0):
+            self.root = (GetCombinedBounds([n[0] for n in nodes]), nodes, -1)
+
+    def _PackLevel(self, nodes):
+        # sort by x centre into vertical slices, then each slice by y centre into nodes
+        numberOfParents = int(math.ceil(len(nodes) / float(self.nodeCapacity)))
+        numberOfSlices = int(math.ceil(math.sqrt(numberOfParents)))
+        sliceSize = numberOfSlices * self.nodeCapacity
+        nodes = sorted(nodes, key = lambda n: n[0][0] + n[0][2])
+        parents = []
+        for sliceStart in range(0, len(nodes), sliceSize):
+            sliceNodes = sorted(nodes[sliceStart:sliceStart + sliceSize], key = lambda n: n[0][1] + n[0][3])
+            for start in range(0, len(sliceNodes), self.nodeCapacity):
+                children = sliceNodes[start:start + self.nodeCapacity]
+                parents.append((GetCombinedBounds([c[0] for c in children]), children, -1))
+        return parents
+
+    def Query(self, bounds):
+        '''
+        Returns the indexes of all bounding boxes intersecting or touching the given bounding box.
+
+        :param bounds: Bounding box in format (min x, min y, max x, max y)
+        :type bounds: (float, float, float, float)
+
+        :return: Sorted list of indexes into the list of bounding boxes the tree was built from.
+        :rtype: [int]
+        '''
+
+        indexes = []
+        if(self.root is None):
+            return indexes
+        stack = [self.root]
+        while(len(stack) > 0):
+            node = stack.pop()
+            if(not BoundsIntersect(node[0], bounds)):
+                continue
+            if(node[1] is None):
+                indexes.append(node[2])
+            else:
+                stack.extend(node[1])
+        return sorted(indexes)
+
+class SpatialIndex:
+    def __init__(self, geometries, useShapely = True):
+        '''
+        Class constructor.
+
+        :param geometries: List of shapely geometries to index. None entries are ignored.
+        :type geometries: [shapely.geometry]
+        :param useShapely: Flag indicating whether the shapely STRtree is used if available, defaults to True
+        :type useShapely: bool, optional
+        '''
+
+        self.tree = None
+        self.geometryIndexes = None
+        self.boundingBoxTree = None
+        indexes = [i for i in range(len(geometries)) if geometries[i] is not None and not geometries[i].is_empty]
+        if(useShapely and STRTREE_AVAILABLE):
+            self.indexes = indexes
+            self.tree = STRtree([geometries[i] for i in indexes])
+            # shapely 1.8 returns geometries rather than their indexes
+            self.geometryIndexes = {}
+            for i in indexes:
+                self.geometryIndexes[id(geometries[i])] = i
+        else:
+            boundsList = [(float('nan'),) * 4] * len(geometries)
+            for i in indexes:
+                boundsList[i] = geometries[i].bounds
+            self.boundingBoxTree = BoundingBoxTree(boundsList)
+
+    def Query(self, geometry):
+        '''
+        Returns the geometries whose bounding box intersects or touches the bounding box of the given geometry.
+
+        :param geometry: A shapely geometry.
+        :type geometry: shapely.geometry
+
+        :return: Sorted list of indexes into the list of geometries the index was built from.
+        :rtype: [int]
+        '''
+
+        if(geometry is None or geometry.is_empty):
+            return []
+        if(self.boundingBoxTree is not None):
+            return self.boundingBoxTree.Query(geometry.bounds)
+        candidates = self.tree.query(geometry)
+        if(len(candidates) == 0):
+            return []
+        if(hasattr(candidates[0], 'geom_type')):
+            return sorted([self.geometryIndexes[id(g)] for g in candidates])
+        # shapely 2.x: indexes into the geometries passed to the STRtree
+        return sorted([self.indexes[int(i)] for i in candidates])
@@ -0,0 +1,400 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+A work queue in a shared directory, from which a number of sessions claim work items until none are left.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Static task lists are balanced up front: if one file takes a lot longer than expected its session keeps going\
+    while all other sessions are idle. With a work queue each session takes the next item whenever it is done with its last one.
+
+Each work item is a file (the item data is usually a task list row, i.e. a Revit file path) in one of these sub directories:
+
+- pending: waiting to be claimed
+- claimed: claimed by a session (the owner is added to the file name)
+- done: processed successfully
+- failed: processing failed
+
+An item is claimed by renaming it from pending into claimed. Renaming a file is atomic, so if two sessions try to claim\
+    the same item only one succeeds.
+
+A claim is a lease: the modified time of the claimed item is its lease start. A session processing an item for a long time\
+    has to renew the lease. Items of sessions which terminated unexpectedly are returned to pending once their lease expired.
+
+Items are claimed in the order they were seeded, so seed the biggest workload first.
+
+:func:`ProcessQueue` claims and processes items until none are left, renewing the lease of the item being processed.\
+    In Revit Batch Processor it is called from a task script running in single Revit task mode which opens each claimed\
+    file itself (refer to the ModifyFromWorkQueue.py sample).
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+import os
+import time
+import socket
+import hashlib
+import codecs
+import threading
+
+#: Sub directory of items waiting to be claimed
+PENDING_DIRECTORY = 'pending'
+#: Sub directory of items claimed by a session
+CLAIMED_DIRECTORY = 'claimed'
+#: Sub directory of items processed successfully
+DONE_DIRECTORY = 'done'
+#: Sub directory of items which failed to process
+FAILED_DIRECTORY = 'failed'
+#: File extension of work item files
+ITEM_FILE_EXTENSION = '.job'
+#: Separates item file name and owner of claimed items
+OWNER_SEPARATOR = '@'
+#: Default lease time in seconds
+DEFAULT_LEASE_TIME = 1800
+
+class WorkItem:
+    def __init__(self, fileName, data, owner):
+        '''
+        Class constructor.
+
+        :param fileName: The item file name (without owner).
+        :type fileName: str
+        :param data: The item data.
+        :type data: str
+        :param owner: The owner of the claim.
+        :type owner: str
+        '''
+
+        self.fileName = fileName
+        self.data = data
+        self.owner = owner
+
+def GetDefaultOwner():
+    '''
+    Returns an owner name unique to this process: machine name and process id.
+
+    :return: The owner name.
+    :rtype: str
+    '''
+
+    return socket.gethostname() + '_' + str(os.getpid())
+
+def GetItemId(data):
+    '''
+    Returns an id for item data. The same data always returns the same id.
+
+    :param data: The item data.
+    :type data: str
+
+    :return: A hex digest of the item data.
+    :rtype: str
+    '''
+
+    return hashlib.md5(data.strip().lower().encode('utf-8')).hexdigest()
+
+class WorkQueue:
+    def __init__(self, queueDirectory, owner = None, leaseTime = DEFAULT_LEASE_TIME):
+        '''
+        Class constructor.
+
+        :param queueDirectory: Fully qualified path of the shared queue directory.
+        :type queueDirectory: str
+        :param owner: The name of this session, defaults to None which uses :func:`GetDefaultOwner`
+        :type owner: str, optional
+        :param leaseTime: Time in seconds after which claimed items are returned to pending unless the lease gets renewed,\
+            defaults to DEFAULT_LEASE_TIME
+        :type leaseTime: int, optional
+        '''
+
+        self.queueDirectory = queueDirectory
+        if(owner is None):
+            owner = GetDefaultOwner()
+        # the owner is part of a file name
+        self.owner = owner.replace(OWNER_SEPARATOR, '_').replace(os.sep, '_').replace('/', '_')
+        self.leaseTime = leaseTime
+
+    def _GetDirectory(self, subDirectory):
+        return os.path.join(self.queueDirectory, subDirectory)
+
+    def _GetClaimedPath(self, item):
+        return os.path.join(self._GetDirectory(CLAIMED_DIRECTORY), item.fileName + OWNER_SEPARATOR + item.owner)
+
+    def _ListItemFiles(self, subDirectory):
+        directory = self._GetDirectory(subDirectory)
+        if(not os.path.exists(directory)):
+            return []
+        return sorted([f for f in os.listdir(directory) if ITEM_FILE_EXTENSION in f])
+
+    def Create(self):
+        '''
+        Creates the queue directory and its sub directories if they do not exist yet.
+        '''
+
+        for subDirectory in [PENDING_DIRECTORY, CLAIMED_DIRECTORY, DONE_DIRECTORY, FAILED_DIRECTORY]:
+            directory = self._GetDirectory(subDirectory)
+            if(not os.path.exists(directory)):
+                os.makedirs(directory)
+
+    def Reset(self):
+        '''
+        Deletes all items from the queue, whatever state they are in.
+
+        :return: The number of items deleted.
+        :rtype: int
+        '''
+
+        counter = 0
+        for subDirectory in [PENDING_DIRECTORY, CLAIMED_DIRECTORY, DONE_DIRECTORY, FAILED_DIRECTORY]:
+            for f in self._ListItemFiles(subDirectory):
+                try:
+                    os.remove(os.path.join(self._GetDirectory(subDirectory), f))
+                    counter += 1
+                except Exception:
+                    pass
+        return counter
+
+    def Seed(self, items):
+        '''
+        Adds items to the queue. Items already in the queue (in any state) are ignored.
+
+        Items are claimed in the order they are added.
+
+        :param items: List of item data, i.e. task list rows.
+        :type items: [str]
+
+        :return: The number of items added.
+        :rtype: int
+        '''
+
+        self.Create()
+        existingIds = set()
+        for subDirectory in [PENDING_DIRECTORY, CLAIMED_DIRECTORY, DONE_DIRECTORY, FAILED_DIRECTORY]:
+            for f in self._ListItemFiles(subDirectory):
+                existingIds.add(f.split(OWNER_SEPARATOR)[0][:-len(ITEM_FILE_EXTENSION)].split('_')[-1])
+        # keep the order of any items seeded previously
+        position = len(existingIds)
+        counter = 0
+        for data in items:
+            itemId = GetItemId(data)
+            if(itemId in existingIds):
+                continue
+            existingIds.add(itemId)
+            fileName = str(position).zfill(6) + '_' + itemId + ITEM_FILE_EXTENSION
+            # write to a temp file first so an item never gets claimed part written
+            tempPath = os.path.join(self.queueDirectory, fileName + '.tmp')
+            with codecs.open(tempPath, 'w', encoding = 'utf-8') as f:
+                f.write(data)
+            os.rename(tempPath, os.path.join(self._GetDirectory(PENDING_DIRECTORY), fileName))
+            position += 1
+            counter += 1
+        return counter
+
+    def _ClaimFile(self, fileName):
+        item = WorkItem(fileName, None, self.owner)
+        claimedPath = self._GetClaimedPath(item)
+        try:
+            os.rename(os.path.join(self._GetDirectory(PENDING_DIRECTORY), fileName), claimedPath)
+        except OSError:
+            # claimed by another session
+            return None
+        try:
+            # start of lease (rename keeps the modified time)
+            os.utime(claimedPath, None)
+            with codecs.open(claimedPath, 'r', encoding = 'utf-8') as f:
+                item.data = f.read()
+        except (IOError, OSError):
+            # item got returned to pending by another session before the lease started
+            return None
+        return item
+
+    def ClaimNext(self):
+        '''
+        Claims the next pending item. Any items with an expired lease are returned to pending first.
+
+        :return: The claimed item, or None if there are no pending items left.
+        :rtype: :class:`.WorkItem`
+        '''
+
+        self.ReleaseExpiredLeases()
+        for fileName in self._ListItemFiles(PENDING_DIRECTORY):
+            item = self._ClaimFile(fileName)
+            if(item is not None):
+                return item
+        return None
+
+    def Claim(self, data):
+        '''
+        Claims a specific pending item. Use if a session gets handed an item, i.e. from a task list, and needs to\
+            check whether another session has processed it already.
+
+        :param data: The item data.
+        :type data: str
+
+        :return: The claimed item, or None if the item is not pending.
+        :rtype: :class:`.WorkItem`
+        '''
+
+        itemId = GetItemId(data) + ITEM_FILE_EXTENSION
+        for fileName in self._ListItemFiles(PENDING_DIRECTORY):
+            if(fileName.endswith(itemId)):
+                return self._ClaimFile(fileName)
+        return None
+
+    def RenewLease(self, item):
+        '''
+        Renews the lease of a claimed item.
+
+        :param item: The claimed item.
+        :type item: :class:`.WorkItem`
+
+        :return: True if the lease was renewed, False if the item is no longer claimed by this session.
+        :rtype: bool
+        '''
+
+        try:
+            os.utime(self._GetClaimedPath(item), None)
+            return True
+        except OSError:
+            return False
+
+    def _MoveClaimed(self, item, subDirectory):
+        try:
+            os.rename(self._GetClaimedPath(item), os.path.join(self._GetDirectory(subDirectory), item.fileName))
+            return True
+        except OSError:
+            return False
+
+    def Complete(self, item, status = True):
+        '''
+        Marks a claimed item as processed.
+
+        :param item: The claimed item.
+        :type item: :class:`.WorkItem`
+        :param status: True if the item was processed successfully, otherwise False, defaults to True
+        :type status: bool, optional
+
+        :return: True if the item was marked, False if the item is no longer claimed by this session (its lease expired).
+        :rtype: bool
+        '''
+
+        if(status):
+            return self._MoveClaimed(item, DONE_DIRECTORY)
+        return self._MoveClaimed(item, FAILED_DIRECTORY)
+
+    def Release(self, item):
+        '''
+        Returns a claimed item to pending without processing it.
+
+        :param item: The claimed item.
+        :type item: :class:`.WorkItem`
+
+        :return: True if the item was returned, False if the item is no longer claimed by this session.
+        :rtype: bool
+        '''
+
+        return self._MoveClaimed(item, PENDING_DIRECTORY)
+
+    def ReleaseExpiredLeases(self):
+        '''
+        Returns all claimed items with an expired lease to pending.
+
+        :return: The number of items returned to pending.
+        :rtype: int
+        '''
+
+        counter = 0
+        timeNow = time.time()
+        claimedDirectory = self._GetDirectory(CLAIMED_DIRECTORY)
+        for f in self._ListItemFiles(CLAIMED_DIRECTORY):
+            claimedPath = os.path.join(claimedDirectory, f)
+            try:
+                if(timeNow - os.path.getmtime(claimedPath) > self.leaseTime):
+                    os.rename(claimedPath, os.path.join(self._GetDirectory(PENDING_DIRECTORY), f.split(OWNER_SEPARATOR)[0]))
+                    counter += 1
+            except OSError:
+                # completed or returned by another session in the meantime
+                pass
+        return counter
+
+    def GetStatus(self):
+        '''
+        Returns the number of items in each state.
+
+        :return: A dictionary where key is the state (sub directory name) and value is the number of items.
+        :rtype: {str: int}
+        '''
+
+        status = {}
+        for subDirectory in [PENDING_DIRECTORY, CLAIMED_DIRECTORY, DONE_DIRECTORY, FAILED_DIRECTORY]:
+            status[subDirectory] = len(self._ListItemFiles(subDirectory))
+        return status
+
+    def IsFinished(self):
+        '''
+        Checks whether all items have been processed, i.e. no items are pending or claimed.
+
+        :return: True if all items have been processed, otherwise False.
+        :rtype: bool
+        '''
+
+        return len(self._ListItemFiles(PENDING_DIRECTORY)) == 0 and len(self._ListItemFiles(CLAIMED_DIRECTORY)) == 0
+
+def ProcessQueue(queue, processItem, renewInterval = None):
+    '''
+    Claims and processes items from a work queue until no pending items are left.
+
+    While an item is processed its lease is renewed in the background.
+
+    :param queue: The work queue.
+    :type queue: :class:`.WorkQueue`
+    :param processItem: Function processing the item data. Returns True if the item was processed successfully, otherwise False.\
+        An exception counts as False.
+    :type processItem: func(str) -> bool
+    :param renewInterval: Time in seconds between lease renewals, defaults to None which is a third of the queue lease time.
+    :type renewInterval: float, optional
+
+    :return: List of processed items in format [item data, status]
+    :rtype: [[str, bool]]
+    '''
+
+    if(renewInterval is None):
+        renewInterval = queue.leaseTime / 3.0
+    results = []
+    item = queue.ClaimNext()
+    while(item is not None):
+        processed = threading.Event()
+        def renew():
+            while(not processed.wait(renewInterval)):
+                queue.RenewLease(item)
+        renewer = threading.Thread(target = renew)
+        renewer.daemon = True
+        renewer.start()
+        try:
+            status = processItem(item.data) == True
+        except Exception as e:
+            print ('Failed to process work item: ' + item.data + ' ' + str(e))
+            status = False
+        processed.set()
+        renewer.join()
+        queue.Complete(item, status)
+        results.append([item.data, status])
+        item = queue.ClaimNext()
+    return results
@@ -34,7 +34,7 @@ This module contains a number of helper functions relating to:
 #import clr
 #import System
 #from numpy import empty
-from System.IO import Path
+from System.IO import Path, File
 import glob
 import datetime
 import os
@@ -43,6 +43,11 @@ import os.path
 from os import path
 import codecs
 import csv
+import gzip
+
+import UtilFileDiscovery as discovery
+import UtilReportMerge as merge
+import UtilReportWriter as rw
 
 #: default file stamp date format using uderscores as delimiter: 21_03_01
 FILE_DATE_STAMP_YY_MM_DD = '%y_%m_%d'
@@ -55,6 +60,9 @@ FILE_DATE_STAMP_YYYY_MM_DD = '%Y_%m_%d'
 #: file stamp date time format using uderscores as delimiter: 2021_03_01_18_59_59
 FILE_DATE_STAMP_YYYY_MM_DD_HH_MM_SEC = '%Y_%m_%d_%H_%M_%S'
 
+#: number of characters (or bytes) copied at a time when combining files
+COPY_BUFFER_SIZE = 1024 * 1024
+
 #: time stamp using colons: 18:59:59
 TIME_STAMP_HHMMSEC_COLON = '%H:%M:%S'
 
@@ -158,11 +166,9 @@ def GetFilesFromDirectoryWalkerWithFilters(folderPath, filePrefix, fileSuffix, f
     '''
 
     filesFound = []
-    for root, dirs, files in os.walk(folderPath):
-        for name in files:
-            fileName = GetFileNameWithoutExt(name)
-            if (name.endswith(fileExtension) and fileName.startswith(filePrefix) and fileName.endswith(fileSuffix)):
-                filesFound.append(root + '\\' + name)
+    fileFilter = discovery.FileFilter(fileExtension, filePrefix, fileSuffix)
+    for f in discovery.DiscoverFiles(folderPath, fileFilter):
+        filesFound.append(f.directory + '\\' + f.name)
     return filesFound
 
 def GetFilesFromDirectoryWalkerWithFiltersSimple(folderPath, fileExtension):
@@ -208,32 +214,34 @@ def FilesAsDictionary(folderPath, filePrefix, fileSuffix, fileExtension, include
         value: lit of str
     '''
 
-    filesFound = []
     # set up a dictionary
     fileDic = {}
     try:
-        if(includeSubDirs):
-            filesFound = GetFilesFromDirectoryWalkerWithFilters(folderPath, '', '', '.rfa')
-        else:
-            filesFound = GetFilesSingleFolder(folderPath, '', '', '.rfa')
+        # file names on windows are not case sensitive
+        fileFilter = discovery.FileFilter(fileExtension, filePrefix, fileSuffix, ignoreCase = True)
+        filesFound = discovery.DiscoverFiles(folderPath, fileFilter, includeSubDirs)
     except Exception:
         return fileDic
     
     # populate dictionary
-    for filePath in filesFound:
-        fileName = GetFileNameWithoutExt(filePath)
+    for f in filesFound:
+        fileName = discovery.GetFileNameWithoutExtension(f.name)
+        filePath = f.directory + '\\' + f.name
         if(fileName in fileDic):
             fileDic[fileName].append(filePath)
         else:
             fileDic[fileName] = [filePath]
     return fileDic
 
-def CombineFiles(folderPath, filePrefix = '', fileSuffix = '', fileExtension='.txt', outPutFileName = 'result.txt', fileGetter = GetFilesSingleFolder):
+def CombineFiles(folderPath, filePrefix = '', fileSuffix = '', fileExtension='.txt', outPutFileName = 'result.txt', fileGetter = GetFilesSingleFolder, compress = False):
     '''
     Combines multiple text files into a single new file. Assumes same number of headers (columns) in each files.
 
     The new file will be saved into the same folder as the original files.
 
+    Files are streamed: the header row of each file but the first is skipped, the remainder is copied in blocks\
+        (refer to COPY_BUFFER_SIZE). Memory use does not depend on the file size.
+
     :param folderPath: Folder path from which to get files to be combined and to which the combined file will be saved.
     :type folderPath: str
     :param filePrefix: Filter: File name starts with this value
@@ -246,28 +254,39 @@ def CombineFiles(folderPath, filePrefix = '', fileSuffix = '', fileExtension='.t
     :type outPutFileName: str, optional
     :param fileGetter: Function returning list of files to be combined, defaults to GetFilesSingleFolder
     :type fileGetter: func(folderPath, filePrefix, fileSuffix, fileExtension), optional
+    :param compress: If True the combined file is written gzip compressed (use a file name like 'result.txt.gz'). Line endings are kept\
+        as in the original files, defaults to False
+    :type compress: bool, optional
     '''
 
     file_list = fileGetter (folderPath, filePrefix, fileSuffix, fileExtension)
-    with open(folderPath + '\\' + outPutFileName, 'w' ) as result:
+    # gzip files are binary: copy bytes as they are
+    readMode = 'r'
+    if(compress):
+        result = gzip.open(folderPath + '\\' + outPutFileName, 'wb')
+        readMode = 'rb'
+    else:
+        result = open(folderPath + '\\' + outPutFileName, 'w')
+    try:
         fileCounter = 0
         for file_ in file_list:
-            lineCounter = 0
-            fp = open( file_, 'r' )
-            lines = fp.readlines()
-            fp.close()
-            for line in lines:
+            with open(file_, readMode) as fp:
                 # ensure header from first file is copied over
-                if(fileCounter == 0 and lineCounter == 0 or lineCounter != 0):
-                    result.write( line )
-                lineCounter += 1
-            
+                header = fp.readline()
+                if(fileCounter == 0):
+                    result.write(header)
+                shutil.copyfileobj(fp, result, COPY_BUFFER_SIZE)
             fileCounter += 1
+    finally:
+        result.close()
 
 def AppendToSingleFiles(sourceFile, appendFile):
     '''
     Appends one text file to another. Assumes same number of headers (columns) in both files.
 
+    The file is streamed in blocks (refer to COPY_BUFFER_SIZE). Memory use does not depend on the file size.\
+        Note: if an exception occurs part of the file may have been appended already.
+
     :param sourceFile: The fully qualified file path of the file to which the other file will be appended.
     :type sourceFile: str
     :param appendFile: The fully qualified file path of the file to be appended.
@@ -279,22 +298,19 @@ def AppendToSingleFiles(sourceFile, appendFile):
 
     flag = True
     try:
-        # read file to append into memory...hopefully will never get in GB range in terms of file size
-        fp = codecs.open(appendFile,'r',encoding='utf-8')
-        lines=fp.readlines()
-        fp.close()
-        with codecs.open(sourceFile, 'a', encoding='utf-8') as f:
-            for line in lines:
-                f.write( line )
+        with codecs.open(appendFile,'r',encoding='utf-8') as fp:
+            with codecs.open(sourceFile, 'a', encoding='utf-8') as f:
+                shutil.copyfileobj(fp, f, COPY_BUFFER_SIZE)
     except Exception:
         flag = False
     return flag
 
-def CombineFilesHeaderIndependent(folderPath, filePrefix = '', fileSuffix = '', fileExtension='.txt', outPutFileName = 'result.txt'):
+def CombineFilesHeaderIndependent(folderPath, filePrefix = '', fileSuffix = '', fileExtension='.txt', outPutFileName = 'result.txt', maxWorkers = 1):
     '''
     Used to combine report files into one file, files may have different number / named columns.
 
-    Columns which are unique to some files will have as a value 'N/A' in files where those columns do not exist.
+    Columns which are unique to some files will have as a value 'N/A' in files where those columns do not exist.\
+        Refer to :mod:`UtilReportMerge` for details.
 
     :param folderPath: Folder path from which to get files to be combined and to which the combined file will be saved.
     :type folderPath: str
@@ -306,59 +322,12 @@ def CombineFilesHeaderIndependent(folderPath, filePrefix = '', fileSuffix = '',
     :type fileExtension: str, format '.extension'
     :param outPutFileName: The file name of the combined file, defaults to 'result.txt'
     :type outPutFileName: str, optional
+    :param maxWorkers: The number of files read in parallel, defaults to 1 (one after another). Use 0 for one file per processor.
+    :type maxWorkers: int, optional
     '''
 
     file_list = glob.glob(folderPath + '\\' + filePrefix + '*' + fileSuffix + fileExtension)
-    # build list of unique headers
-    headers = GetUniqueHeaders(file_list)
-    # open output file
-    with open(folderPath + '\\' + outPutFileName, 'w' ) as result:
-        fileCounter = 0
-        for file_ in file_list:
-            lineCounter = 0
-            columnMapper = []
-            for line in open( file_, 'r' ):
-                line = line.rstrip('\n')
-                # read the headers in file
-                if (lineCounter == 0):
-                    headersInFile = line.split('\t')
-                    # replace any empty strings in header
-                    fileName = GetFileNameWithoutExt(file_)
-                    emptyHeaderCounter = 0
-                    for i in range(len(headersInFile)):
-                        # reformat any empty headers to be unique
-                        if(headersInFile[i] == ''):
-                            headersInFile[i] = fileName +  '.Empty.' + str(emptyHeaderCounter)
-                            emptyHeaderCounter = emptyHeaderCounter + 1
-                    # match up unique headers with headers from this file
-                    # build header mapping
-                    for uh in headers:
-                        if (uh in headersInFile):
-                            columnMapper.append(headersInFile.index(uh))
-                        else:
-                            columnMapper.append(-1)
-                # ensure unique header is written
-                if(fileCounter == 0 and lineCounter == 0):
-                    headers.append('\n')
-                    result.write('\t'.join(headers))
-                elif(lineCounter != 0):
-                    # write out padded rows
-                    rowdata = line.split('\t')
-                    #print(rowdata)
-                    paddedRow = []
-                    for cm in columnMapper:
-                        if(cm == -1):
-                            # this column does not exist in this file
-                            paddedRow.append('N/A')
-                        elif (cm > len(rowdata)):
-                            # less columns in file than mapper index (shouldnt happen??)
-                            paddedRow.append('index out of bounds')
-                        else:
-                            paddedRow.append(rowdata[cm])
-                    paddedRow.append('\n')
-                    result.write('\t'.join(paddedRow))
-                lineCounter += 1
-            fileCounter += 1
+    merge.MergeReports(file_list, folderPath + '\\' + outPutFileName, maxWorkers)
 
 def GetUniqueHeaders(files):
     '''
@@ -376,23 +345,7 @@ def GetUniqueHeaders(files):
     :rtype: list of str
     '''
 
-    headersInAllFiles = {}
-    for f in files:
-        data = GetFirstRowInFile(f)
-        if (data is not None):
-            rowSplit = data.split('\t')
-            headersInAllFiles[GetFileNameWithoutExt(f)] = rowSplit
-    headersUnique = []
-    for headerByfile in headersInAllFiles:
-        emptyHeaderCounter = 0
-        for header in headersInAllFiles[headerByfile]:
-            # reformat any empty headers to be unique
-            if(header == ''):
-                header = headerByfile +  '.Empty.' + str(emptyHeaderCounter)
-                emptyHeaderCounter = emptyHeaderCounter + 1
-            if(header not in headersUnique):
-                headersUnique.append(header)
-    return sorted(headersUnique)
+    return merge.GetUniqueHeaders(files)
 
 def GetFirstRowInFile(filePath):
     '''
@@ -413,10 +366,12 @@ def GetFirstRowInFile(filePath):
         row = None
     return row
 
-def writeReportData(fileName, header, data, writeType = 'w'):
+def writeReportData(fileName, header, data, writeType = 'w', sink = rw.SINK_TSV):
     '''
     Function writing out report information.
 
+    Rows are buffered and written in large chunks (refer to :mod:`UtilReportWriter`).
+
     :param fileName: The reports fully qualified file path.
     :type fileName: str
     :param header: list of column headers
@@ -425,21 +380,15 @@ def writeReportData(fileName, header, data, writeType = 'w'):
     :type data: [[str,str,..]]
     :param writeType: Flag indicating whether existing report file is to be overwritten 'w' or appended to 'a', defaults to 'w'
     :type writeType: str, optional
+    :param sink: The report format, one of UtilReportWriter.SINK_ constants, defaults to tab separated text file
+    :type sink: str, optional
+
+    :return: True if the report was written. (An exception is raised otherwise.)
+    :rtype: bool
     '''
 
-    with codecs.open(fileName, writeType, encoding='utf-8') as f:
-        # check if header is required
-        if(len(header) > 0):
-            print('\t'.join(header + ['\n']))
-            f.write('\t'.join(header + ['\n']))
-        # check if data is required
-        if(len(data) > 0):
-            for d in data:
-                if (len(d) > 1):
-                    f.write('\t'.join(d + ['\n']))
-                elif(len(d) == 1):
-                    f.write(d[0] + '\n')
-        f.close()
+    rw.WriteReportData(fileName, header, data, writeType, sink)
+    return True
 
 # ---------------------------------------------------------------------------------------------------------------------------------
 
@@ -645,6 +594,30 @@ def RenameFile(oldName, newName):
         value = False
     return value
 
+def ReplaceFile(sourceFile, destinationFile):
+    '''
+    Moves a file to a new location, replacing any existing file there in a single step: readers find either the old or the new file.
+
+    Uses os.replace where available, otherwise (IronPython) the .NET File.Replace method. Only if that fails (i.e. not supported\
+        by the file system) the existing file is deleted before the file is moved.
+
+    :param sourceFile: Fully qualified file path of the file to be moved, i.e. a temp file just written.
+    :type sourceFile: str
+    :param destinationFile: Fully qualified file path of the file to be replaced.
+    :type destinationFile: str
+    '''
+
+    if(hasattr(os, 'replace')):
+        os.replace(sourceFile, destinationFile)
+        return
+    if(os.path.exists(destinationFile)):
+        try:
+            File.Replace(sourceFile, destinationFile, None)
+            return
+        except Exception:
+            os.remove(destinationFile)
+    os.rename(sourceFile, destinationFile)
+
 def CopyFile(oldName, newName):
     '''
     Copies a file
@@ -746,6 +719,19 @@ def GetFileNameWithoutExt(filePath):
     name = Path.GetFileNameWithoutExtension(filePath)
     return name
 
+def NormaliseFilePath(filePath):
+    '''
+    Returns a file path in a format which can be used to compare file paths: lower case, back slashes only, no leading or trailing white space.
+
+    :param filePath: A file path.
+    :type filePath: str
+
+    :return: The normalised file path.
+    :rtype: str
+    '''
+
+    return filePath.strip().replace('/', '\\').lower()
+
 def ConvertRelativePathToFullPath(relativeFilePath, fullFilePath):
     '''
     removes '../..' or '../' from relative file path string and replaces it with full path derived path passt in sample path.
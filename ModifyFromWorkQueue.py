@@ -0,0 +1,156 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2020  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+# sample description
+# this sample shows how to process files claimed from a shared directory work queue (see UtilWorkQueue) rather than from a static task list
+# the queue is seeded by a pre-process (see Pre_SeedWorkQueue.py)
+# this script runs in batch processor 'single Revit task' mode: it opens, modifies, saves and closes each file itself
+# run a number of sessions in parallel (see BAT\ModifyParallelWorkQueue.bat), all using the same settings file:
+#   each session claims the next file from the queue whenever it is done with its last one, until no files are left
+# while a file is processed the claim (lease) is renewed in the background, so other sessions do not take it over
+# files which were processed successfully end up in the queue 'done' directory, all others in the 'failed' directory
+
+# ---------------------------------
+# default path locations
+# ---------------------------------
+# path to library modules
+commonLibraryLocation_ = r'C:\temp'
+# path to directory containing this script (in case there are any other modules to be loaded from here)
+scriptLocation_ = r'C:\temp'
+
+import clr
+import System
+import os
+
+# set path to library and this script
+import sys
+sys.path += [commonLibraryLocation_, scriptLocation_]
+
+# import libraries
+import RevitCommonAPI as com
+import Result as res
+import UtilWorkQueue as wq
+
+# autodesk API
+import Autodesk.Revit.DB as rdb
+
+clr.AddReference('System.Core')
+clr.ImportExtensions(System.Linq)
+
+# flag whether this runs in debug or not
+debug_ = False
+
+# Add batch processor scripting references
+if not debug_:
+    import revit_script_util
+    clr.AddReference('RevitAPI')
+    clr.AddReference('RevitAPIUI')
+    # NOTE: this only makes sense for single Revit task processing mode.
+    uiApp_ = revit_script_util.GetUIApplication()
+else:
+    # revit python shell
+    uiApp_ = __revit__
+
+# -------------
+# my code here:
+# -------------
+
+# output messages either to batch processor (debug = False) or console (debug = True)
+def Output(message = ''):
+    if not debug_:
+        revit_script_util.Output(str(message))
+    else:
+        print (message)
+
+# opens a file: workshared central files are opened as a new local file
+# revitFilePath:    fully qualified file path
+def OpenDocument(revitFilePath):
+    modelPath = rdb.ModelPathUtils.ConvertUserVisiblePathToModelPath(revitFilePath)
+    fileInfo = rdb.BasicFileInfo.Extract(revitFilePath)
+    if(fileInfo.IsWorkshared and fileInfo.IsCentral):
+        localModelPath = rdb.ModelPathUtils.ConvertUserVisiblePathToModelPath(os.path.join(localFilePath_, os.path.basename(revitFilePath)))
+        rdb.WorksharingUtils.CreateNewLocal(modelPath, localModelPath)
+        modelPath = localModelPath
+    return uiApp_.Application.OpenDocumentFile(modelPath, rdb.OpenOptions())
+
+# modifies a document: add your changes here
+# doc:              the document
+def ModifyDocument(doc):
+    returnvalue = res.Result()
+    # i.e. opening and saving a file upgrades it to the current Revit version
+    returnvalue.message = 'No changes made.'
+    return returnvalue
+
+# saves (or syncs) and closes a document
+# doc:              the document
+def SaveAndCloseDocument(doc):
+    returnvalue = res.Result()
+    if(doc.IsWorkshared):
+        returnvalue.Update(com.SyncFile(doc))
+    else:
+        try:
+            doc.Save()
+            returnvalue.message = 'Succesfully saved file.'
+        except Exception as e:
+            returnvalue.UpdateSep(False, 'Failed to save file with exception: ' + str(e))
+    doc.Close(False)
+    return returnvalue
+
+# processes a work item claimed from the queue
+# itemData:         the work item data: a task list row (a fully qualified revit file path)
+def ProcessFile(itemData):
+    revitFilePath = itemData.strip()
+    Output('Processing: ' + revitFilePath)
+    returnvalue = res.Result()
+    try:
+        doc = OpenDocument(revitFilePath)
+    except Exception as e:
+        Output('Failed to open file with exception: ' + str(e))
+        return False
+    try:
+        returnvalue.Update(ModifyDocument(doc))
+    except Exception as e:
+        returnvalue.UpdateSep(False, 'Failed to modify file with exception: ' + str(e))
+    # close the file whether the changes worked or not
+    returnvalue.Update(SaveAndCloseDocument(doc))
+    Output(returnvalue.message)
+    return returnvalue.status
+
+# -------------
+# main:
+# -------------
+
+# shared work queue directory (as used by the pre-process seeding the queue)
+queuePath_ = r'C:\temp\WorkQueue'
+# directory new local files of workshared files are created in
+localFilePath_ = r'C:\temp\Local'
+
+Output('Processing work queue.... start')
+queue_ = wq.WorkQueue(queuePath_)
+results_ = wq.ProcessQueue(queue_, ProcessFile)
+for itemData, status in results_:
+    Output(itemData.strip() + ' status: ' + str(status))
+Output('Processing work queue.... status: ' + str(queue_.GetStatus()))
+Output('Processing work queue.... finished')
@@ -0,0 +1,81 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2020  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+# sample description
+# this sample shows how to collect report files written by the Report*.py samples and the model health report into a local SQLite database
+# run this with python 3 outside of Revit after the batch processor sessions finished (IronPython does not support SQLite):
+#   python Post_ReportWarehouse.py
+# only report files added or changed since the last run are read
+
+# ---------------------------------
+# default path locations
+# ---------------------------------
+# path to library modules
+commonLibraryLocation_ = r'C:\temp'
+# path to directory containing this script (in case there are any other modules to be loaded from here)
+scriptLocation_ = r'C:\temp'
+
+# set path to library and this script
+import sys
+sys.path += [commonLibraryLocation_, scriptLocation_]
+
+# import libraries
+import UtilReportWarehouse as warehouse
+
+# -------------
+# my code here:
+# -------------
+
+# output messages to console
+def Output(message = ''):
+    print (message)
+
+# -------------
+# main:
+# -------------
+
+# directory containing the report files
+reportPath_ = r'C:\temp'
+# flag whether report files in sub directories are collected too
+includeSubDirs_ = False
+# the warehouse database
+databaseFilePath_ = r'C:\temp\ReportWarehouse.db'
+
+Output('Ingesting report files.... start')
+connection_ = warehouse.OpenWarehouse(databaseFilePath_)
+try:
+    result_ = warehouse.IngestReports(connection_, reportPath_, includeSubDirs_)
+    Output(result_.message)
+    Output('Ingesting report files.... status: ' + str(result_.status))
+    # sample query: number of worksets per model over time (only if any workset reports got ingested)
+    if(len(warehouse.GetTableColumns(connection_, 'WORKSETS')) > 0):
+        for hostFile, runDate, numberOfWorksets in warehouse.GetRowCountTrend(connection_, 'WORKSETS'):
+            Output(hostFile + '\t' + runDate + '\t' + str(numberOfWorksets))
+    else:
+        Output('No workset reports in warehouse.')
+except Exception as e:
+    Output('Ingesting report files.... failed with exception: ' + str(e))
+finally:
+    connection_.close()
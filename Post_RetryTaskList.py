@@ -0,0 +1,136 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2020  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+# sample description
+# this sample shows how to turn files which failed to process into retry task list files (used as a post-process)
+# files are retried a number of times with an increasing wait between attempts (see BatchProcessorRetry), files not found are not retried
+# a chained batch file can then start a retry step if any retry task list file got written (i.e. if exist C:\temp\Retry\Tasklist_0.txt)
+# it also stores the runtimes of this session's files in a runtime store (see BatchProcessorRuntimeStore) used by pre-processes
+#   to balance task lists (Pre_BuildFileList.py) or order a work queue (Pre_SeedWorkQueue.py) by past processing time
+
+# ---------------------------------
+# default path locations
+# ---------------------------------
+# path to library modules
+commonLibraryLocation_ = r'C:\temp'
+# path to directory containing this script (in case there are any other modules to be loaded from here)
+scriptLocation_ = r'C:\temp'
+
+import clr
+import System
+
+# set path to library and this script
+import sys
+sys.path += [commonLibraryLocation_, scriptLocation_]
+
+import os
+import glob
+
+# import libraries
+import BatchProcessorLogUtils as logUtils
+import BatchProcessorRetry as retry
+import BatchProcessorRuntimeStore as rs
+import FileList as fl
+import FileItem as fi
+
+# flag whether this runs in debug or not 
+debug_ = False
+
+# Add batch processor scripting references
+if not debug_:
+    import script_util
+
+# -------------
+# my code here:
+# -------------
+
+# output messages either to batch processor (debug = False) or console (debug = True)
+def Output(message = ''):
+    if not debug_:
+        script_util.Output(str(message))
+    else:
+        print (message)
+
+# returns file items of all files due for a retry (same signature as FileList.getRevitFiles)
+def GetFilesToRetry(directory, fileExtension):
+    files = []
+    for record in filesToRetry_:
+        size = 0
+        try:
+            size = os.path.getsize(record.filePath)
+        except Exception:
+            pass
+        files.append(fi.MyFileItem(record.filePath, size))
+    return files
+
+# -------------
+# main:
+# -------------
+
+# directory containing the session marker files
+markerFilePath_ = r'C:\temp'
+# retry state file (see BatchProcessorRetry): keeps track of failed attempts across sessions
+retryStateFilePath_ = r'C:\temp\RetryState.txt'
+# store retry task files lists here
+retryTaskListPath_ = r'C:\temp\Retry'
+# maximum number of retry task list files to be written out
+taskFilesNumber_ = 3
+# number of times a file is retried
+maxRetries_ = retry.DEFAULT_MAX_RETRIES
+# seconds to wait before retrying a file which failed twice, doubles with every further failed attempt
+backoffSeconds_ = retry.DEFAULT_BACKOFF_SECONDS
+# runtime store file (see BatchProcessorRuntimeStore): set to None to not store runtimes
+runtimeStoreFilePath_ = r'C:\temp\RuntimeStore.txt'
+
+# remove retry task lists of a previous session
+for taskListFile in glob.glob(os.path.join(retryTaskListPath_, 'Tasklist_*.txt')):
+    os.remove(taskListFile)
+
+# store runtimes of this session
+# note: this needs to happen before the session results are read, which deletes the session marker files
+if(runtimeStoreFilePath_ != None):
+    Output('Storing runtimes.... start')
+    logFiles_ = logUtils.GetLogFiles(logUtils.GetCurrentSessionIds(markerFilePath_, deleteMarkerFiles = False))
+    added_ = rs.StoreRuntimesFromLogFiles(logFiles_, runtimeStoreFilePath_)
+    Output('Storing runtimes.... added ' + str(added_) + ' runtime(s) from ' + str(len(logFiles_)) + ' log file(s)')
+
+# get processing results of this session (deletes the session marker files)
+Output('Reading session results.... start')
+logResult_ = logUtils.ProcessLogFiles(markerFilePath_)
+Output(logResult_.message)
+if(logResult_.status):
+    state_ = retry.ReadRetryState(retryStateFilePath_)
+    succeeded_, failed_, failedPermanently_ = retry.UpdateRetryState(state_, logResult_.result, backoffSeconds = backoffSeconds_)
+    retry.WriteRetryState(retryStateFilePath_, state_)
+    Output('Succeeded: ' + str(succeeded_) + ' failed: ' + str(failed_) + ' failed permanently: ' + str(failedPermanently_))
+    filesToRetry_ = retry.GetFilesToRetry(state_, maxRetries_)
+    if(len(filesToRetry_) > 0):
+        # write retry task lists: no more task lists than files
+        Output('Writing retry task lists.... start')
+        result_ = fl.WriteFileList(retryTaskListPath_, '.rvt', retryTaskListPath_, min(taskFilesNumber_, len(filesToRetry_)), GetFilesToRetry)
+        Output (result_.message)
+        Output('Writing retry task lists.... status: ' + str(result_.status))
+    else:
+        Output('No files to retry.')
@@ -72,9 +72,32 @@ rootPath_ = r'C:\temp'
 rootPathExport_ = r'C:\temp'
 # number of task list files to be written out
 taskFilesNumber_ = 1
+# runtime store file (see BatchProcessorRuntimeStore) used to balance task lists by past processing time rather than file size
+# (i.e. as written by the Post_RetryTaskList.py post-process), set to None to balance by file size
+runtimeStoreFilePath_ = None
+# file catalog (see UtilFileCatalog) used to read files without rescanning unchanged directories
+# set to None to read the directory every time
+catalogFilePath_ = None
+# only write files which changed or failed since they were last processed (requires a catalog and a runtime store)
+skipUnchangedFiles_ = False
+# process all files again if they were last processed longer ago than this number of days, set to None to never force a full run
+fullRunDays_ = 7
+# write separate task lists per Revit version the files were saved in (task list names include the version)
+groupByVersion_ = False
+# exclude local copies of central files from task lists
+excludeLocalFiles_ = False
+# Revit link reports (see ReportLinks.py) used to keep files sharing links in the same task list
+# set to None to ignore links
+linkReportFilePaths_ = None
 
 # get file data
 Output('Writing file Data.... start')
-result_ = fl.WriteFileList(rootPath_ ,'.rvt', rootPathExport_, taskFilesNumber_, fl.getRevitFiles)
+fileGetter_ = fl.getRevitFiles
+if(catalogFilePath_ != None):
+    if(skipUnchangedFiles_ and runtimeStoreFilePath_ != None):
+        fileGetter_ = fl.GetIncrementalFileGetter(catalogFilePath_, runtimeStoreFilePath_, fullRunDays_, False)
+    else:
+        fileGetter_ = fl.GetCatalogFileGetter(catalogFilePath_, False)
+result_ = fl.WriteFileList(rootPath_ ,'.rvt', rootPathExport_, taskFilesNumber_, fileGetter_, runtimeStoreFilePath = runtimeStoreFilePath_, groupByVersion = groupByVersion_, excludeLocalFiles = excludeLocalFiles_, linkReportFilePaths = linkReportFilePaths_)
 Output (result_.message)
 Output('Writing file Data.... status: ' + str(result_.status))
\ No newline at end of file
@@ -0,0 +1,83 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2020  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+# sample description
+# this sample shows how to seed a shared directory work queue (used as a pre-process) using FileList module
+# parallel sessions then claim files from the queue (see UtilWorkQueue) rather than each processing a static task list
+# refer to ModifyFromWorkQueue.py for a task script processing the queue and to BAT\ModifyParallelWorkQueue.bat for how to run both
+
+# ---------------------------------
+# default path locations
+# ---------------------------------
+# path to library modules
+commonLibraryLocation_ = r'C:\temp'
+# path to directory containing this script (in case there are any other modules to be loaded from here)
+scriptLocation_ = r'C:\temp'
+
+import clr
+import System
+
+# set path to library and this script
+import sys
+sys.path += [commonLibraryLocation_, scriptLocation_]
+
+# import libraries
+import FileList as fl
+
+# flag whether this runs in debug or not 
+debug_ = False
+
+# Add batch processor scripting references
+if not debug_:
+    import script_util
+
+# -------------
+# my code here:
+# -------------
+
+# output messages either to batch processor (debug = False) or console (debug = True)
+def Output(message = ''):
+    if not debug_:
+        script_util.Output(str(message))
+    else:
+        print (message)
+
+# -------------
+# main:
+# -------------
+
+# directory containing files
+rootPath_ = r'C:\temp'
+# shared work queue directory: needs to be accessible by all sessions
+queuePath_ = r'C:\temp\WorkQueue'
+# runtime store file (see BatchProcessorRuntimeStore) used to queue files by past processing time rather than file size
+# (i.e. as written by the Post_RetryTaskList.py post-process), set to None to queue by file size
+runtimeStoreFilePath_ = None
+
+# seed queue
+Output('Seeding work queue.... start')
+result_ = fl.WriteWorkQueue(rootPath_ ,'.rvt', queuePath_, fl.getRevitFiles, runtimeStoreFilePath = runtimeStoreFilePath_)
+Output (result_.message)
+Output('Seeding work queue.... status: ' + str(result_.status))
@@ -46,10 +46,33 @@ clr.ImportExtensions(System.Linq)
 import FileItem as fi
 # import workloader utils
 import Workloader as wl
+# import workload cost models
+import WorkloadCostModel as wcm
 #import WorkloadBucket as wlb
 
 # custom result class
 from Library import Result as res
+# file path helpers
+from Library import Utility as util
+# shared directory work queue
+from Library import UtilWorkQueue as wq
+# file discovery
+from Library import UtilFileDiscovery as discovery
+# file catalog
+from Library import UtilFileCatalog as catalog
+# skip files unchanged since last processed
+from Library import BatchProcessorIncrementalRun as incremental
+from Library import BatchProcessorRuntimeStore as rs
+# revit file version and worksharing state
+from Library import UtilRevitFileInfo as rfi
+from Library import UtilParallel as parallel
+# keep host models sharing links together
+from Library import UtilLinkAffinity as la
+
+#: Number of files read in parallel when getting Revit file information
+DEFAULT_FILE_INFO_WORKERS = 8
+#: Version label of files whose Revit version could not be read
+UNKNOWN_REVIT_VERSION = 'Unknown'
 
 # -------------
 # my code here:
@@ -69,18 +92,10 @@ def getRevitFiles(directory, fileExtension):
     '''
 
     files = []
-    listOfFiles = os.listdir(directory)
-    for f in listOfFiles:
-        # check for file extension match
-        if(f.lower().endswith(fileExtension.lower())):
-            # check if this is a back up file, remove the file extension
-            filePath = f[:-len(fileExtension)]
-            if(isBackUpFile(filePath) == False):
-                # Use join to get full file path.
-                location = os.path.join(directory, f)
-                # Get size and add to list of files.
-                size = os.path.getsize(location)
-                files.append(fi.MyFileItem(location,size))
+    # filter by file extension and remove back up files while reading the directory
+    fileFilter = discovery.FileFilter(fileExtension, excludeBackups = True, ignoreCase = True)
+    for f in discovery.DiscoverFiles(directory, fileFilter, False):
+        files.append(fi.MyFileItem(f.path, f.size))
     return files
 
 def getRevitFilesInclSubDirs(directory, fileExtension):
@@ -97,21 +112,77 @@ def getRevitFilesInclSubDirs(directory, fileExtension):
     '''
 
     files = []
-    # Get the list of all files in directory tree at given path
-    listOfFiles = list()
-    for (dirpath, dirnames, filenames) in os.walk(directory):
-        listOfFiles += [os.path.join(dirpath, file) for file in filenames]
-    for f in listOfFiles:
-        # check for file extension match
-        if(f.lower().endswith(fileExtension.lower())):
-            # check if this is a back up file, remove the file extension
-            filePath = f[:-len(fileExtension)]
-            if(isBackUpFile(filePath) == False):
-                # Get size and add to list of files.
-                size = os.path.getsize(f)
-                files.append(fi.MyFileItem(f,size))
+    # filter by file extension and remove back up files while walking the directory tree
+    fileFilter = discovery.FileFilter(fileExtension, excludeBackups = True, ignoreCase = True)
+    for f in discovery.DiscoverFiles(directory, fileFilter):
+        files.append(fi.MyFileItem(f.path, f.size))
     return files
 
+def GetCatalogFileGetter(catalogFilePath, includeSubDirs = True, rescan = True):
+    '''
+    Returns a file getter function which reads files from a file catalog rather than walking the directory tree.
+
+    The catalog is created on first use. Afterwards content hashes of files which did not change since the previous run are kept\
+        (refer to :mod:`UtilFileCatalog`).
+
+    :param catalogFilePath: The fully qualified file path of the catalog file.
+    :type catalogFilePath: str
+    :param includeSubDirs: Flag indicating whether files in sub directories are returned, defaults to True
+    :type includeSubDirs: bool, optional
+    :param rescan: Flag indicating whether the directory tree is rescanned. If False an existing catalog is used as is, defaults to True
+    :type rescan: bool, optional
+
+    :return: A function with the same signature as :func:`.getRevitFiles`
+    :rtype: func(str, str) -> [:class:`.FileItem`]
+    '''
+
+    def getRevitFilesFromCatalog(directory, fileExtension):
+        files = []
+        fileFilter = discovery.FileFilter(fileExtension, excludeBackups = True, ignoreCase = True)
+        fileCatalog = catalog.GetCatalog(catalogFilePath, directory, fileFilter, rescan)
+        for f in fileCatalog.GetFiles(includeSubDirs):
+            files.append(fi.MyFileItem(f.path, f.size))
+        return files
+    return getRevitFilesFromCatalog
+
+def GetIncrementalFileGetter(catalogFilePath, runtimeStoreFilePath, fullRunDays = None, includeSubDirs = True):
+    '''
+    Returns a file getter function which only returns files which need processing: new files, files which failed or changed since\
+        they were last processed and files not processed for a given number of days (refer to :mod:`BatchProcessorIncrementalRun`).
+
+    Files are read from a file catalog (refer to :func:`.GetCatalogFileGetter`), previous results from a runtime store.
+    The catalog is updated first. Each directory is listed again, so files saved in place are reported with their current size\
+        and modified time (refer to :func:`UtilFileCatalog.UpdateCatalog`).
+
+    :param catalogFilePath: The fully qualified file path of the catalog file.
+    :type catalogFilePath: str
+    :param runtimeStoreFilePath: The fully qualified file path of the runtime store containing results of previous sessions.
+    :type runtimeStoreFilePath: str
+    :param fullRunDays: Files last processed successfully more than this number of days ago are processed again, defaults to None (never)
+    :type fullRunDays: int, optional
+    :param includeSubDirs: Flag indicating whether files in sub directories are returned, defaults to True
+    :type includeSubDirs: bool, optional
+
+    :return: A function with the same signature as :func:`.getRevitFiles`
+    :rtype: func(str, str) -> [:class:`.FileItem`]
+    '''
+
+    def getChangedRevitFiles(directory, fileExtension):
+        files = []
+        fileFilter = discovery.FileFilter(fileExtension, excludeBackups = True, ignoreCase = True)
+        fileCatalog = catalog.GetCatalog(catalogFilePath, directory, fileFilter)
+        filesToProcess, reasonCounts = incremental.GetFilesToProcess(
+            fileCatalog.GetFiles(includeSubDirs),
+            rs.ReadRuntimes(runtimeStoreFilePath),
+            fullRunDays
+        )
+        for reason in sorted(reasonCounts):
+            print (reason + ': ' + str(reasonCounts[reason]))
+        for f in filesToProcess:
+            files.append(fi.MyFileItem(f.path, f.size))
+        return files
+    return getChangedRevitFiles
+
 def isBackUpFile(filePath):
     '''
     Checks whether a file is a Revit back up file.
@@ -151,6 +222,87 @@ def isBackUpFile(filePath):
             pass
     return isBackup
 
+def getRevitFileInfo(item):
+    '''
+    Returns the Revit file information (version, worksharing state, central path) of a file item.
+
+    Files on a file server are read without Revit (refer to :mod:`UtilRevitFileInfo`). For BIM 360 files only the version is known.
+
+    :param item: A file item object instance.
+    :type item: :class:`.FileItem`
+
+    :return: The Revit file information.
+    :rtype: :class:`UtilRevitFileInfo.RevitFileInfo`
+    '''
+
+    if(item.BIM360FileGUID != None):
+        return rfi.RevitFileInfo(item.BIM360RevitVersion)
+    return rfi.GetRevitFileInfo(item.name)
+
+def GroupByRevitVersion(items, excludeLocalFiles = False, maxWorkers = DEFAULT_FILE_INFO_WORKERS):
+    '''
+    Groups file items by the Revit version they were saved in.
+
+    :param items: List of file items.
+    :type items: [:class:`.FileItem`]
+    :param excludeLocalFiles: Flag indicating whether local copies of central files are excluded, defaults to False
+    :type excludeLocalFiles: bool, optional
+    :param maxWorkers: The number of files read in parallel, defaults to DEFAULT_FILE_INFO_WORKERS
+    :type maxWorkers: int, optional
+
+    :return:
+        - Dictionary where key is the Revit version (UNKNOWN_REVIT_VERSION if the file could not be read) and value is a list of file items.
+        - List of file items excluded.
+    :rtype: {str: [:class:`.FileItem`]}, [:class:`.FileItem`]
+    '''
+
+    groups = {}
+    excluded = []
+    for item, fileInfo in zip(items, parallel.MapInParallel(getRevitFileInfo, items, maxWorkers)):
+        info, exception = fileInfo
+        version = UNKNOWN_REVIT_VERSION
+        if(exception is None):
+            if(excludeLocalFiles and info.IsLocal()):
+                excluded.append(item)
+                continue
+            if(info.version != ''):
+                version = info.version
+        if(version in groups):
+            groups[version].append(item)
+        else:
+            groups[version] = [item]
+    return groups, excluded
+
+def GetLinkClusterGetter(linkReportFilePaths, items, getWorkloadSize, numberOfBuckets, maxClusterShare = la.DEFAULT_MAX_CLUSTER_SHARE):
+    '''
+    Returns a function returning the link cluster of a file item: files sharing Revit links are put into the same cluster\
+        (refer to :mod:`UtilLinkAffinity`).
+
+    :param linkReportFilePaths: List of fully qualified file paths of Revit link reports (refer to ReportLinks.py).
+    :type linkReportFilePaths: [str]
+    :param items: The file items to be distributed.
+    :type items: [:class:`.FileItem`]
+    :param getWorkloadSize: A function returning the workload size from an item.
+    :type getWorkloadSize: func(:class:`.FileItem`) -> int
+    :param numberOfBuckets: The number of buckets items are to be distributed to.
+    :type numberOfBuckets: int
+    :param maxClusterShare: The maximum workload of a cluster as a share of the average workload per bucket, defaults to UtilLinkAffinity.DEFAULT_MAX_CLUSTER_SHARE
+    :type maxClusterShare: float, optional
+
+    :return:
+        - Function returning the cluster id of a file item, or None if the file is not part of a cluster.
+        - The host to link graph read from the link reports.
+    :rtype: func(:class:`.FileItem`) -> str, :class:`UtilLinkAffinity.LinkGraph`
+    '''
+
+    graph = la.ReadLinkReports(linkReportFilePaths)
+    hostWorkloads = {}
+    for item in items:
+        hostWorkloads[util.NormaliseFilePath(item.name)] = getWorkloadSize(item)
+    maxClusterWorkload = maxClusterShare * sum(hostWorkloads.values()) / float(max(1, numberOfBuckets))
+    clusters = la.GetLinkClusters(graph, hostWorkloads, maxClusterWorkload, la.GetLinkFileSize)
+    return lambda item: clusters.get(util.NormaliseFilePath(item.name)), graph
+
 def getFileSize(item):
     '''
     Helper used to define workload size (same as file size)
@@ -240,7 +392,7 @@ def writeRevitTaskFile(fileName, bucket, GetData = BucketToTaskListFileSystem):
 # fileExtension         file extenision in format .rvt
 # tasklistDirectory     
 # taskFilesNumbes       number of task files to be written
-def WriteFileList(directoryPath, fileExtension, taskListDirectory, taskFilesNumber, fileGetter, fileDataProcessor = BucketToTaskListFileSystem):
+def WriteFileList(directoryPath, fileExtension, taskListDirectory, taskFilesNumber, fileGetter, fileDataProcessor = BucketToTaskListFileSystem, refineWorkload = False, runtimeStoreFilePath = None, groupByVersion = False, excludeLocalFiles = False, linkReportFilePaths = None):
     '''
     Writes out all task list(s) to file(s).
 
@@ -256,12 +408,25 @@ def WriteFileList(directoryPath, fileExtension, taskListDirectory, taskFilesNumb
     :type fileGetter: func(str, str) -> :class:`.FileItem`
     :param fileDataProcessor: Function processing file item and retruns a string to be written to task list file, defaults to BucketToTaskListFileSystem
     :type fileDataProcessor: func(:class:`.FileItem`) -> str, optional
+    :param refineWorkload: Flag indicating whether files are swapped between task lists after distributing them, to even out workloads further, defaults to False
+    :type refineWorkload: bool, optional
+    :param runtimeStoreFilePath: Fully qualified file path of a runtime store (refer to :mod:`BatchProcessorRuntimeStore`). If provided, files are distributed\
+        by past processing time rather than file size, defaults to None
+    :type runtimeStoreFilePath: str, optional
+    :param groupByVersion: Flag indicating whether each task list only contains files saved in the same Revit version. Task list files are named\
+        'Tasklist_[version]_[number].txt' and at least one is written per version, defaults to False
+    :type groupByVersion: bool, optional
+    :param excludeLocalFiles: Flag indicating whether local copies of central files are excluded from task lists, defaults to False
+    :type excludeLocalFiles: bool, optional
+    :param linkReportFilePaths: List of fully qualified file paths of Revit link reports (refer to ReportLinks.py). If provided, files sharing\
+        links are kept in the same task list where possible, so links are loaded by fewer sessions, defaults to None
+    :type linkReportFilePaths: [str], optional
     
     :return: 
         Result class instance.
 
         - Write file status (bool) returned in result.status. False if an exception occured, otherwise True.
-        - Result.message property contains fully qualified file path for each task list file.
+        - Result.message property contains fully qualified file path for each task list file and the workload makespan and imbalance ratio.
         
         On exception:
         
@@ -275,17 +440,103 @@ def WriteFileList(directoryPath, fileExtension, taskListDirectory, taskFilesNumb
     returnvalue.status = True
     # get revit files in input dir
     revitfiles = fileGetter(directoryPath, fileExtension)
-    # build bucket list
-    buckets = wl.DistributeWorkload(taskFilesNumber, revitfiles, getFileSize)
     try:
-        # write out file lists
-        counter = 0
-        for bucket in buckets:
-            fileName =  os.path.join(taskListDirectory, 'Tasklist_' + str(counter)+ '.txt')
-            statusWrite = writeRevitTaskFile(fileName, bucket, fileDataProcessor)
-            returnvalue.Update(statusWrite)
-            counter += 1
+        # workload of a file is either its file size or its estimated processing time
+        getWorkloadSize = getFileSize
+        if(runtimeStoreFilePath != None):
+            costModel = wcm.GetRuntimeCostModel(runtimeStoreFilePath, revitfiles)
+            getWorkloadSize = costModel.GetWorkloadSize
+        # group files by revit version: task list file name prefix: files
+        groups = {'Tasklist_': revitfiles}
+        if(groupByVersion or excludeLocalFiles):
+            versionGroups, excluded = GroupByRevitVersion(revitfiles, excludeLocalFiles)
+            for item in excluded:
+                returnvalue.AppendMessage('Excluded local copy: ' + item.name)
+            if(groupByVersion):
+                groups = {}
+                for version in versionGroups:
+                    groups['Tasklist_' + version + '_'] = versionGroups[version]
+            else:
+                groups = {'Tasklist_': [item for item in revitfiles if item not in excluded]}
+        # keep files sharing links in the same task list
+        getClusterId = None
+        if(linkReportFilePaths != None):
+            getClusterId, linkGraph = GetLinkClusterGetter(linkReportFilePaths, revitfiles, getWorkloadSize, taskFilesNumber)
+        prefixes = sorted(groups)
+        bucketCounts = [taskFilesNumber]
+        if(len(prefixes) > 1):
+            bucketCounts = wl.AllocateBuckets(taskFilesNumber, [sum([getWorkloadSize(item) for item in groups[prefix]]) for prefix in prefixes])
+        allBuckets = []
+        for prefix, bucketCount in zip(prefixes, bucketCounts):
+            # build bucket list
+            buckets = wl.DistributeWorkload(bucketCount, groups[prefix], getWorkloadSize, refineWorkload, getClusterId)
+            allBuckets = allBuckets + buckets
+            # write out file lists
+            counter = 0
+            for bucket in buckets:
+                fileName =  os.path.join(taskListDirectory, prefix + str(counter)+ '.txt')
+                statusWrite = writeRevitTaskFile(fileName, bucket, fileDataProcessor)
+                returnvalue.Update(statusWrite)
+                counter += 1
+        returnvalue.AppendMessage('Workload makespan: ' + str(wl.GetMakespan(allBuckets)) + ' imbalance ratio: ' + str(round(wl.GetImbalanceRatio(allBuckets), 3)))
+        if(getClusterId != None):
+            returnvalue.AppendMessage('Link loads: ' + str(la.GetSharedLinkLoads(linkGraph, [[item.name for item in bucket.items] for bucket in allBuckets])))
         returnvalue.AppendMessage('Finished writing out task files')
     except Exception as e:
         returnvalue.UpdateSep(False, 'Failed to save file list! '  + str(e))
     return returnvalue
+
+def WriteWorkQueue(directoryPath, fileExtension, queueDirectory, fileGetter, fileDataProcessor = BucketToTaskListFileSystem, runtimeStoreFilePath = None, resetQueue = True):
+    '''
+    Seeds a shared directory work queue with files, biggest workload first. Use instead of :func:`WriteFileList` if sessions\
+        are to claim files from a queue rather than each processing a static task list.
+
+    :param directoryPath: Fully qualified directory path containing files to be added to the queue.
+    :type directoryPath: str
+    :param fileExtension: A file extension filter in format '.ext'
+    :type fileExtension: str
+    :param queueDirectory: The fully qualified directory path of the work queue.
+    :type queueDirectory: str
+    :param fileGetter: Function accepting a directory and file extension filter and returns file items from directory.
+    :type fileGetter: func(str, str) -> :class:`.FileItem`
+    :param fileDataProcessor: Function processing file item and retruns a string to be added to the queue, defaults to BucketToTaskListFileSystem
+    :type fileDataProcessor: func(:class:`.FileItem`) -> str, optional
+    :param runtimeStoreFilePath: Fully qualified file path of a runtime store. If provided, files are ordered by past processing time\
+        rather than file size, defaults to None
+    :type runtimeStoreFilePath: str, optional
+    :param resetQueue: Flag indicating whether any items in the queue are removed first, defaults to True
+    :type resetQueue: bool, optional
+
+    :return: 
+        Result class instance.
+
+        - Seed status (bool) returned in result.status. False if an exception occured, otherwise True.
+        - Result.message property contains the number of items added to the queue.
+        
+        On exception:
+        
+        - .status (bool) will be False.
+        - .message will contain the exception message.
+
+    :rtype: :class:`.Result`
+    '''
+
+    returnvalue = res.Result()
+    try:
+        # get revit files in input dir
+        revitfiles = fileGetter(directoryPath, fileExtension)
+        # workload of a file is either its file size or its estimated processing time
+        getWorkloadSize = getFileSize
+        if(runtimeStoreFilePath != None):
+            costModel = wcm.GetRuntimeCostModel(runtimeStoreFilePath, revitfiles)
+            getWorkloadSize = costModel.GetWorkloadSize
+        # biggest workload first
+        revitfiles = wl.Sort([[f, getWorkloadSize(f)] for f in revitfiles])
+        queue = wq.WorkQueue(queueDirectory)
+        if(resetQueue):
+            queue.Reset()
+        added = queue.Seed([fileDataProcessor(f[0]) for f in revitfiles])
+        returnvalue.UpdateSep(True, 'Added ' + str(added) + ' file(s) to work queue: ' + queueDirectory)
+    except Exception as e:
+        returnvalue.UpdateSep(False, 'Failed to seed work queue! '  + str(e))
+    return returnvalue
@@ -30,7 +30,7 @@ A class to store file select UI settings.
 # An item to represent a file name in a row in a grid.
 class FileSelectionSettings:
     
-    def __init__(self, inputDirectory, includeSubDirsInSearch, outputDirectory, outputfileNumber, revitFileExtension):
+    def __init__(self, inputDirectory, includeSubDirsInSearch, outputDirectory, outputfileNumber, revitFileExtension, runtimeStoreFilePath = None, catalogFilePath = None):
         '''
         Class constructor
 
@@ -44,10 +44,16 @@ class FileSelectionSettings:
         :type outputfileNumber: int
         :param revitFileExtension: A file extension filter applied to directory search.
         :type revitFileExtension: str
+        :param runtimeStoreFilePath: A fully qualified file path of a runtime store. If provided files are distributed by past processing time, defaults to None
+        :type runtimeStoreFilePath: str, optional
+        :param catalogFilePath: A fully qualified file path of a file catalog. If provided files are read from the catalog rather than the directory, defaults to None
+        :type catalogFilePath: str, optional
         '''
 
         self.inputDir = inputDirectory
         self.inclSubDirs = includeSubDirsInSearch
         self.outputDir = outputDirectory
         self.outputFileNum = outputfileNumber
-        self.revitFileExtension = revitFileExtension
\ No newline at end of file
+        self.revitFileExtension = revitFileExtension
+        self.runtimeStoreFilePath = runtimeStoreFilePath
+        self.catalogFilePath = catalogFilePath
\ No newline at end of file
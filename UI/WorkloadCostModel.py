@@ -0,0 +1,189 @@
+'''
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Cost models estimating the workload of a file, used to fill workload buckets evenly.
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+A cost model provides a GetWorkloadSize(item) method which can be passed into :func:`Workloader.DistributeWorkload`.
+
+- :class:`.SizeCostModel` uses the file size (same as :func:`FileList.getFileSize`)
+- :class:`.RuntimeCostModel` uses past processing times of a file, read from a runtime store\
+    (refer to :mod:`BatchProcessorRuntimeStore`). Files without any past processing time are estimated from their file size,\
+    using a linear regression of processing time over file size of all files which do have past processing times.
+'''
+#
+#License:
+#
+#
+# Revit Batch Processor Sample Code
+#
+# Copyright (c) 2022  Jan Christel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+
+from Library import Utility as util
+from Library import BatchProcessorRuntimeStore as rs
+
+#: Use the median past processing time of a file
+PERCENTILE_P50 = 1
+#: Use the 95th percentile past processing time of a file
+PERCENTILE_P95 = 2
+#: Smallest workload (in seconds) estimated from file size
+MIN_ESTIMATED_SECONDS = 1.0
+
+class SizeCostModel:
+    def __init__(self):
+        '''
+        Class constructor.
+
+        Workload of a file is its file size.
+        '''
+
+        pass
+
+    def GetWorkloadSize(self, item):
+        '''
+        Returns the workload of a file: its file size.
+
+        :param item: A file item object instance.
+        :type item: :class:`.FileItem`
+
+        :return: The file size.
+        :rtype: int
+        '''
+
+        return item.size
+
+class RuntimeCostModel:
+    def __init__(self, runtimes, items, percentile = PERCENTILE_P50):
+        '''
+        Class constructor.
+
+        Workload of a file is its past processing time in seconds. Files without past processing time are estimated\
+            from file size. If none of the items has a past processing time the workload of all files is their file size.
+
+        :param runtimes: List of past processing times.
+        :type runtimes: [:class:`BatchProcessorRuntimeStore.FileRuntime`]
+        :param items: The file items to be distributed. Their file sizes are used to fit the file size regression.
+        :type items: [:class:`.FileItem`]
+        :param percentile: Which past processing time to use, PERCENTILE_P50 or PERCENTILE_P95, defaults to PERCENTILE_P50
+        :type percentile: int, optional
+        '''
+
+        self.percentile = percentile
+        # normalised file path: [number of runtimes, p50, p95, most recent]
+        self.statistics = rs.GetRuntimeStatistics(runtimes)
+        # BIM 360 files are logged by model id, refer to GetRuntimeStatistic()
+        self.statisticsByGuid = {}
+        for key in self.statistics:
+            if(': ' in key):
+                self.statisticsByGuid[key.split(': ')[-1]] = self.statistics[key]
+        # regression: seconds = intercept + slope * file size
+        self.intercept = None
+        self.slope = None
+        self._FitSizeRegression(items)
+
+    def GetRuntimeStatistic(self, item):
+        '''
+        Returns the past processing time statistic of a file.
+
+        :param item: A file item object instance.
+        :type item: :class:`.FileItem`
+
+        :return: List in format [number of runtimes, p50 seconds, p95 seconds, most recent seconds], or None if there is no past processing time.
+        :rtype: [int, float, float, int]
+        '''
+
+        key = util.NormaliseFilePath(item.name)
+        if(key in self.statistics):
+            return self.statistics[key]
+        if(item.BIM360FileGUID != None and item.BIM360FileGUID.lower() in self.statisticsByGuid):
+            return self.statisticsByGuid[item.BIM360FileGUID.lower()]
+        return None
+
+    def HasRuntimes(self):
+        '''
+        Checks whether workloads are estimated in seconds, i.e. at least one of the items had a past processing time.
+
+        :return: True if workloads are in seconds, False if workloads are file sizes.
+        :rtype: bool
+        '''
+
+        return self.slope is not None
+
+    def GetWorkloadSize(self, item):
+        '''
+        Returns the estimated workload of a file.
+
+        :param item: A file item object instance.
+        :type item: :class:`.FileItem`
+
+        :return: The estimated processing time in seconds, or the file size if no item had a past processing time.
+        :rtype: float
+        '''
+
+        if(not self.HasRuntimes()):
+            return item.size
+        statistic = self.GetRuntimeStatistic(item)
+        if(statistic is not None):
+            return statistic[self.percentile]
+        return max(MIN_ESTIMATED_SECONDS, self.intercept + self.slope * item.size)
+
+    def _FitSizeRegression(self, items):
+        sizes = []
+        seconds = []
+        for item in items:
+            statistic = self.GetRuntimeStatistic(item)
+            if(statistic is not None):
+                sizes.append(float(item.size))
+                seconds.append(float(statistic[self.percentile]))
+        if(len(sizes) == 0):
+            return
+        meanSize = sum(sizes) / len(sizes)
+        meanSeconds = sum(seconds) / len(seconds)
+        covariance = sum([(sizes[i] - meanSize) * (seconds[i] - meanSeconds) for i in range(len(sizes))])
+        variance = sum([(size - meanSize) ** 2 for size in sizes])
+        if(variance > 0 and covariance > 0):
+            self.slope = covariance / variance
+            self.intercept = meanSeconds - self.slope * meanSize
+        elif(meanSize > 0):
+            # not enough data for a regression: processing time proportional to file size
+            self.slope = meanSeconds / meanSize
+            self.intercept = 0.0
+        else:
+            self.slope = 0.0
+            self.intercept = meanSeconds
+
+def GetRuntimeCostModel(runtimeStoreFilePath, items, percentile = PERCENTILE_P50):
+    '''
+    Returns a cost model based on past processing times read from a runtime store file.
+
+    :param runtimeStoreFilePath: The fully qualified file path of the runtime store.
+    :type runtimeStoreFilePath: str
+    :param items: The file items to be distributed.
+    :type items: [:class:`.FileItem`]
+    :param percentile: Which past processing time to use, PERCENTILE_P50 or PERCENTILE_P95, defaults to PERCENTILE_P50
+    :type percentile: int, optional
+
+    :return: A runtime cost model. If the runtime store can not be read, the model will use file sizes.
+    :rtype: :class:`.RuntimeCostModel`
+    '''
+
+    runtimes = []
+    try:
+        runtimes = rs.ReadRuntimes(runtimeStoreFilePath)
+    except Exception as e:
+        print ('Failed to read runtime store: ' + str(runtimeStoreFilePath) + ' ' + str(e))
+    return RuntimeCostModel(runtimes, items, percentile)
@@ -30,52 +30,266 @@ The below function attempt to fill these buckets evenly measured on file size.
 #
 #
 
+import heapq
+import bisect
+
 import WorkloadBucket as wb
 
-def DistributeWorkload (numerOfBuckets, items, getWorkloadSize):
+#: Maximum number of swaps made by :func:`RefineWorkload`
+DEFAULT_MAX_REFINE_ITERATIONS = 1000
+
+def DistributeWorkload (numerOfBuckets, items, getWorkloadSize, refine = False, getClusterId = None):
     '''
     Distributes a given number of items evenly by workload size into workload buckets.
 
+    Items are added biggest first, each to the bucket with the smallest workload at that point (longest processing time first).\
+        If more than one bucket has the smallest workload the first one is used.
+
     :param numerOfBuckets: The nubmer of buckets items are to be distributed to
     :type numerOfBuckets: int
     :param items: A list of items.
     :type items: [foo]
     :param getWorkloadSize: A function returning the workload size from an item.
     :type getWorkloadSize: func(foo) -> int
-    
+    :param refine: Flag indicating whether items are swapped between the heaviest and lightest bucket afterwards\
+        to even out workloads further (refer to :func:`RefineWorkload`), defaults to False
+    :type refine: bool, optional
+    :param getClusterId: A function returning a cluster id from an item, or None if the item is not part of a cluster. Items of the same cluster\
+        are kept in the same bucket (refer to :mod:`UtilLinkAffinity`), defaults to None (no clusters)
+    :type getClusterId: func(foo) -> var, optional
+
+    :raises ValueError: If the number of buckets is smaller than 1.
+
     :return: A list of workload bucket objects containing items.
     :rtype: list[ :class:`.WorkloadBucket`]
     '''
-    
+
+    if(numerOfBuckets < 1):
+        raise ValueError('Number of workload buckets needs to be at least 1 but is: ' + str(numerOfBuckets))
+    if(getClusterId is not None):
+        return DistributeClusters(numerOfBuckets, items, getWorkloadSize, getClusterId, refine)
+    # ini bucket list
     workloadBuckets = []
-    try:
-        # ini bucket list
-        for x in range(numerOfBuckets):
-            workloadBuckets.append(wb.WorkloadBucket())
-        itemToWorkLoadValues = []
-        
-        # build key value list of items and their workload value
-        for item in items:
-            itemToWorkLoadValues.append([item, getWorkloadSize(item)])
-        
-        # sort list by workload size in descending order (biggest item first)
-        itemToWorkLoadValues = Sort(itemToWorkLoadValues)
-        
-        # load up with buckets
-        for bucket in itemToWorkLoadValues:
-            # find bucket with smallest work load value
-            lowBucket = min(workloadBuckets, key=lambda wbucket: wbucket.workLoadValue)
-            # add new item to bucket list
-            lowBucket.AddItem(bucket[0])
-            # increase workbucket size by size of item added
-            lowBucket.SetWorkLoadValue(lowBucket.workLoadValue + bucket[1])
-
-    except Exception as e:
-        print(e)
-        pass
+    for x in range(numerOfBuckets):
+        workloadBuckets.append(wb.WorkloadBucket())
+    itemToWorkLoadValues = []
+
+    # build key value list of items and their workload value
+    for item in items:
+        itemToWorkLoadValues.append([item, getWorkloadSize(item)])
+
+    # sort list by workload size in descending order (biggest item first)
+    itemToWorkLoadValues = Sort(itemToWorkLoadValues)
+
+    # heap of workload value and bucket index: the bucket with the smallest workload value is always at the top,\
+    # on a tie the one with the lower index
+    bucketHeap = [(0, x) for x in range(numerOfBuckets)]
+    for itemToWorkLoadValue in itemToWorkLoadValues:
+        index = bucketHeap[0][1]
+        lowBucket = workloadBuckets[index]
+        # add new item to bucket list
+        lowBucket.AddItem(itemToWorkLoadValue[0])
+        # increase workbucket size by size of item added
+        lowBucket.SetWorkLoadValue(lowBucket.workLoadValue + itemToWorkLoadValue[1])
+        heapq.heapreplace(bucketHeap, (lowBucket.workLoadValue, index))
+
+    if(refine):
+        RefineWorkload(workloadBuckets, getWorkloadSize)
     # send loaded buckets back
     return workloadBuckets
 
+def DistributeClusters(numerOfBuckets, items, getWorkloadSize, getClusterId, refine = False):
+    '''
+    Distributes items into workload buckets keeping items of the same cluster in the same bucket.
+
+    Each cluster (and each item not in a cluster) is distributed as a single item with the combined workload of its items,\
+        refer to :func:`DistributeWorkload`.
+
+    :param numerOfBuckets: The nubmer of buckets items are to be distributed to
+    :type numerOfBuckets: int
+    :param items: A list of items.
+    :type items: [foo]
+    :param getWorkloadSize: A function returning the workload size from an item.
+    :type getWorkloadSize: func(foo) -> int
+    :param getClusterId: A function returning a cluster id from an item, or None if the item is not part of a cluster.
+    :type getClusterId: func(foo) -> var
+    :param refine: Flag indicating whether clusters are swapped between the heaviest and lightest bucket afterwards, defaults to False
+    :type refine: bool, optional
+
+    :return: A list of workload bucket objects containing items. Items of a cluster are next to each other.
+    :rtype: list[ :class:`.WorkloadBucket`]
+    '''
+
+    # clusters in order of their first item: [items, workload]
+    clusters = []
+    clusterIndexes = {}
+    for item in items:
+        clusterId = getClusterId(item)
+        if(clusterId is None or clusterId not in clusterIndexes):
+            if(clusterId is not None):
+                clusterIndexes[clusterId] = len(clusters)
+            clusters.append([[item], getWorkloadSize(item)])
+        else:
+            cluster = clusters[clusterIndexes[clusterId]]
+            cluster[0].append(item)
+            cluster[1] += getWorkloadSize(item)
+    clusterBuckets = DistributeWorkload(numerOfBuckets, clusters, lambda cluster: cluster[1], refine)
+    # replace clusters by their items
+    workloadBuckets = []
+    for clusterBucket in clusterBuckets:
+        bucket = wb.WorkloadBucket()
+        for cluster in clusterBucket.items:
+            for item in cluster[0]:
+                bucket.AddItem(item)
+        bucket.SetWorkLoadValue(clusterBucket.workLoadValue)
+        workloadBuckets.append(bucket)
+    return workloadBuckets
+
+def RefineWorkload(workloadBuckets, getWorkloadSize, maxIterations = DEFAULT_MAX_REFINE_ITERATIONS):
+    '''
+    Swaps items between the heaviest and the lightest workload bucket to reduce the difference in workload between them.
+
+    Each swap picks the pair of items which gets both buckets closest to the same workload. Stops once no swap\
+        reduces the difference, or after the maximum number of swaps.
+
+    :param workloadBuckets: List of workload buckets. Buckets are changed in place.
+    :type workloadBuckets: list[ :class:`.WorkloadBucket`]
+    :param getWorkloadSize: A function returning the workload size from an item.
+    :type getWorkloadSize: func(foo) -> int
+    :param maxIterations: The maximum number of swaps, defaults to DEFAULT_MAX_REFINE_ITERATIONS
+    :type maxIterations: int, optional
+
+    :return: The number of swaps made.
+    :rtype: int
+    '''
+
+    if(len(workloadBuckets) < 2):
+        return 0
+    # workload size of each item, per bucket
+    sizes = []
+    for bucket in workloadBuckets:
+        sizes.append([getWorkloadSize(item) for item in bucket.items])
+    swaps = 0
+    while(swaps < maxIterations):
+        heavyIndex = max(range(len(workloadBuckets)), key = lambda x: workloadBuckets[x].workLoadValue)
+        lightIndex = min(range(len(workloadBuckets)), key = lambda x: workloadBuckets[x].workLoadValue)
+        heavy = workloadBuckets[heavyIndex]
+        light = workloadBuckets[lightIndex]
+        difference = heavy.workLoadValue - light.workLoadValue
+        swap = GetBestSwap(sizes[heavyIndex], sizes[lightIndex], difference)
+        if(swap is None):
+            break
+        heavyItem, lightItem = swap
+        delta = sizes[heavyIndex][heavyItem] - sizes[lightIndex][lightItem]
+        heavy.items[heavyItem], light.items[lightItem] = light.items[lightItem], heavy.items[heavyItem]
+        sizes[heavyIndex][heavyItem], sizes[lightIndex][lightItem] = sizes[lightIndex][lightItem], sizes[heavyIndex][heavyItem]
+        heavy.SetWorkLoadValue(heavy.workLoadValue - delta)
+        light.SetWorkLoadValue(light.workLoadValue + delta)
+        swaps += 1
+    return swaps
+
+def GetBestSwap(heavySizes, lightSizes, difference):
+    '''
+    Finds the pair of items to swap between two buckets which gets the buckets closest to the same workload.
+
+    :param heavySizes: The workload sizes of the items in the heavier bucket.
+    :type heavySizes: [int]
+    :param lightSizes: The workload sizes of the items in the lighter bucket.
+    :type lightSizes: [int]
+    :param difference: The difference in workload between the two buckets.
+    :type difference: int
+
+    :return: The index of the item in the heavier bucket and the index of the item in the lighter bucket, or None\
+        if no swap reduces the difference.
+    :rtype: (int, int)
+    '''
+
+    if(len(lightSizes) == 0):
+        return None
+    # swapping items which differ by half the bucket difference evens out both buckets
+    target = difference / 2.0
+    lightSorted = sorted([(size, x) for x, size in enumerate(lightSizes)])
+    lightValues = [size for size, x in lightSorted]
+    bestSwap = None
+    bestDistance = None
+    for heavyItem, heavySize in enumerate(heavySizes):
+        # light item size closest to heavy item size minus target
+        position = bisect.bisect_left(lightValues, heavySize - target)
+        for candidate in (position - 1, position):
+            if(candidate < 0 or candidate >= len(lightValues)):
+                continue
+            delta = heavySize - lightValues[candidate]
+            # only swaps moving less than the difference reduce the heavier bucket without making the lighter one heavier
+            if(delta <= 0 or delta >= difference):
+                continue
+            distance = abs(delta - target)
+            if(bestDistance is None or distance < bestDistance):
+                bestDistance = distance
+                bestSwap = (heavyItem, lightSorted[candidate][1])
+    return bestSwap
+
+def GetMakespan(workloadBuckets):
+    '''
+    Returns the largest workload value of all buckets, i.e. the workload of the session finishing last.
+
+    :param workloadBuckets: List of workload buckets.
+    :type workloadBuckets: list[ :class:`.WorkloadBucket`]
+
+    :return: The largest workload value, or 0 if there are no buckets.
+    :rtype: int
+    '''
+
+    if(len(workloadBuckets) == 0):
+        return 0
+    return max([bucket.workLoadValue for bucket in workloadBuckets])
+
+def GetImbalanceRatio(workloadBuckets):
+    '''
+    Returns the ratio of the largest workload value to the average workload value of all buckets.
+
+    1.0 means all buckets have the same workload.
+
+    :param workloadBuckets: List of workload buckets.
+    :type workloadBuckets: list[ :class:`.WorkloadBucket`]
+
+    :return: The imbalance ratio, or 1.0 if there are no buckets or no workload.
+    :rtype: float
+    '''
+
+    total = sum([bucket.workLoadValue for bucket in workloadBuckets])
+    if(len(workloadBuckets) == 0 or total == 0):
+        return 1.0
+    return GetMakespan(workloadBuckets) / (float(total) / len(workloadBuckets))
+
+def AllocateBuckets(numberOfBuckets, groupWorkloads):
+    '''
+    Splits a number of buckets between groups of items, proportional to the total workload of each group.
+
+    Every group gets at least one bucket, therefore more buckets than requested are allocated if there are more groups than buckets.
+
+    :param numberOfBuckets: The number of buckets to split.
+    :type numberOfBuckets: int
+    :param groupWorkloads: The total workload of each group.
+    :type groupWorkloads: [int]
+
+    :return: The number of buckets of each group, in order of groupWorkloads.
+    :rtype: [int]
+    '''
+
+    counts = [1] * len(groupWorkloads)
+    total = float(sum(groupWorkloads))
+    remaining = numberOfBuckets - len(groupWorkloads)
+    if(remaining <= 0 or total <= 0):
+        return counts
+    # largest remainder method: whole shares first, then the groups with the largest remainders
+    shares = [remaining * workload / total for workload in groupWorkloads]
+    for i in range(len(shares)):
+        counts[i] += int(shares[i])
+    byRemainder = sorted(range(len(shares)), key = lambda i: shares[i] - int(shares[i]), reverse = True)
+    for i in byRemainder[:numberOfBuckets - sum(counts)]:
+        counts[i] += 1
+    return counts
+
 def Sort(sub_li): 
     '''
     Python code to sort the tuples using second element of sublist. Inplace way to sort using sort().
@@ -41,6 +41,8 @@ import UIFileSelect as UIFs
 import FileSelectSettings as set
 # import workloader utils
 import Workloader as wl
+# import workload cost models
+import WorkloadCostModel as wcm
 #import WorkloadBucket as wlb
 
 # import bim360 utils from Library
@@ -71,8 +73,13 @@ def main(argv):
             ui = UIFs.MyWindow(xamlFullFileName_, revitfiles, settings)
             uiResult = ui.ShowDialog()
             if(uiResult):
+                # workload of a file is either its file size or its estimated processing time
+                getWorkloadSize = fl.getFileSize
+                if(settings.runtimeStoreFilePath != None):
+                    costModel = wcm.GetRuntimeCostModel(settings.runtimeStoreFilePath, ui.selectedFiles)
+                    getWorkloadSize = costModel.GetWorkloadSize
                 # build bucket list
-                buckets = wl.DistributeWorkload(settings.outputFileNum, ui.selectedFiles, fl.getFileSize)
+                buckets = wl.DistributeWorkload(settings.outputFileNum, ui.selectedFiles, getWorkloadSize)
                 # write out file lists
                 counter = 0
                 for bucket in buckets:
@@ -112,14 +119,16 @@ def processArgs(argv):
     outputfileNumber = 1
     revitFileExtension = '.rvt'
     includeSubDirsInSearch = False
+    runtimeStoreFilePath = None
+    catalogFilePath = None
     gotArgs = False
     try:
-        opts, args = getopt.getopt(argv,"hsi:o:n:e:",["subDir","input=","outputDir=",'numberFiles=','filextension='])
+        opts, args = getopt.getopt(argv,"hsi:o:n:e:r:c:",["subDir","input=","outputDir=",'numberFiles=','filextension=','runtimeStore=','catalog='])
     except getopt.GetoptError:
-        print ('test.py -s -i <input> -o <outputDirectory> -n <numberOfOutputFiles> -e <fileExtension>')
+        print ('test.py -s -i <input> -o <outputDirectory> -n <numberOfOutputFiles> -e <fileExtension> -r <runtimeStoreFile> -c <catalogFile>')
     for opt, arg in opts:
         if opt == '-h':
-            print ('test.py -i <input> -o <outputDirectory> -n <numberOfOutputFiles> -e <fileExtension>')
+            print ('test.py -i <input> -o <outputDirectory> -n <numberOfOutputFiles> -e <fileExtension> -r <runtimeStoreFile> -c <catalogFile>')
         elif opt in ("-s", "--subDir"):
             includeSubDirsInSearch = True
         elif opt in ("-i", "--input"):
@@ -139,6 +148,10 @@ def processArgs(argv):
         elif opt in ("-e", "--fileExtension"):
             revitFileExtension = arg
             gotArgs = True
+        elif opt in ("-r", "--runtimeStore"):
+            runtimeStoreFilePath = arg
+        elif opt in ("-c", "--catalog"):
+            catalogFilePath = arg
 
     # check if input values are valid
     if (outputfileNumber < 0 or outputfileNumber > 100):
@@ -153,8 +166,14 @@ def processArgs(argv):
     if(revitFileExtension != '.rvt' and revitFileExtension != '.rfa'):
         gotArgs = False
         print ('Invalid file extension: [' + str(revitFileExtension) + '] expecting: .rvt or .rfa')
+    if(runtimeStoreFilePath != None and not FileExist(runtimeStoreFilePath)):
+        gotArgs = False
+        print ('Invalid runtime store file path: ' + str(runtimeStoreFilePath))
+    if(catalogFilePath != None and not FileExist(GetFolderPathFromFile(os.path.abspath(catalogFilePath)))):
+        gotArgs = False
+        print ('Invalid catalog file path: ' + str(catalogFilePath))
 
-    return gotArgs, set.FileSelectionSettings(inputDirFile, includeSubDirsInSearch, outputDirectory, outputfileNumber, revitFileExtension)
+    return gotArgs, set.FileSelectionSettings(inputDirFile, includeSubDirsInSearch, outputDirectory, outputfileNumber, revitFileExtension, runtimeStoreFilePath, catalogFilePath)
 
 def GetFolderPathFromFile(filePath):
     '''
@@ -220,7 +239,11 @@ def GetFileData(settings):
         elif(os.path.isdir(settings.inputDir)):
             # check a to serch for files is to include sub dirs
             revitfilesUnfiltered = []
-            if(settings.inclSubDirs):
+            if(settings.catalogFilePath != None):
+                # get revit files from catalog, rescanning only directories which changed since the last run
+                getRevitFilesFromCatalog = fl.GetCatalogFileGetter(settings.catalogFilePath, settings.inclSubDirs)
+                revitfilesUnfiltered = getRevitFilesFromCatalog(settings.inputDir, settings.revitFileExtension)
+            elif(settings.inclSubDirs):
                 # get revit files in input dir and subdirs
                 revitfilesUnfiltered = fl.getRevitFilesInclSubDirs(settings.inputDir, settings.revitFileExtension)
             else:
@@ -230,7 +253,7 @@ def GetFileData(settings):
             # The specified path, file name, or both are too long. The fully qualified file name must be less than 260 characters, and the directory name must be less than 248 characters.
             for revitFile in revitfilesUnfiltered:
                 # remove any back up files from selection
-                if(fl.isBackupFile(os.path.basename(revitFile.name)) == False):
+                if(fl.isBackUpFile(os.path.basename(revitFile.name)) == False):
                     if(len(os.path.dirname(os.path.abspath(revitFile.name))) < 248  and len(revitFile.name) < 260 ):
                         revitfiles.append(revitFile)
                     else:
@@ -0,0 +1,83 @@
+'''
+Benchmark of the exception checks of BatchProcessorLogExceptions: log rows checked in chunks (as the log file parser\
+    does, refer to BatchProcessorLogUtils.EXCEPTION_CHECK_ROWS) against every row checked one by one.
+
+Run from the repository root:
+
+    python tests/benchmark_BatchProcessorLogExceptions.py [number of rows]
+
+Both checks have to find the same failures, the script stops with an assertion error otherwise.
+'''
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Library'))
+
+import BatchProcessorLogExceptions as logExceptions
+
+#: Number of rows checked, if not given on the command line
+DEFAULT_NUMBER_OF_ROWS = 200000
+#: Number of rows checked in one go (same as BatchProcessorLogUtils.EXCEPTION_CHECK_ROWS)
+CHUNK_ROWS = 256
+#: Exception messages (same as BatchProcessorLogUtils.EXCEPTION_MESSAGES)
+EXCEPTION_MESSAGES = [
+    'ERROR: An error occurred while executing the task script! Operation',
+    'WARNING: Timed-out',
+    'Exception: [Exception]',
+    '\t- \tMessage: An unrecoverable error has occurred.  The program will now be terminated.',
+    'Script Exception:'
+]
+
+def GetCrashHeavyRows(numberOfRows, rand):
+    # mostly stack trace rows, an exception message every few thousand rows
+    rows = []
+    for i in range(numberOfRows):
+        if(rand.random() < 0.0005):
+            rows.append('\t- ' + rand.choice(EXCEPTION_MESSAGES) + ' at row ' + str(i))
+        else:
+            rows.append('\t- \t   at Autodesk.Revit.DB.Document.Regenerate() in C:\\build\\Revit\\Source\\Module' + str(i % 97) + '.cs:line ' + str(i))
+    return rows
+
+def CheckRowByRow(matcher, rows):
+    failures = []
+    for row in rows:
+        failure = matcher.Match(row)
+        if(failure is not None):
+            failures.append(failure)
+    return failures
+
+def CheckChunks(matcher, rows):
+    failures = []
+    for start in range(0, len(rows), CHUNK_ROWS):
+        failures.extend(matcher.MatchAll(rows[start:start + CHUNK_ROWS]))
+    return failures
+
+def GetBestTime(check, matcher, rows, repeat = 3):
+    best = None
+    failures = None
+    for i in range(repeat):
+        start = time.time()
+        failures = check(matcher, rows)
+        duration = time.time() - start
+        if(best is None or duration < best):
+            best = duration
+    return best, failures
+
+def RunBenchmark(numberOfRows):
+    rows = GetCrashHeavyRows(numberOfRows, random.Random(4))
+    matcher = logExceptions.GetExceptionMatcher(EXCEPTION_MESSAGES)
+    rowByRowTime, rowByRowFailures = GetBestTime(CheckRowByRow, matcher, rows)
+    chunkTime, chunkFailures = GetBestTime(CheckChunks, matcher, rows)
+    assert [(f.message, f.category, f.severity) for f in rowByRowFailures] == [(f.message, f.category, f.severity) for f in chunkFailures]
+    print ('rows: ' + str(numberOfRows) + ' failures: ' + str(len(chunkFailures)))
+    print ('row by row: ' + str(round(rowByRowTime, 3)) + 's')
+    print ('chunks of ' + str(CHUNK_ROWS) + ' rows: ' + str(round(chunkTime, 3)) + 's')
+
+if __name__ == '__main__':
+    numberOfRows = DEFAULT_NUMBER_OF_ROWS
+    if(len(sys.argv) > 1):
+        numberOfRows = int(sys.argv[1])
+    RunBenchmark(numberOfRows)
@@ -0,0 +1,178 @@
+'''
+Benchmark of Utility.CombineFiles and Utility.AppendToSingleFiles: files streamed in blocks (refer to Utility.COPY_BUFFER_SIZE)\
+    against every file read into memory first, as both functions did before.
+
+Run from the repository root:
+
+    python tests/benchmark_CombineFiles.py [number of shards] [shard size in MB]
+
+Shards are written to a temporary directory which is deleted afterwards. Combined files have to be byte identical\
+    (compressed files once decompressed), the script stops with an assertion error otherwise.
+'''
+
+import os
+import sys
+import gzip
+import time
+import types
+import codecs
+import random
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Library'))
+
+try:
+    import clr
+except ImportError:
+    # outside of IronPython: provide the .NET members used when the modules get imported
+    class Path(object):
+        @staticmethod
+        def GetFileNameWithoutExtension(filePath):
+            return os.path.splitext(filePath.replace('\\', '/').split('/')[-1])[0]
+    clr = types.ModuleType('clr')
+    clr.AddReference = lambda *args: None
+    clr.ImportExtensions = lambda *args: None
+    systemModule = types.ModuleType('System')
+    systemIOModule = types.ModuleType('System.IO')
+    systemIOModule.Path = Path
+    # only used where os.replace is not available
+    systemIOModule.File = None
+    systemModule.IO = systemIOModule
+    sys.modules['clr'] = clr
+    sys.modules['System'] = systemModule
+    sys.modules['System.IO'] = systemIOModule
+
+import Utility as util
+
+#: Number of shards combined, if not given on the command line
+DEFAULT_NUMBER_OF_SHARDS = 300
+#: Size of each shard in MB, if not given on the command line
+DEFAULT_SHARD_SIZE_MB = 2
+#: Header row of each shard
+HEADER = 'HOSTFILE\tID\tName\tCategory\tLevel\n'
+
+def CombineFilesReference(folderPath, filePrefix = '', fileSuffix = '', fileExtension='.txt', outPutFileName = 'result.txt', fileGetter = util.GetFilesSingleFolder):
+    # CombineFiles as it was before files were streamed: each file is read into memory
+    file_list = fileGetter (folderPath, filePrefix, fileSuffix, fileExtension)
+    with open(folderPath + '\\' + outPutFileName, 'w' ) as result:
+        fileCounter = 0
+        for file_ in file_list:
+            lineCounter = 0
+            fp = open( file_, 'r' )
+            lines = fp.readlines()
+            fp.close()
+            for line in lines:
+                # ensure header from first file is copied over
+                if(fileCounter == 0 and lineCounter == 0 or lineCounter != 0):
+                    result.write( line )
+                lineCounter += 1
+            fileCounter += 1
+
+def CombineFilesCompressedReference(folderPath, fileExtension, outPutFileName, fileGetter):
+    # before CombineFiles could compress, the combined file had to be compressed in a second step
+    CombineFilesReference(folderPath, fileExtension = fileExtension, outPutFileName = outPutFileName + '.tmp', fileGetter = fileGetter)
+    with open(folderPath + '\\' + outPutFileName + '.tmp', 'rb') as fp:
+        with gzip.open(folderPath + '\\' + outPutFileName, 'wb') as result:
+            shutil.copyfileobj(fp, result)
+    os.remove(folderPath + '\\' + outPutFileName + '.tmp')
+
+def AppendToSingleFilesReference(sourceFile, appendFile):
+    # AppendToSingleFiles as it was before files were streamed: the file to append is read into memory
+    flag = True
+    try:
+        fp = codecs.open(appendFile,'r',encoding='utf-8')
+        lines=fp.readlines()
+        fp.close()
+        with codecs.open(sourceFile, 'a', encoding='utf-8') as f:
+            for line in lines:
+                f.write( line )
+    except Exception:
+        flag = False
+    return flag
+
+def WriteShards(directory, numberOfShards, shardSizeMB, rand):
+    '''
+    Writes tab separated report shards with a header row, including non ascii characters.
+
+    :return: List of fully qualified shard file paths, in order.
+    :rtype: [str]
+    '''
+
+    names = [u'Wall', u'Door', u'Fen\u00eatre', u'Stra\u00dfe', u'\u6a13\u5c64', u'Room']
+    shards = []
+    for shard in range(numberOfShards):
+        rows = []
+        size = 0
+        row = 0
+        while(size < shardSizeMB * 1024 * 1024):
+            line = u'P:\\Projects\\Model_' + str(shard) + u'.rvt\t' + str(row) + u'\t' + rand.choice(names) + u' ' + str(rand.randint(0, 99999)) +\
+                u'\tWalls\tLevel ' + str(row % 12) + u'\n'
+            rows.append(line)
+            size += len(line)
+            row += 1
+        filePath = os.path.join(directory, 'shard_' + str(shard).zfill(4) + '.txt')
+        with codecs.open(filePath, 'w', encoding='utf-8') as f:
+            f.write(HEADER)
+            f.write(u''.join(rows))
+        shards.append(filePath)
+    return shards
+
+def ReadBytes(filePath, compressed = False):
+    if(compressed):
+        with gzip.open(filePath, 'rb') as f:
+            return f.read()
+    with open(filePath, 'rb') as f:
+        return f.read()
+
+def GetTime(function, *args, **kwargs):
+    start = time.time()
+    function(*args, **kwargs)
+    return time.time() - start
+
+def RunBenchmark(numberOfShards, shardSizeMB):
+    directory = tempfile.mkdtemp()
+    try:
+        shards = WriteShards(directory, numberOfShards, shardSizeMB, random.Random(16))
+        fileGetter = lambda folderPath, filePrefix, fileSuffix, fileExtension: shards
+        print ('shards: ' + str(numberOfShards) + ' of ' + str(shardSizeMB) + ' MB')
+        # CombineFiles writes to folderPath + '\\' + outPutFileName
+        referenceTime = GetTime(CombineFilesReference, directory, outPutFileName = 'reference.txt', fileGetter = fileGetter)
+        streamTime = GetTime(util.CombineFiles, directory, outPutFileName = 'streamed.txt', fileGetter = fileGetter)
+        reference = ReadBytes(directory + '\\reference.txt')
+        assert reference == ReadBytes(directory + '\\streamed.txt')
+        print ('CombineFiles in memory: ' + str(round(referenceTime, 3)) + 's')
+        print ('CombineFiles streamed: ' + str(round(streamTime, 3)) + 's')
+        os.remove(directory + '\\streamed.txt')
+        referenceTime = GetTime(CombineFilesCompressedReference, directory, '.txt', 'reference.txt.gz', fileGetter)
+        streamTime = GetTime(util.CombineFiles, directory, outPutFileName = 'streamed.txt.gz', fileGetter = fileGetter, compress = True)
+        assert reference == ReadBytes(directory + '\\reference.txt.gz', True)
+        assert reference == ReadBytes(directory + '\\streamed.txt.gz', True)
+        print ('CombineFiles in memory, then compressed: ' + str(round(referenceTime, 3)) + 's')
+        print ('CombineFiles streamed, compress = True: ' + str(round(streamTime, 3)) + 's')
+        for fileName in ['reference.txt', 'reference.txt.gz', 'streamed.txt.gz']:
+            os.remove(directory + '\\' + fileName)
+        # append all shards, header rows included, to a single file
+        referenceTime = 0.0
+        streamTime = 0.0
+        for shard in shards:
+            referenceTime += GetTime(AppendToSingleFilesReference, os.path.join(directory, 'reference.txt'), shard)
+            streamTime += GetTime(util.AppendToSingleFiles, os.path.join(directory, 'streamed.txt'), shard)
+        assert ReadBytes(os.path.join(directory, 'reference.txt')) == ReadBytes(os.path.join(directory, 'streamed.txt'))
+        print ('AppendToSingleFiles in memory: ' + str(round(referenceTime, 3)) + 's')
+        print ('AppendToSingleFiles streamed: ' + str(round(streamTime, 3)) + 's')
+    finally:
+        shutil.rmtree(directory)
+        # on anything but Windows the combined files are written next to the shard directory
+        for fileName in ['reference.txt', 'reference.txt.gz', 'streamed.txt', 'streamed.txt.gz']:
+            if(os.path.exists(directory + '\\' + fileName)):
+                os.remove(directory + '\\' + fileName)
+
+if __name__ == '__main__':
+    numberOfShards = DEFAULT_NUMBER_OF_SHARDS
+    shardSizeMB = DEFAULT_SHARD_SIZE_MB
+    if(len(sys.argv) > 1):
+        numberOfShards = int(sys.argv[1])
+    if(len(sys.argv) > 2):
+        shardSizeMB = int(sys.argv[2])
+    RunBenchmark(numberOfShards, shardSizeMB)
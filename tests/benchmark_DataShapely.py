@@ -0,0 +1,92 @@
+'''
+Benchmark of DataShapely loop translation: all points of a loop translated in a single matrix multiplication\
+    (refer to DataShapely.GetLoopAsCoordinates) against a numpy dot product and a shapely point per vertex.
+
+Run from the repository root (requires numpy and shapely):
+
+    python tests/benchmark_DataShapely.py [number of vertices per loop] [number of loops]
+
+Both have to return the same coordinates, the script stops with an assertion error otherwise. Coordinates may differ in\
+    the last bit: numpy may sum the products of a matrix multiplication in a different order than those of a dot product.
+'''
+
+import os
+import sys
+import math
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Library'))
+
+import numpy as np
+import shapely.geometry as sg
+
+import DataGeometry as dg
+import DataShapely as ds
+
+#: Number of vertices per loop, if not given on the command line
+DEFAULT_NUMBER_OF_VERTICES = 100000
+#: Number of loops, if not given on the command line
+DEFAULT_NUMBER_OF_LOOPS = 3
+#: Difference allowed between coordinates, in units in the last place of the largest coordinate of the loop
+COORDINATE_TOLERANCE = 4
+
+def GetLoopAsShapeReference(loop, translationM):
+    # loop translation as it was before: a numpy dot product and a shapely point per vertex
+    singlePolygonLoop = []
+    for pdouble in loop:
+        # need to add 1 to list for matric multiplication
+        # number of columns in first matrix (translation) must match number of rows in second matrix (point)
+        translatedPoint = np.dot(translationM,[pdouble[0], pdouble[1], pdouble[2], 1.0])
+        p = sg.Point(translatedPoint[0],translatedPoint[1],translatedPoint[2])
+        singlePolygonLoop.append(p)
+    return singlePolygonLoop
+
+def GetGeometry(numberOfVertices, rand):
+    '''
+    Returns a polygon geometry object with a star shaped outer loop, rotated and translated like a model using shared coordinates.
+    '''
+
+    geoObject = dg.DataGeometry()
+    angle = rand.uniform(0, 2 * math.pi)
+    # rotation and translation are stored by columns
+    geoObject.rotationCoord = [[math.cos(angle), math.sin(angle), 0.0], [-math.sin(angle), math.cos(angle), 0.0], [0.0, 0.0, 1.0]]
+    geoObject.translationCoord = [rand.uniform(-1e5, 1e5), rand.uniform(-1e5, 1e5), rand.uniform(0, 100)]
+    for i in range(numberOfVertices):
+        vertexAngle = 2 * math.pi * i / numberOfVertices
+        radius = rand.uniform(50, 100)
+        geoObject.outerLoop.append([radius * math.cos(vertexAngle), radius * math.sin(vertexAngle), 12.5])
+    return geoObject
+
+def RunBenchmark(numberOfVertices, numberOfLoops):
+    rand = random.Random(22)
+    geoObjects = [GetGeometry(numberOfVertices, rand) for i in range(numberOfLoops)]
+    referenceTime = 0.0
+    matrixTime = 0.0
+    maxDifference = 0.0
+    for geoObject in geoObjects:
+        translationM = ds.GetTranslationMatrix(geoObject)
+        start = time.time()
+        referencePolygon = sg.Polygon(GetLoopAsShapeReference(geoObject.outerLoop, translationM))
+        referenceTime += time.time() - start
+        start = time.time()
+        polygon = sg.Polygon(ds.GetOuterLoopAsCoordinates(geoObject, translationM))
+        matrixTime += time.time() - start
+        referenceCoords = np.array(referencePolygon.exterior.coords)
+        coords = np.array(polygon.exterior.coords)
+        assert referenceCoords.shape == coords.shape
+        assert np.allclose(referenceCoords, coords, rtol = 0.0, atol = COORDINATE_TOLERANCE * np.spacing(np.abs(referenceCoords).max()))
+        maxDifference = max(maxDifference, np.abs(referenceCoords - coords).max())
+    print ('loops: ' + str(numberOfLoops) + ' of ' + str(numberOfVertices) + ' vertices')
+    print ('dot product and point per vertex: ' + str(round(referenceTime, 3)) + 's')
+    print ('single matrix multiplication: ' + str(round(matrixTime, 3)) + 's')
+    print ('largest coordinate difference: ' + str(maxDifference))
+
+if __name__ == '__main__':
+    numberOfVertices = DEFAULT_NUMBER_OF_VERTICES
+    numberOfLoops = DEFAULT_NUMBER_OF_LOOPS
+    if(len(sys.argv) > 1):
+        numberOfVertices = int(sys.argv[1])
+    if(len(sys.argv) > 2):
+        numberOfLoops = int(sys.argv[2])
+    RunBenchmark(numberOfVertices, numberOfLoops)
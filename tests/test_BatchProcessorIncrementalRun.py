@@ -0,0 +1,109 @@
+'''
+Tests of BatchProcessorIncrementalRun: files are compared with the results of previous sessions by modified time.
+'''
+
+import os
+import sys
+import types
+import shutil
+import datetime
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Library'))
+
+try:
+    import clr
+except ImportError:
+    # outside of IronPython: provide the .NET members used when the modules get imported
+    class Path(object):
+        @staticmethod
+        def GetFileNameWithoutExtension(filePath):
+            return os.path.splitext(filePath.replace('\\', '/').split('/')[-1])[0]
+    clr = types.ModuleType('clr')
+    clr.AddReference = lambda *args: None
+    clr.ImportExtensions = lambda *args: None
+    systemModule = types.ModuleType('System')
+    systemIOModule = types.ModuleType('System.IO')
+    systemIOModule.Path = Path
+    # only used where os.replace is not available
+    systemIOModule.File = None
+    systemModule.IO = systemIOModule
+    sys.modules['clr'] = clr
+    sys.modules['System'] = systemModule
+    sys.modules['System.IO'] = systemIOModule
+
+import UtilFileDiscovery as discovery
+import BatchProcessorRuntimeStore as rs
+import BatchProcessorIncrementalRun as incremental
+
+#: Start time of the previous session processing the files
+START_TIME = datetime.datetime(2022, 3, 1, 10, 0, 0)
+#: Total processing time of each file in the previous session
+TOTAL_TIME = 600
+
+class IncrementalRunTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def WriteFile(self, fileName, modified):
+        # writes a file and sets its modified time to a given utc time
+        filePath = os.path.join(self.directory, fileName)
+        with open(filePath, 'w') as f:
+            f.write(fileName)
+        epochSeconds = incremental.GetEpochSeconds(modified)
+        os.utime(filePath, (epochSeconds, epochSeconds))
+        return filePath
+
+    def GetFiles(self):
+        # not listed with DiscoverFiles: the .NET listing would pick up the fake System module
+        files = []
+        for name in sorted(os.listdir(self.directory)):
+            filePath = os.path.join(self.directory, name)
+            files.append(discovery.DiscoveredFile(self.directory, name, os.path.getsize(filePath), os.path.getmtime(filePath)))
+        return files
+
+    def test_saved_while_processed(self):
+        # a task script saving or synchronising the model changes its modified time while it is processed
+        filePath = self.WriteFile('saved.rvt', START_TIME + datetime.timedelta(seconds = TOTAL_TIME - 30))
+        runtimes = [rs.FileRuntime(filePath, START_TIME, TOTAL_TIME)]
+        filesToProcess, reasonCounts = incremental.GetFilesToProcess(self.GetFiles(), runtimes)
+        self.assertEqual(filesToProcess, [])
+        self.assertEqual(reasonCounts, {incremental.REASON_UNCHANGED: 1})
+
+    def test_reasons(self):
+        runtimes = []
+        for fileName, modified, status in [
+            ('unchanged.rvt', START_TIME - datetime.timedelta(days = 1), True),
+            ('modified.rvt', START_TIME + datetime.timedelta(hours = 2), True),
+            ('failed.rvt', START_TIME - datetime.timedelta(days = 1), False)
+        ]:
+            runtimes.append(rs.FileRuntime(self.WriteFile(fileName, modified), START_TIME, TOTAL_TIME, status = status))
+        self.WriteFile('new.rvt', START_TIME)
+        lastResults = incremental.GetLastResults(runtimes)
+        reasons = {}
+        for f in self.GetFiles():
+            reasons[f.name] = incremental.GetProcessReason(f.path, f.modified, lastResults)
+        self.assertEqual(reasons, {
+            'unchanged.rvt': incremental.REASON_UNCHANGED,
+            'modified.rvt': incremental.REASON_MODIFIED,
+            'failed.rvt': incremental.REASON_FAILED,
+            'new.rvt': incremental.REASON_NEW
+        })
+        # processed successfully longer ago than the full run interval
+        utcNow = START_TIME + datetime.timedelta(days = 8)
+        filePath = os.path.join(self.directory, 'unchanged.rvt')
+        self.assertEqual(incremental.GetProcessReason(filePath, os.path.getmtime(filePath), lastResults, 7, utcNow), incremental.REASON_EXPIRED)
+
+    def test_no_total_time(self):
+        # without a total processing time the start time is used as the end time
+        filePath = self.WriteFile('model.rvt', START_TIME + datetime.timedelta(seconds = incremental.MODIFIED_TIME_TOLERANCE + 1))
+        lastResults = incremental.GetLastResults([rs.FileRuntime(filePath, START_TIME, rs.NO_DURATION)])
+        self.assertEqual(lastResults[rs.util.NormaliseFilePath(filePath)].lastSuccessEndTime, START_TIME)
+        self.assertEqual(incremental.GetProcessReason(filePath, os.path.getmtime(filePath), lastResults), incremental.REASON_MODIFIED)
+
+if __name__ == '__main__':
+    unittest.main()
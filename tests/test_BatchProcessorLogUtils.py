@@ -0,0 +1,189 @@
+'''
+Tests of BatchProcessorLogUtils: the single pass log file parser has to return the same results as the multi pass\
+    functions (GetFilesProcessed and GetProcessStatus per file) it replaced.
+'''
+
+import os
+import sys
+import json
+import types
+import random
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Library'))
+
+try:
+    import clr
+except ImportError:
+    # outside of IronPython: provide the .NET members used when the modules get imported
+    class Path(object):
+        @staticmethod
+        def GetFileNameWithoutExtension(filePath):
+            return os.path.splitext(filePath.replace('\\', '/').split('/')[-1])[0]
+    clr = types.ModuleType('clr')
+    clr.AddReference = lambda *args: None
+    clr.ImportExtensions = lambda *args: None
+    systemModule = types.ModuleType('System')
+    systemIOModule = types.ModuleType('System.IO')
+    systemIOModule.Path = Path
+    # only used where os.replace is not available
+    systemIOModule.File = None
+    systemModule.IO = systemIOModule
+    sys.modules['clr'] = clr
+    sys.modules['System'] = systemModule
+    sys.modules['System.IO'] = systemIOModule
+
+import BatchProcessorLogUtils as logUtils
+
+#: Number of synthetic log files compared
+NUMBER_OF_LOG_FILES = 200
+
+def GetProcessStatusReference(fileToCheck, logFilePath):
+    # GetProcessStatus as it was before the single pass parser: exception messages are checked one by one
+    message = ['Found no match in log file']
+    foundMatch = False
+    jsonData = logUtils.ReadLogFile(logFilePath)
+    unformattedRevitFileProcessMessages = logUtils.GetLogBlocks(jsonData, '\t- Processing file (', ['\t- Task script operation completed.','\t- Operation aborted.'], True)
+    processStatus = True
+    for mblock in unformattedRevitFileProcessMessages:
+        fileName = logUtils.GetFileNameFromDataBlock(mblock)
+        if(fileName == fileToCheck):
+            foundMatch = True
+            foundProblem = False
+            for m in mblock:
+                for exceptionMessage in logUtils.EXCEPTION_MESSAGES:
+                    if(exceptionMessage in m):
+                        processStatus = False
+                        foundProblem = True
+                        message = [m.strip()]
+                        break
+            if (foundProblem == False):
+                message = '[ok]'
+                processStatus = True
+    if(foundMatch == False):
+        processStatus = False
+        message = '[Failed to retrieve processing data for file.]'
+    return processStatus, message
+
+def ProcessLogFileReference(filePath):
+    # ProcessLogFile as it was before the single pass parser: the log file is read once per file processed
+    filesProcessStatus = []
+    filesProcessed = logUtils.GetFilesProcessed(filePath)
+    filesNotFound = logUtils.GetFilesNotFound(filesProcessed)
+    for fileToCheck in logUtils.filterFilesNotyFound(filesProcessed, filesNotFound):
+        status, message = GetProcessStatusReference(fileToCheck, filePath)
+        filesProcessStatus.append([fileToCheck, status, message])
+    for f in filesNotFound:
+        filesProcessStatus.append([f[0], False, ['File not found']])
+    return filesProcessStatus
+
+def GetRow(message, second):
+    time = '10:%02d:%02d' % (second // 60 % 60, second % 60)
+    return {
+        'date': {'local': '17/12/2020', 'utc': '17/12/2020'},
+        'time': {'local': time, 'utc': time},
+        'sessionId': '235e2180-dc33-4d61-8773-1005a59344c0',
+        'message': {'msgId': '', 'message': message}
+    }
+
+def GetSyntheticLogMessages(rand):
+    '''
+    Returns the messages of a random batch processor session log: a file list (files found, not found and cloud models)\
+        followed by file processing blocks, some with exception messages, some repeated, aborted or never closed.
+    '''
+
+    files = []
+    for i in range(rand.randint(0, 12)):
+        if(rand.random() < 0.15):
+            files.append(('cloud', 'Model ID: ' + str(i) + '-c15a664d'))
+        else:
+            files.append(('server', 'P:\\Projects\\Model_' + str(i) + '.rvt', rand.random() < 0.85))
+    messages = ['Session started', 'Session ID: <2020-12-17T05:49:27.559Z>', 'Revit Files for processing (' + str(len(files)) + '):']
+    for f in files:
+        messages.append('')
+        if(f[0] == 'cloud'):
+            messages.extend(['\tCLOUD MODEL', '\tProject ID: ee514b99', '\t' + f[1], '\tRevit version: 2020'])
+        else:
+            messages.extend(['\t' + f[1], '\tFile exists: ' + ('YES' if f[2] else 'NO'), '\tFile size: 86.93MB', '\tRevit version: 2020'])
+    messages.extend(['', 'Starting batch operation...'])
+    # processing blocks: in random order, some files are not processed, some more than once
+    blocks = [f for f in files if f[0] == 'cloud' or f[2]]
+    blocks = rand.sample(blocks, rand.randint(0, len(blocks))) + [f for f in blocks if rand.random() < 0.1]
+    for counter in range(len(blocks)):
+        f = blocks[counter]
+        position = '(' + str(counter + 1) + ' of ' + str(len(blocks)) + '): '
+        if(f[0] == 'cloud'):
+            messages.extend(['\t- Processing file ' + position + 'CLOUD MODEL', '\t- ', '\t- \tProject ID: ee514b99', '\t- \t' + f[1]])
+        else:
+            messages.append('\t- Processing file ' + position + f[1])
+        messages.append('\t- Task script operation started.')
+        # enough rows to span more than one exception check chunk now and then
+        numberOfRows = rand.choice([0, 3, 20, logUtils.EXCEPTION_CHECK_ROWS + rand.randint(-2, 40)])
+        for row in range(numberOfRows):
+            if(rand.random() < 0.02):
+                messages.append('\t- ' + rand.choice(logUtils.EXCEPTION_MESSAGES) + ' row ' + str(row))
+            else:
+                messages.append('\t- Task script output row ' + str(row))
+        # the last block of a session which crashed is never closed
+        if(counter == len(blocks) - 1 and rand.random() < 0.2):
+            break
+        messages.append(rand.choice(['\t- Task script operation completed.', '\t- Operation aborted.']))
+        messages.append('Processing file finished.')
+    messages.append('Session ended')
+    return messages
+
+class ParseLogFileTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def WriteLogFile(self, fileName, messages):
+        filePath = os.path.join(self.directory, fileName)
+        with open(filePath, 'w') as f:
+            for second in range(len(messages)):
+                f.write(json.dumps(GetRow(messages[second], second)) + '\n')
+        return filePath
+
+    def test_matches_multi_pass_functions(self):
+        rand = random.Random(20201217)
+        numberOfFailures = 0
+        for i in range(NUMBER_OF_LOG_FILES):
+            filePath = self.WriteLogFile('session_' + str(i) + '.log', GetSyntheticLogMessages(rand))
+            expected = ProcessLogFileReference(filePath)
+            self.assertEqual(logUtils.ProcessLogFile(filePath), expected, filePath)
+            numberOfFailures += len([status for status in expected if not status[1]])
+        # the synthetic logs have to cover failed files too
+        self.assertGreater(numberOfFailures, 0)
+
+    def test_records(self):
+        filePath = self.WriteLogFile('session.log', [
+            'Session started',
+            'Revit Files for processing (1):',
+            '',
+            '\tP:\\Projects\\Model.rvt',
+            '\tFile exists: YES',
+            '',
+            'Starting batch operation...',
+            '\t- Processing file (1 of 1): P:\\Projects\\Model.rvt',
+            '\t- Task script operation started.',
+            '\t- Script Exception: first',
+            '\t- Script Exception: second',
+            '\t- Task script operation completed.'
+        ])
+        parser = logUtils.ParseLogFile(filePath)
+        self.assertEqual(parser.filesProcessed, [['P:\\Projects\\Model.rvt', True]])
+        self.assertEqual(len(parser.records), 1)
+        record = parser.records[0]
+        self.assertEqual(record.fileName, 'P:\\Projects\\Model.rvt')
+        self.assertFalse(record.status)
+        self.assertEqual(record.message, '\t- Script Exception: first')
+        self.assertEqual(logUtils.GetProcessStatusFromRecord(record), (False, ['- Script Exception: second']))
+        self.assertEqual((record.startRow, record.endRow), (8, 12))
+        self.assertTrue(record.scriptStartTime is not None)
+
+if __name__ == '__main__':
+    unittest.main()
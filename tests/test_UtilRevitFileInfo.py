@@ -0,0 +1,165 @@
+'''
+Tests of UtilRevitFileInfo against small synthetic compound files.
+'''
+
+import os
+import sys
+import shutil
+import struct
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Library'))
+
+import UtilRevitFileInfo as rfi
+
+SECTOR_SIZE = 512
+MINI_SECTOR_SIZE = 64
+MINI_STREAM_CUTOFF = 4096
+END_OF_CHAIN = 0xFFFFFFFE
+FREE_SECTOR = 0xFFFFFFFF
+FAT_SECTOR = 0xFFFFFFFD
+NO_STREAM = 0xFFFFFFFF
+
+def GetDirectoryEntry(name, entryType, child, startSector, size):
+    nameBytes = name.encode('utf-16-le') + b'\x00\x00'
+    entry = nameBytes + b'\x00' * (64 - len(nameBytes))
+    entry += struct.pack('<HBB', len(nameBytes), entryType, 1)
+    entry += struct.pack('<III', NO_STREAM, NO_STREAM, child)
+    entry += b'\x00' * 36
+    entry += struct.pack('<III', startSector, size, 0)
+    return entry
+
+def GetSectors(data, sectorSize):
+    padded = data + b'\x00' * (-len(data) % sectorSize)
+    return [padded[i:i + sectorSize] for i in range(0, len(padded), sectorSize)]
+
+def GetChain(firstSector, numberOfSectors):
+    return [firstSector + i + 1 for i in range(numberOfSectors - 1)] + [END_OF_CHAIN]
+
+def BuildCompoundFile(streamName, streamData):
+    '''
+    Builds a version 3 compound file (512 byte sectors) with a single stream in the root storage.
+
+    Layout: sector 0 FAT, sector 1 directory, then either mini FAT and mini stream (stream smaller than the cutoff)\
+        or the stream sectors.
+    '''
+
+    fat = [FAT_SECTOR, END_OF_CHAIN]
+    sectors = []
+    if(len(streamData) < MINI_STREAM_CUTOFF):
+        miniSectors = GetSectors(streamData, MINI_SECTOR_SIZE)
+        miniFat = GetChain(0, len(miniSectors))
+        miniFatSectors = GetSectors(struct.pack('<' + str(len(miniFat)) + 'I', *miniFat), SECTOR_SIZE)
+        miniStreamSectors = GetSectors(b''.join(miniSectors), SECTOR_SIZE)
+        firstMiniFatSector = 2
+        fat += GetChain(firstMiniFatSector, len(miniFatSectors))
+        rootStart = firstMiniFatSector + len(miniFatSectors)
+        fat += GetChain(rootStart, len(miniStreamSectors))
+        sectors = miniFatSectors + miniStreamSectors
+        rootSize = len(miniSectors) * MINI_SECTOR_SIZE
+        streamStart = 0
+        numberOfMiniFatSectors = len(miniFatSectors)
+    else:
+        streamSectors = GetSectors(streamData, SECTOR_SIZE)
+        streamStart = 2
+        fat += GetChain(streamStart, len(streamSectors))
+        sectors = streamSectors
+        firstMiniFatSector = END_OF_CHAIN
+        numberOfMiniFatSectors = 0
+        rootStart = END_OF_CHAIN
+        rootSize = 0
+    fat += [FREE_SECTOR] * (SECTOR_SIZE // 4 - len(fat))
+    directory = GetDirectoryEntry('Root Entry', 5, 1, rootStart, rootSize)
+    directory += GetDirectoryEntry(streamName, 2, NO_STREAM, streamStart, len(streamData))
+    directory += GetDirectoryEntry('', 0, NO_STREAM, 0, 0) * 2
+    header = rfi.COMPOUND_FILE_SIGNATURE + b'\x00' * 16
+    header += struct.pack('<HHHHH', 0x3E, 3, 0xFFFE, 9, 6) + b'\x00' * 6
+    header += struct.pack('<IIII', 0, 1, 1, 0)
+    header += struct.pack('<IIIII', MINI_STREAM_CUTOFF, firstMiniFatSector, numberOfMiniFatSectors, END_OF_CHAIN, 0)
+    header += struct.pack('<109I', *([0] + [FREE_SECTOR] * 108))
+    return header + struct.pack('<128I', *fat) + directory + b''.join(sectors)
+
+def GetBasicFileInfoData(rows, padding = 0):
+    # a binary header of an odd number of bytes followed by the UTF-16 text rows
+    return b'\x04\x00\x00\x00\x01' + '\r\n'.join(rows).encode('utf-16-le') + b'\x00' * padding
+
+class RevitFileInfoTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def WriteFile(self, fileName, data):
+        filePath = os.path.join(self.directory, fileName)
+        with open(filePath, 'wb') as f:
+            f.write(data)
+        return filePath
+
+    def test_mini_stream(self):
+        data = GetBasicFileInfoData([
+            'Worksharing: Central',
+            'Central Model Path: \\\\server\\projects\\central.rvt',
+            'Format: 2021',
+            'Build: 20210224_1515(x64)',
+            'Last Save Path: \\\\server\\projects\\central.rvt'
+        ])
+        self.assertLess(len(data), MINI_STREAM_CUTOFF)
+        info = rfi.GetRevitFileInfo(self.WriteFile('central.rvt', BuildCompoundFile(rfi.BASIC_FILE_INFO_STREAM, data)))
+        self.assertEqual(info.version, '2021')
+        self.assertEqual(info.build, '20210224_1515(x64)')
+        self.assertEqual(info.worksharing, rfi.WORKSHARING_CENTRAL)
+        self.assertEqual(info.centralPath, '\\\\server\\projects\\central.rvt')
+        self.assertTrue(info.IsWorkshared())
+        self.assertFalse(info.IsLocal())
+
+    def test_regular_stream(self):
+        data = GetBasicFileInfoData([
+            'Worksharing: Not enabled',
+            'Format: 2019',
+            'Build: 20180806_1515(x64)',
+            'Last Save Path: C:\\temp\\model.rvt'
+        ], padding = MINI_STREAM_CUTOFF)
+        self.assertGreaterEqual(len(data), MINI_STREAM_CUTOFF)
+        info = rfi.GetRevitFileInfo(self.WriteFile('model.rvt', BuildCompoundFile(rfi.BASIC_FILE_INFO_STREAM, data)))
+        self.assertEqual(info.version, '2019')
+        self.assertEqual(info.build, '20180806_1515(x64)')
+        self.assertEqual(info.worksharing, rfi.WORKSHARING_NOT_ENABLED)
+        self.assertEqual(info.lastSavePath, 'C:\\temp\\model.rvt')
+        self.assertFalse(info.IsWorkshared())
+
+    def test_local_file(self):
+        # local copies are what FileList.GroupByRevitVersion(excludeLocalFiles = True) leaves out
+        data = GetBasicFileInfoData([
+            'Worksharing: Local',
+            'Central Model Path: \\\\server\\projects\\central.rvt',
+            'Format: 2022',
+            'Build: 20210921_1515(x64)'
+        ])
+        info = rfi.GetRevitFileInfo(self.WriteFile('central_user.rvt', BuildCompoundFile(rfi.BASIC_FILE_INFO_STREAM, data)))
+        self.assertEqual(info.worksharing, rfi.WORKSHARING_LOCAL)
+        self.assertTrue(info.IsLocal())
+        self.assertTrue(info.IsWorkshared())
+
+    def test_revit_build_row(self):
+        # files saved before Revit 2015: the 'Build' key must not match inside the 'Revit Build' row
+        data = GetBasicFileInfoData([
+            'Worksharing: Not enabled',
+            'Revit Build: Autodesk Revit 2014 (Build: 20130308_1515(x64))'
+        ])
+        info = rfi.ParseBasicFileInfo(data)
+        self.assertEqual(info.version, '2014')
+        self.assertEqual(info.build, '20130308_1515(x64)')
+
+    def test_stream_names(self):
+        with open(self.WriteFile('model.rvt', BuildCompoundFile(rfi.BASIC_FILE_INFO_STREAM, GetBasicFileInfoData(['Worksharing: Local']))), 'rb') as f:
+            reader = rfi.CompoundFileReader(f)
+            self.assertEqual(reader.GetStreamNames(), [rfi.BASIC_FILE_INFO_STREAM])
+            self.assertRaises(KeyError, reader.ReadStream, 'PartAtom')
+
+    def test_not_a_compound_file(self):
+        self.assertRaises(ValueError, rfi.GetRevitFileInfo, self.WriteFile('text.rvt', b'not a compound file' * 100))
+
+if __name__ == '__main__':
+    unittest.main()